@@ -23,7 +23,7 @@ __doc__ = get_help("help_afk")
 
 old_afk_msg = []
 
-is_approved = KeyManager("PMPERMIT", cast=list).contains
+is_approved = KeyManager("PMPERMIT", cast=set).contains
 
 
 @ultroid_cmd(pattern="afk( (.*)|$)", owner_only=True)
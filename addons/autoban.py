@@ -15,7 +15,7 @@ from pyUltroid.dB.base import KeyManager
 
 from . import LOGS, asst, ultroid_bot, ultroid_cmd
 
-Keym = KeyManager("DND_CHATS", cast=list)
+Keym = KeyManager("DND_CHATS", cast=set)
 
 
 def join_func(e):
@@ -125,7 +125,7 @@ _gdemote_rights = ChatAdminRights(
     pin_messages=False,
 )
 
-keym = KeyManager("GBLACKLISTS", cast=list)
+keym = KeyManager("GBLACKLISTS", cast=set)
 
 
 @ultroid_cmd(pattern="gpromote( (.*)|$)", fullsudo=True)
@@ -44,7 +44,7 @@ from pyUltroid.dB.base import KeyManager
 
 from . import get_string, udB, ultroid_bot, ultroid_cmd
 
-keym = KeyManager("NIGHT_CHATS", cast=list)
+keym = KeyManager("NIGHT_CHATS", cast=set)
 
 
 @ultroid_cmd(pattern="nmtime( (.*)|$)")
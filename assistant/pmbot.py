@@ -24,7 +24,7 @@ from pyUltroid.fns.helper import inline_mention
 
 from . import *
 
-botb = KeyManager("BOTBLS", cast=list)
+botb = KeyManager("BOTBLS", cast=set)
 FSUB = udB.get_key("PMBOT_FSUB")
 CACHE = {}
 # --------------------------------------- Incoming -------------------------------------------- #
@@ -87,7 +87,7 @@ async def closet(lol):
 @asst_cmd(pattern="start( (.*)|$)", forwards=False, func=lambda x: not x.is_group)
 async def ultroid(event):
     args = event.pattern_match.group(1).strip()
-    keym = KeyManager("BOT_USERS", cast=list)
+    keym = KeyManager("BOT_USERS", cast=set)
     if not keym.contains(event.sender_id) and event.sender_id not in owner_and_sudos():
         keym.add(event.sender_id)
         kak_uiw = udB.get_key("OFF_START_LOG")
@@ -169,7 +169,7 @@ Total Users - {}""".format(
 
 @callback("bcast", owner=True)
 async def bdcast(event):
-    keym = KeyManager("BOT_USERS", cast=list)
+    keym = KeyManager("BOT_USERS", cast=set)
     total = keym.count()
     await event.edit(f"• Broadcast to {total} users.")
     async with event.client.conversation(OWNER_ID) as conv:
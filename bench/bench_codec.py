@@ -0,0 +1,75 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Encode/decode time of the database codecs against the legacy
+str() / ast.literal_eval format.
+
+Usage: python bench/bench_codec.py [--sizes 1000 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyUltroid.startup._codec import CODECS, LITERAL, decode, encode
+
+
+def gban_like(size):
+    # GBAN / USERNAME_DB: user id -> short string
+    return {-(10**12) + i * 7919: f"spam bot #{i}" for i in range(size)}
+
+
+def filters_like(size):
+    # FILTERS / NOTE: chat id -> {word: {"msg", "media", "button"}}
+    chats = max(size // 10, 1)
+    return {
+        -(10**12) - chat: {
+            f"word{chat}_{i}": {"msg": f"reply {i}", "media": None, "button": None}
+            for i in range(10)
+        }
+        for chat in range(chats)
+    }
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        took = time.perf_counter() - start
+        best = took if best is None else min(best, took)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    codecs = [LITERAL] + [CODECS[name] for name in ("json", "msgpack") if name in CODECS]
+    print(f"{'data':<16}{'codec':<10}{'size':>10}{'encode ms':>12}{'decode ms':>12}{'bytes':>12}")
+    for size in args.sizes:
+        for label, maker in (("gban", gban_like), ("filters", filters_like)):
+            value = maker(size)
+            for codec in codecs:
+                raw = encode(value, codec)
+                enc = best_of(args.repeat, encode, value, codec)
+                dec = best_of(args.repeat, decode, raw)
+                assert decode(raw)[0] == value
+                print(
+                    f"{label:<16}{codec.name:<10}{size:>10}"
+                    f"{enc * 1000:>12.2f}{dec * 1000:>12.2f}{len(raw):>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
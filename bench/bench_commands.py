@@ -0,0 +1,154 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Per-message cost of finding the commands a message triggers.
+
+Compares the old layout, one event builder and regex per command, with the
+CommandTable of startup/_commands.py. The commands are the `ultroid_cmd`
+patterns found in plugins/ and addons/, --extra adds made up ones on top,
+like a bot with many addons. Messages are mostly chat text, a share of
+them (--command-share) commands, some of those unknown ones.
+
+Usage: python bench/bench_commands.py [--handler .] [--messages 20000]
+                                      [--command-share 0.1] [--extra 0] [--repeat 3]
+"""
+
+import argparse
+import glob
+import logging
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pyUltroid.startup as startup
+
+# _commands logs through the package, which only sets LOGS when the bot runs.
+startup.LOGS = logging.getLogger("bench")
+
+from pyUltroid.startup._commands import CommandTable
+
+WORDS = "hey what is this ok lol bro why not sure thanks link pls check group".split()
+
+
+def compile_pattern(data, hndlr):
+    # same as _misc._decorators.compile_pattern, which needs the running bot
+    if data.startswith("^"):
+        data = data[1:]
+    if data.startswith("."):
+        data = data[1:]
+    if hndlr in [" ", "NO_HNDLR"]:
+        return re.compile("^" + data)
+    return re.compile("\\" + hndlr + data)
+
+
+def harvest_patterns():
+    patterns = []
+    for folder in ("plugins", "addons"):
+        for path in sorted(glob.glob(os.path.join(ROOT, folder, "*.py"))):
+            with open(path, encoding="utf-8") as file:
+                patterns += re.findall(
+                    r"ultroid_cmd\(\s*pattern=r?[\"']([^\"']+)[\"']", file.read()
+                )
+    return patterns
+
+
+def make_messages(commands, handler, count, share, rnd):
+    messages = []
+    for _ in range(count):
+        roll = rnd.random()
+        if roll < share * 0.8:
+            word = rnd.choice(commands)
+            messages.append(f"{handler}{word} {rnd.choice(WORDS)}")
+        elif roll < share:
+            messages.append(f"{handler}{rnd.choice(WORDS)}{rnd.randint(0, 99)}")
+        else:
+            messages.append(" ".join(rnd.choices(WORDS, k=rnd.randint(1, 12))))
+    return messages
+
+
+def command_word(pattern):
+    # a message that triggers `pattern`, good enough for the literal ones
+    return re.match(r"[\w]*", pattern.lstrip("^.")).group() or "x"
+
+
+def per_builder(regexes, messages):
+    hits = 0
+    for text in messages:
+        for regex in regexes:
+            if regex.match(text):
+                hits += 1
+    return hits
+
+
+def per_table(table, messages):
+    hits = 0
+    for text in messages:
+        for _ in table.matches(text):
+            hits += 1
+    return hits
+
+
+def best_of(repeat, func, *args):
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        took = time.perf_counter() - start
+        best = took if best is None else min(best, took)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--handler", default=".")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--command-share", type=float, default=0.1)
+    parser.add_argument("--extra", type=int, default=0, help="made up commands to add")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    patterns = harvest_patterns()
+    patterns += [f"xcmd{index}( (.*)|$)" for index in range(args.extra)]
+    regexes = [compile_pattern(pattern, args.handler) for pattern in patterns]
+    table = CommandTable()
+    for index, regex in enumerate(regexes):
+        table.add(index, regex)
+    messages = make_messages(
+        [command_word(_) for _ in patterns],
+        args.handler,
+        args.messages,
+        args.command_share,
+        rnd,
+    )
+    candidates = sum(len(table.candidates(text)) for text in messages)
+
+    old, old_hits = best_of(args.repeat, per_builder, regexes, messages)
+    new, new_hits = best_of(args.repeat, per_table, table, messages)
+    assert old_hits == new_hits, (old_hits, new_hits)
+
+    print(
+        f"{len(patterns)} commands, {table.size - len(table._any)} indexed, "
+        f"{len(messages)} messages, {old_hits} matches"
+    )
+    print(f"{'layout':<12}{'us/msg':>10}{'regex/msg':>12}{'speedup':>10}")
+    print(f"{'builders':<12}{old / len(messages) * 1e6:>10.2f}{len(regexes):>12.1f}{1:>10.1f}")
+    print(
+        f"{'trie':<12}{new / len(messages) * 1e6:>10.2f}"
+        f"{candidates / len(messages):>12.2f}{old / new:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
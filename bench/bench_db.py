@@ -0,0 +1,543 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Load test of the udB backends on traces shaped like the bot's workload.
+
+Traces:
+  config     get_key on handler, sudo and plugin settings, rare set_key
+  filters    per-chat filter lookups for incoming messages, rare additions
+  gban       join checks against GBAN while it keeps growing
+  usernames  USERNAME_DB lookup per message sender, updates on renames
+
+Every backend/trace pair starts from an empty database, gets seeded, is
+preloaded like on startup (unless --cold) and then replays the trace inside
+an event loop, so write-behind (--write-delay) flushes as it would in the
+bot. Reported are p50/p99 latency per operation, throughput and the bytes
+handed to the backend per operation.
+
+Without URLs, redis and mongo run on fakeredis / mongomock and LocalDB in a
+temporary directory. Given URLs, redis uses database 15 and mongo the
+UltroidBench database, and postgres a scratch schema; all of them are
+wiped before and after.
+
+The seeded data (2000 chats, 10000 gbans, 5000 usernames) is multiplied by
+--scale. mongomock scans the collection on every upsert, so keep it around
+0.05 there; compare backends at the same scale only.
+
+--check-sql runs no benchmark: it writes a table of the column-per-key
+layout of older versions into the scratch schema, lets SqlDB migrate it
+and reads the keys back through psycopg2 and asyncpg, including the upper
+cased rows of migrated lower case keys. Exits 1 if a check fails.
+
+Usage: python bench/bench_db.py [--backends local redis mongo sql] [--traces ...]
+                                [--redis host:port] [--mongo URL] [--sql DSN]
+                                [--ops 5000] [--scale 1] [--write-delay 0] [--cache-size 0]
+                                [--cold] [--check-sql]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyUltroid.startup as startup
+
+
+class Var:
+    """The database settings of configs.Var, filled from the arguments."""
+
+    REDIS_URI = REDISHOST = MONGO_URI = DATABASE_URL = None
+    DB_CODEC = None
+    DB_WRITE_DELAY = 0
+    DB_PRELOAD = True
+    DB_SYNC = False
+    DB_CACHE_SIZE = DB_CACHE_BYTES = 0
+    DB_CACHE_TTL = DB_CACHE_PIN = None
+    REDIS_POOL_SIZE = 10
+
+
+# _database reads both from the package, which only sets them when the bot runs.
+startup.Var = Var
+startup.LOGS = logging.getLogger("bench")
+
+from pyUltroid.startup import _database
+
+SCHEMA = "ultroid_bench"
+MONGO_DB = "UltroidBench"
+REDIS_DB = 15
+
+
+# Backends
+
+
+def local_db(args):
+    cwd, path = os.getcwd(), tempfile.mkdtemp(prefix="udb-bench-")
+    os.chdir(path)
+    db = _database.LocalDB()
+
+    def close():
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+    return db, close
+
+
+def redis_db(args):
+    import redis
+
+    _database.Redis = redis.Redis
+    if args.redis:
+        _database.BlockingConnectionPool = redis.BlockingConnectionPool
+        host = args.redis
+        redis.Redis(*host.split(":"), db=REDIS_DB).flushdb()
+    else:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+
+        def pool(**kwargs):
+            return redis.BlockingConnectionPool(
+                connection_class=fakeredis.FakeConnection, server=server, **kwargs
+            )
+
+        _database.BlockingConnectionPool = pool
+        host = "localhost:6379"
+    db = _database.RedisDB(
+        host=host, port=None, password=None, db=REDIS_DB, decode_responses=True
+    )
+
+    def close():
+        db.db.flushdb()
+        db.db.close()
+
+    return db, close
+
+
+def mongo_db(args):
+    from pymongo import DeleteMany, DeleteOne, ReplaceOne
+
+    if args.mongo:
+        from pymongo import MongoClient
+    else:
+        from mongomock import MongoClient
+    _database.MongoClient = MongoClient
+    _database.ReplaceOne, _database.DeleteMany, _database.DeleteOne = (
+        ReplaceOne,
+        DeleteMany,
+        DeleteOne,
+    )
+    url = args.mongo or "mongodb://localhost"
+    MongoClient(url).drop_database(MONGO_DB)
+    db = _database.MongoDB(url, dbname=MONGO_DB)
+
+    def close():
+        db.dB.drop_database(MONGO_DB)
+        db.dB.close()
+
+    return db, close
+
+
+def sql_db(args, columns=None):
+    """SqlDB in the scratch schema; `columns` seeds the column-per-key table
+    of older versions first, which SqlDB then migrates."""
+    import psycopg2
+
+    class ScratchSchema:
+        """psycopg2, with every connection inside the scratch schema."""
+
+        Error = psycopg2.Error
+
+        @staticmethod
+        def connect(dsn):
+            connection = psycopg2.connect(dsn=dsn)
+            connection.autocommit = True
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+            cursor.execute(f"SET search_path TO {SCHEMA}")
+            return connection
+
+    with psycopg2.connect(dsn=args.sql) as connection:
+        connection.autocommit = True
+        connection.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    if columns:
+        # written the way SqlDB.set of the column layout did
+        connection = ScratchSchema.connect(args.sql)
+        cursor = connection.cursor()
+        cursor.execute("CREATE TABLE Ultroid (ultroidCli varchar(70))")
+        for key, value in columns.items():
+            cursor.execute(f"ALTER TABLE Ultroid ADD {key} TEXT")
+            cursor.execute(f"INSERT INTO Ultroid ({key}) values (%s)", (str(value),))
+        connection.close()
+    _database.psycopg2 = ScratchSchema
+    db = _database.SqlDB(args.sql)
+
+    def close():
+        db._cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        db._connection.close()
+
+    return db, close
+
+
+BACKENDS = {"local": local_db, "redis": redis_db, "mongo": mongo_db, "sql": sql_db}
+
+
+# Checks
+
+LEGACY = {"SUDOS": [1, 2], "language": "en", "PMSETTING": {"a": 1}, "HNDLR": "."}
+
+
+def check_sql(args):
+    """Migrate a column-layout table, read it back through psycopg2 and asyncpg.
+
+    Returns the names of the failed checks."""
+    import asyncpg
+
+    failed = []
+
+    def check(name, got, expected):
+        ok = got == expected
+        print(f"{'ok' if ok else 'FAILED':<8}{name}" + ("" if ok else f": {got!r} != {expected!r}"))
+        if not ok:
+            failed.append(name)
+
+    def driver(url):
+        # asyncpg in the scratch schema, like ScratchSchema for psycopg2
+        driver = _database.SqlDriver(url)
+        driver._asyncpg = type(
+            "ScratchPool",
+            (),
+            {
+                "create_pool": staticmethod(
+                    lambda **kwargs: asyncpg.create_pool(
+                        server_settings={"search_path": SCHEMA}, **kwargs
+                    )
+                )
+            },
+        )
+        return driver
+
+    async def read_async(db, keys):
+        db._adriver = driver(args.sql)
+        try:
+            return {key: await db.aget_key(key) for key in keys}
+        finally:
+            await (await db._adriver.pool()).close()
+
+    db, close = sql_db(args, columns=LEGACY)
+    try:
+        check("migrated keys", {key: db.get_key(key) for key in LEGACY}, LEGACY)
+        db._cursor.execute("SELECT to_regclass('ultroid'), to_regclass('ultroidcolumns')")
+        check("old table kept as UltroidColumns", db._cursor.fetchone(), (None, "ultroidcolumns"))
+        check("key count", sorted(db.keys()), sorted(LEGACY))
+
+        # Rows migrated upper cased, reclaimed by the first lower case read.
+        db._cursor.execute(
+            "INSERT INTO UltroidKV (key, value, updated_at) VALUES "
+            "('SYNCCASE', 'a', NULL), ('ASYNCCASE', 'b', NULL)"
+        )
+        check("legacy case, psycopg2", db.get("syncCase"), "a")
+        restarted = _database.SqlDB(args.sql)
+        check("restart", {key: restarted.get_key(key) for key in LEGACY}, LEGACY)
+        restarted._cache.clear()
+        check(
+            "asyncpg reads",
+            asyncio.run(read_async(restarted, list(LEGACY))),
+            LEGACY,
+        )
+
+        async def legacy_async():
+            async_driver = driver(args.sql)
+            try:
+                return await async_driver.get("asyncCase")
+            finally:
+                await (await async_driver.pool()).close()
+
+        check("legacy case, asyncpg", asyncio.run(legacy_async()), "b")
+        db._cursor.execute("SELECT key FROM UltroidKV WHERE key ILIKE '%case'")
+        check("legacy rows renamed", sorted(_[0] for _ in db._cursor.fetchall()), ["asyncCase", "syncCase"])
+
+        async def write_async():
+            db._adriver = driver(args.sql)
+            try:
+                await db.aset_key("ASYNC", {"x": [1]})
+                await db.ahset("FIELDS", 5, "v")
+            finally:
+                await (await db._adriver.pool()).close()
+
+        asyncio.run(write_async())
+        restarted = _database.SqlDB(args.sql)
+        check(
+            "asyncpg writes",
+            (restarted.get_key("ASYNC"), restarted.hgetall("FIELDS")),
+            ({"x": [1]}, {5: "v"}),
+        )
+    finally:
+        close()
+    return failed
+
+
+# Traces: setup seeds the database, plan returns the operations to time.
+
+
+def zipf(rng, items, count, skew=1.1):
+    """`count` picks from `items`, the first ones being the most popular."""
+    weights = [1 / (rank + 1) ** skew for rank in range(len(items))]
+    return rng.choices(items, weights=weights, k=count)
+
+
+CONFIG_KEYS = [
+    "HNDLR",
+    "SUDO",
+    "SUDOS",
+    "LOG_CHANNEL",
+    "PMPERMIT",
+    "BLACKLIST_CHATS",
+    "BOTMODE",
+    "DUAL_MODE",
+    "PMLOG",
+    "TAG_LOG",
+] + [f"PLUGIN_SETTING_{i}" for i in range(50)]
+
+
+def setup_config(db, rng, scale):
+    for key in CONFIG_KEYS:
+        db.set_key(key, rng.choice([".", True, -1001234567890, [1, 2, 3], "text"]))
+
+
+def plan_config(db, rng, ops, scale):
+    plan = []
+    for key in zipf(rng, CONFIG_KEYS, ops):
+        if rng.random() < 0.005:
+            plan.append(lambda key=key: db.set_key(key, rng.random()))
+        else:
+            plan.append(lambda key=key: db.get_key(key))
+    return plan
+
+
+def chats(scale):
+    return [-(10**12) - i for i in range(max(int(2000 * scale), 10))]
+
+
+def _filters(chat, words):
+    return {
+        f"word{chat % 97}_{i}": {"msg": f"reply {i}", "media": None, "button": None}
+        for i in range(words)
+    }
+
+
+def setup_filters(db, rng, scale):
+    # one chat in ten has filters
+    for chat in chats(scale)[::10]:
+        db.chat(chat).set("filters", _filters(chat, 10))
+
+
+def plan_filters(db, rng, ops, scale):
+    def add(chat):
+        store = db.chat(chat)
+        filters = store.get("filters") or {}
+        filters[f"new{rng.random()}"] = {"msg": "hi", "media": None, "button": None}
+        store.set("filters", filters)
+
+    plan = []
+    for chat in zipf(rng, chats(scale), ops, skew=0.8):
+        if rng.random() < 0.005:
+            plan.append(lambda chat=chat: add(chat))
+        else:
+            plan.append(lambda chat=chat: db.chat(chat).get("filters"))
+    return plan
+
+
+def gbans(scale):
+    return max(int(10000 * scale), 10)
+
+
+def setup_gban(db, rng, scale):
+    db.hset_many("GBAN", {10**9 + i: f"spam #{i}" for i in range(gbans(scale))})
+
+
+def plan_gban(db, rng, ops, scale):
+    new = iter(range(10**9 + gbans(scale), 10**10))
+    plan = []
+    for _ in range(ops):
+        if rng.random() < 0.05:
+            plan.append(lambda: db.hset("GBAN", next(new), "federated ban"))
+        else:
+            # most joining users aren't gbanned
+            user = 10**9 + rng.randrange(gbans(scale) * 20)
+            plan.append(lambda user=user: db.hget("GBAN", user))
+    return plan
+
+
+def users(scale):
+    return [10**8 + i * 7 for i in range(max(int(5000 * scale), 10))]
+
+
+def setup_usernames(db, rng, scale):
+    db.hset_many("USERNAME_DB", {user: f"user{user}" for user in users(scale)})
+
+
+def plan_usernames(db, rng, ops, scale):
+    def seen(user, rename):
+        name = f"renamed{user}" if rename else f"user{user}"
+        if db.hget("USERNAME_DB", user) != name:
+            db.hset("USERNAME_DB", user, name)
+
+    return [
+        lambda user=user: seen(user, rng.random() < 0.03)
+        for user in zipf(rng, users(scale), ops, skew=0.9)
+    ]
+
+
+TRACES = {
+    "config": (setup_config, plan_config),
+    "filters": (setup_filters, plan_filters),
+    "gban": (setup_gban, plan_gban),
+    "usernames": (setup_usernames, plan_usernames),
+}
+
+
+# Measuring
+
+
+def payload(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload(k) + payload(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload(item) for item in value)
+    return 0
+
+
+class WriteMeter:
+    """Counts the bytes of keys, fields and values handed to the backend."""
+
+    def __init__(self, db):
+        self.bytes = 0
+        # writers calling writers (sets on hashes, batches) count once
+        self._depth = 0
+        for name in set(_database._WRITERS.values()):
+            # field writers only exist on backends with field storage
+            if hasattr(db, name):
+                setattr(db, name, self._wrap(getattr(db, name), lambda *args: args))
+        db._write_batch = self._wrap(
+            db._write_batch, lambda ops: [op[1:] for op in ops]
+        )
+
+    def _wrap(self, func, written):
+        def call(*args):
+            if not self._depth:
+                self.bytes += payload(written(*args))
+            self._depth += 1
+            try:
+                return func(*args)
+            finally:
+                self._depth -= 1
+
+        return call
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def replay(db, plan):
+    samples = []
+    start = time.perf_counter()
+    for op in plan:
+        began = time.perf_counter()
+        op()
+        samples.append(time.perf_counter() - began)
+        # lets write-behind flushes run, like between two updates of the bot
+        await asyncio.sleep(0)
+    db.flush()
+    return samples, time.perf_counter() - start
+
+
+def run(backend, trace, args):
+    setup, plan = TRACES[trace]
+    rng = random.Random(args.seed)
+    db, close = BACKENDS[backend](args)
+    try:
+        meter = WriteMeter(db)
+        setup(db, rng, args.scale)
+        db.flush()
+        preload = 0
+        if args.cold:
+            db._cache.clear()
+        else:
+            began = time.perf_counter()
+            db.re_cache()
+            preload = time.perf_counter() - began
+        operations = plan(db, rng, args.ops, args.scale)
+        meter.bytes = 0
+        samples, took = asyncio.run(replay(db, operations))
+        return {
+            "preload ms": preload * 1000,
+            "p50 us": percentile(samples, 50) * 10**6,
+            "p99 us": percentile(samples, 99) * 10**6,
+            "mean us": statistics.mean(samples) * 10**6,
+            "ops/s": len(samples) / took,
+            "B/op": meter.bytes / len(samples),
+            "hit rate": db.cache_stats()["hit_rate"],
+        }
+    finally:
+        close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["local", "redis", "mongo"])
+    parser.add_argument("--traces", nargs="+", choices=TRACES, default=list(TRACES))
+    parser.add_argument("--redis", help="host:port of a redis server, fakeredis otherwise")
+    parser.add_argument("--mongo", help="mongodb url, mongomock otherwise")
+    parser.add_argument("--sql", help="postgres dsn, needed for the sql backend")
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--scale", type=float, default=1.0, help="size of the seeded data")
+    parser.add_argument("--write-delay", type=float, default=0, help="DB_WRITE_DELAY")
+    parser.add_argument("--cache-size", type=int, default=0, help="DB_CACHE_SIZE")
+    parser.add_argument("--codec", default=None, help="DB_CODEC")
+    parser.add_argument("--cold", action="store_true", help="skip the startup preload")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--check-sql",
+        action="store_true",
+        help="only check the column layout migration and both SQL clients",
+    )
+    args = parser.parse_args()
+    if ("sql" in args.backends or args.check_sql) and not args.sql:
+        parser.error("the sql backend needs --sql")
+    if args.check_sql:
+        sys.exit(1 if check_sql(args) else 0)
+
+    Var.DB_WRITE_DELAY = args.write_delay
+    Var.DB_CACHE_SIZE = args.cache_size
+    Var.DB_CODEC = args.codec
+
+    columns = ["preload ms", "p50 us", "p99 us", "mean us", "ops/s", "B/op", "hit rate"]
+    print(f"{'backend':<8}{'trace':<11}" + "".join(f"{name:>12}" for name in columns))
+    for backend in args.backends:
+        for trace in args.traces:
+            result = run(backend, trace, args)
+            print(
+                f"{backend:<8}{trace:<11}"
+                + "".join(f"{result[name]:>12.2f}" for name in columns)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Throughput of FastTelethon downloads, fixed vs tuned connection counts.
+
+Runs ParallelTransferrer against a fake DC: every GetFile request takes a
+round trip plus its bytes over the connection bandwidth, which requests on
+one connection share, as connections share the bandwidth of the link.
+Past `--max-connections` open connections requests start failing with
+FloodWait, like Telegram refusing connections.
+`--loss` makes requests fail at random, more so the bigger the part, and
+`--jitter` makes some take longer (exponentially, `--jitter` times the
+time on average). A failed download is retried from scratch and its time
+counted.
+
+"fixed" is the old rule (connections rising linearly to 20 at 100 MB, part
+size from telethon), "tuned" lets fns.FastTelethon.tuner pick, learning
+over the `--transfers` downloads.
+
+Usage: python bench/bench_transfers.py [--size-mb 16] [--transfers 12]
+                                       [--link-mbps 48] [--conn-mbps 4]
+                                       [--rtt-ms 30] [--max-connections 20]
+                                       [--loss 0] [--jitter 0]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from telethon.errors import FloodWaitError
+from telethon.tl.types import InputDocumentFileLocation
+
+import pyUltroid.fns.FastTelethon as FastTelethon
+
+MB = 1024**2
+
+
+class FakeDC:
+    def __init__(self, link, per_connection, rtt, max_connections, loss, jitter, rnd):
+        self.link = link
+        self.per_connection = per_connection
+        self.rtt = rtt
+        self.max_connections = max_connections
+        self.loss = loss
+        self.jitter = jitter
+        self.rnd = rnd
+        self.open = 0
+        self.active = 0
+        self.requests = self.failures = 0
+
+    async def request(self, sender, size):
+        self.requests += 1
+        over = self.open - self.max_connections
+        if over > 0 and self.rnd.random() < 0.05 * over:
+            self.failures += 1
+            raise FloodWaitError(None, capture=0)
+        self.active += 1
+        sender.active += 1
+        try:
+            speed = min(self.per_connection / sender.active, self.link / self.active)
+            took = self.rtt + size / speed
+            if self.jitter:
+                took *= 1 + self.rnd.expovariate(1 / self.jitter)
+            await asyncio.sleep(took)
+        finally:
+            self.active -= 1
+            sender.active -= 1
+        if self.rnd.random() < self.loss * size / (128 * 1024):
+            self.failures += 1
+            raise ConnectionError("connection lost")
+
+
+class FakePool:
+    def __init__(self, dc):
+        self.dc = dc
+
+    async def lease(self, dc_id, count):
+        self.dc.open += count
+        return [types.SimpleNamespace(dc_id=dc_id, active=0) for _ in range(count)]
+
+    async def release(self, dc_id, senders, broken=False):
+        self.dc.open -= len(senders)
+
+
+class FakeClient:
+    def __init__(self, dc):
+        self.dc = dc
+        self.loop = asyncio.get_event_loop()
+        self.session = types.SimpleNamespace(dc_id=2, auth_key=None)
+        self.sender_pool = FakePool(dc)
+
+    async def _call(self, sender, request):
+        await self.dc.request(sender, request.limit)
+        return types.SimpleNamespace(bytes=b"\0" * request.limit)
+
+
+async def download(client, size, fixed):
+    location = InputDocumentFileLocation(
+        id=0, access_hash=0, file_reference=b"", thumb_size=""
+    )
+    transferrer = FastTelethon.ParallelTransferrer(client, 2)
+    kwargs = {}
+    if fixed:
+        kwargs["connection_count"] = transferrer._get_connection_count(size)
+        kwargs["part_size_kb"] = FastTelethon.utils.get_appropriated_part_size(size)
+    received = 0
+    async for chunk in transferrer.download(location, size, **kwargs):
+        received += len(chunk)
+    return received
+
+
+async def run(strategy, args):
+    rnd = random.Random(args.seed)
+    dc = FakeDC(
+        args.link_mbps * MB,
+        args.conn_mbps * MB,
+        args.rtt_ms / 1000,
+        args.max_connections,
+        args.loss,
+        args.jitter,
+        rnd,
+    )
+    client = FakeClient(dc)
+    FastTelethon.tuner = FastTelethon.TransferTuner()
+    size = int(args.size_mb * MB)
+    loop = asyncio.get_event_loop()
+    rates, failed = [], 0
+    for _ in range(args.transfers):
+        start = loop.time()
+        while True:
+            try:
+                await download(client, size, strategy == "fixed")
+                break
+            except (ConnectionError, FloodWaitError):
+                failed += 1
+        rates.append(size / (loop.time() - start) / MB)
+    state = FastTelethon.tuner.state(2, "download")
+    last = rates[len(rates) // 2 :]
+    print(
+        f"{strategy:<8}{sum(rates) / len(rates):>10.2f}{sum(last) / len(last):>12.2f}"
+        f"{failed:>8}{dc.failures:>8}"
+        + (f"{state.best:>8}{state.part_kb or 0:>8}" if strategy == "tuned" else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=16)
+    parser.add_argument("--transfers", type=int, default=12)
+    parser.add_argument("--link-mbps", type=float, default=48, help="MB/s of the link")
+    parser.add_argument("--conn-mbps", type=float, default=4, help="MB/s per connection")
+    parser.add_argument("--rtt-ms", type=float, default=30)
+    parser.add_argument("--max-connections", type=int, default=20)
+    parser.add_argument("--loss", type=float, default=0, help="failure chance per 128 KB")
+    parser.add_argument("--jitter", type=float, default=0, help="mean extra time, x")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{args.size_mb} MB x {args.transfers}, link {args.link_mbps} MB/s, "
+        f"{args.conn_mbps} MB/s per connection, rtt {args.rtt_ms} ms, "
+        f"{args.max_connections} connections max, loss {args.loss}, "
+        f"jitter {args.jitter}"
+    )
+    print(
+        f"{'strategy':<8}{'MB/s':>10}{'MB/s 2nd½':>12}{'retries':>8}"
+        f"{'errors':>8}{'conns':>8}{'part KB':>8}"
+    )
+    for strategy in ("fixed", "tuned"):
+        asyncio.run(run(strategy, args))
+
+
+if __name__ == "__main__":
+    main()
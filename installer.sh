@@ -178,7 +178,7 @@ dep_install() {
     echo -e "\n\nInstalling DB Requirement..."
     if [ $MONGO_URI ]; then
         echo -e "   Installing MongoDB Requirements..."
-        pip3 install -q pymongo[srv]
+        pip3 install -q pymongo[srv] motor
     elif [ $DATABASE_URL ]; then
         echo -e "   Installing PostgreSQL Requirements..."
         pip3 install -q psycopg2-binary
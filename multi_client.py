@@ -5,6 +5,9 @@ import sys
 
 vars = ["API_ID", "API_HASH", "SESSION"]
 
+# All clients share one database, keep their caches in sync.
+os.environ.setdefault("DB_SYNC", "True")
+
 
 def _check(z):
     new = []
@@ -5,7 +5,6 @@
 # PLease read the GNU Affero General Public License in
 # <https://www.github.com/TeamUltroid/Ultroid/blob/main/LICENSE/>.
 
-import asyncio
 
 from telethon import events
 from telethon.errors.rpcerrorlist import UserNotParticipantError
@@ -25,11 +24,21 @@ try:
     from ProfanityDetector import detector
 except ImportError:
     detector = None
-from . import LOG_CHANNEL, LOGS, asst, get_string, types, udB, ultroid_bot
+from . import (
+    LOG_CHANNEL,
+    LOGS,
+    asst,
+    get_string,
+    scheduler,
+    types,
+    udB,
+    ultroid_bot,
+)
 from ._inline import something
 
 
 @ultroid_bot.on(events.ChatAction())
+@scheduler.limited("chatactions", limit=8, size=1000)
 async def Function(event):
     try:
         await DummyHandler(event)
@@ -54,11 +63,7 @@ async def DummyHandler(ult):
             sticker = stickers[stik_id]
             await ult.respond(file=sticker)
     # force subscribe
-    if (
-        udB.get_key("FORCESUB")
-        and (ult.user_joined or ult.user_added)
-        and get_forcesetting(ult.chat_id)
-    ):
+    if (ult.user_joined or ult.user_added) and get_forcesetting(ult.chat_id):
         user = await ult.get_user()
         if not user.bot:
             joinchat = get_forcesetting(ult.chat_id)
@@ -147,8 +152,7 @@ async def DummyHandler(ult):
                     msg,
                     file=med,
                 )
-                await asyncio.sleep(150)
-                await send.delete()
+                scheduler.delete_later(send, 150)
             else:
                 await ult.reply(file=med)
     elif (ult.user_left or ult.user_kicked) and get_goodbye(ult.chat_id):
@@ -187,13 +191,11 @@ async def DummyHandler(ult):
                 msg,
                 file=med,
             )
-            await asyncio.sleep(150)
-            await send.delete()
+            scheduler.delete_later(send, 150)
         else:
             await ult.reply(file=med)
 
 
-@ultroid_bot.on(events.NewMessage(incoming=True))
 async def chatBot_replies(e):
     sender = await e.get_sender()
     if not isinstance(sender, types.User) or sender.bot:
@@ -203,13 +205,9 @@ async def chatBot_replies(e):
             await e.respond(e.message)
         except Exception as er:
             LOGS.exception(er)
-    key = udB.get_key("CHATBOT_USERS") or {}
+    key = await udB.aget_key("CHATBOT_USERS") or {}
     if e.text and key.get(e.chat_id) and sender.id in key[e.chat_id]:
-        msg = await get_chatbot_reply(e.message.message)
-        if msg:
-            sleep = udB.get_key("CHATBOT_SLEEP") or 1.5
-            await asyncio.sleep(sleep)
-            await e.reply(msg)
+        await chatbot_reply(e)
     chat = await e.get_chat()
     if e.is_group and sender.username:
         await uname_stuff(e.sender_id, sender.username, sender.first_name)
@@ -221,17 +219,25 @@ async def chatBot_replies(e):
             await e.delete()
 
 
+ultroid_bot.router.subscribe(chatBot_replies, incoming=True)
+
+
+@scheduler.limited("chatbot", limit=4, size=100)
+async def chatbot_reply(e):
+    msg = await get_chatbot_reply(e.message.message)
+    if msg:
+        sleep = await udB.aget_key("CHATBOT_SLEEP") or 1.5
+        scheduler.call_later(sleep, e.reply, msg)
+
+
 @ultroid_bot.on(events.Raw(types.UpdateUserName))
 async def uname_change(e):
     await uname_stuff(e.user_id, e.usernames[0] if e.usernames else None, e.first_name)
 
 
 async def uname_stuff(id, uname, name):
-    if udB.get_key("USERNAME_LOG"):
-        old_ = udB.get_key("USERNAME_DB") or {}
-        if not isinstance(old_, dict):
-            old_ = {}
-        old = old_.get(id)
+    if await udB.aget_key("USERNAME_LOG"):
+        old = await udB.ahget("USERNAME_DB", id)
         # Ignore Name Logs
         if old and old == uname:
             return
@@ -251,5 +257,4 @@ async def uname_stuff(id, uname, name):
                 get_string("can_4").format(f"[{name}](tg://user?id={id})", uname),
             )
 
-        old_[id] = uname
-        udB.set_key("USERNAME_DB", old_)
+        await udB.ahset("USERNAME_DB", id, uname)
@@ -39,12 +39,6 @@ CACHE_SPAM = {}
 TAG_EDITS = {}
 
 
-@ultroid_bot.on(
-    events.NewMessage(
-        incoming=True,
-        func=lambda e: (e.mentioned),
-    ),
-)
 async def all_messages_catcher(e):
     x = await e.get_sender()
     if isinstance(x, User) and (x.bot or x.verified):
@@ -113,6 +107,11 @@ async def all_messages_catcher(e):
         LOGS.exception(er)
 
 
+ultroid_bot.router.subscribe(
+    all_messages_catcher, incoming=True, func=lambda e: e.mentioned
+)
+
+
 if udB.get_key("TAG_LOG"):
 
     @ultroid_bot.on(events.MessageEdited(func=lambda x: not x.out))
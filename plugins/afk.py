@@ -10,8 +10,6 @@ from . import get_help
 __doc__ = get_help("help_afk")
 
 
-import asyncio
-
 from telethon import events
 
 from pyUltroid.dB.afk_db import add_afk, del_afk, is_afk
@@ -24,6 +22,7 @@ from . import (
     asst,
     get_string,
     mediainfo,
+    scheduler,
     udB,
     ultroid_bot,
     ultroid_cmd,
@@ -32,7 +31,7 @@ from . import (
 
 old_afk_msg = []
 
-is_approved = KeyManager("PMPERMIT", cast=list).contains
+is_approved = KeyManager("PMPERMIT", cast=set).contains
 
 
 @ultroid_cmd(pattern="afk( (.*)|$)", owner_only=True)
@@ -109,8 +108,7 @@ async def remove_afk(event):
                 await x.delete()
             except BaseException:
                 pass
-        await asyncio.sleep(10)
-        await off.delete()
+        scheduler.delete_later(off, 10)
 
 
 async def on_afk(event):
@@ -12,57 +12,52 @@ __doc__ = get_help("help_antiflood")
 
 import re
 
-from telethon.events import NewMessage as NewMsg
-
 from pyUltroid.dB import DEVLIST
-from pyUltroid.dB.antiflood_db import get_flood, get_flood_limit, rem_flood, set_flood
+from pyUltroid.dB.antiflood_db import get_flood_limit, rem_flood, set_flood
 from pyUltroid.fns.admins import admin_check
 
 from . import Button, Redis, asst, callback, eod, get_string, ultroid_bot, ultroid_cmd
 
 _check_flood = {}
 
-if Redis("ANTIFLOOD"):
 
-    @ultroid_bot.on(
-        NewMsg(
-            chats=list(get_flood().keys()),
-        ),
-    )
-    async def flood_checm(event):
-        count = 1
-        chat = (await event.get_chat()).title
-        if event.chat_id in _check_flood.keys():
-            if event.sender_id == list(_check_flood[event.chat_id].keys())[0]:
-                count = _check_flood[event.chat_id][event.sender_id]
-                _check_flood[event.chat_id] = {event.sender_id: count + 1}
-            else:
-                _check_flood[event.chat_id] = {event.sender_id: count}
+async def flood_checm(event):
+    count = 1
+    chat = (await event.get_chat()).title
+    if event.chat_id in _check_flood.keys():
+        if event.sender_id == list(_check_flood[event.chat_id].keys())[0]:
+            count = _check_flood[event.chat_id][event.sender_id]
+            _check_flood[event.chat_id] = {event.sender_id: count + 1}
         else:
             _check_flood[event.chat_id] = {event.sender_id: count}
-        if await admin_check(event, silent=True) or getattr(event.sender, "bot", None):
-            return
-        if event.sender_id in DEVLIST:
-            return
-        if _check_flood[event.chat_id][event.sender_id] >= int(
-            get_flood_limit(event.chat_id)
-        ):
-            try:
-                name = event.sender.first_name
-                await event.client.edit_permissions(
-                    event.chat_id, event.sender_id, send_messages=False
-                )
-                del _check_flood[event.chat_id]
-                await event.reply(f"#AntiFlood\n\n{get_string('antiflood_3')}")
-                await asst.send_message(
-                    int(Redis("LOG_CHANNEL")),
-                    f"#Antiflood\n\n`Muted `[{name}](tg://user?id={event.sender_id})` in {chat}`",
-                    buttons=Button.inline(
-                        "Unmute", data=f"anti_{event.sender_id}_{event.chat_id}"
-                    ),
-                )
-            except BaseException:
-                pass
+    else:
+        _check_flood[event.chat_id] = {event.sender_id: count}
+    if await admin_check(event, silent=True) or getattr(event.sender, "bot", None):
+        return
+    if event.sender_id in DEVLIST:
+        return
+    if _check_flood[event.chat_id][event.sender_id] >= int(
+        get_flood_limit(event.chat_id)
+    ):
+        try:
+            name = event.sender.first_name
+            await event.client.edit_permissions(
+                event.chat_id, event.sender_id, send_messages=False
+            )
+            del _check_flood[event.chat_id]
+            await event.reply(f"#AntiFlood\n\n{get_string('antiflood_3')}")
+            await asst.send_message(
+                int(Redis("LOG_CHANNEL")),
+                f"#Antiflood\n\n`Muted `[{name}](tg://user?id={event.sender_id})` in {chat}`",
+                buttons=Button.inline(
+                    "Unmute", data=f"anti_{event.sender_id}_{event.chat_id}"
+                ),
+            )
+        except BaseException:
+            pass
+
+
+ultroid_bot.router.subscribe(flood_checm, feature="antiflood")
 
 
 @callback(
@@ -12,12 +12,12 @@ __doc__ = get_help("help_blacklist")
 
 from pyUltroid.dB.blacklist_db import (
     add_blacklist,
-    get_blacklist,
+    is_blacklisted,
     list_blacklist,
     rem_blacklist,
 )
 
-from . import events, get_string, udB, ultroid_bot, ultroid_cmd
+from . import get_string, ultroid_bot, ultroid_cmd
 
 
 @ultroid_cmd(pattern="blacklist( (.*)|$)", admins_only=True)
@@ -30,7 +30,6 @@ async def af(e):
     heh = wrd.split(" ")
     for z in heh:
         add_blacklist(int(chat), z.lower())
-    ultroid_bot.add_handler(blacklist, events.NewMessage(incoming=True))
     await e.eor(get_string("blk_2").format(wrd))
 
 
@@ -56,14 +55,11 @@ async def lsnote(e):
 
 
 async def blacklist(e):
-    if x := get_blacklist(e.chat_id):
-        text = e.text.lower().split()
-        if any((z in text) for z in x):
-            try:
-                await e.delete()
-            except BaseException:
-                pass
+    if is_blacklisted(e.chat_id, e.lower):
+        try:
+            await e.delete()
+        except BaseException:
+            pass
 
 
-if udB.get_key("BLACKLIST_DB"):
-    ultroid_bot.add_handler(blacklist, events.NewMessage(incoming=True))
+ultroid_bot.router.subscribe(blacklist, feature="blacklist", incoming=True)
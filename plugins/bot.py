@@ -215,6 +215,7 @@ async def restartbt(ult):
         return await restart(ok)
     await bash("git pull && pip3 install -r requirements.txt")
     await bash("pip3 install -r requirements.txt --break-system-packages")
+    udB.flush()
     if len(sys.argv) > 1:
         os.execl(sys.executable, sys.executable, "main.py")
     else:
@@ -10,14 +10,22 @@ from . import get_help
 
 __doc__ = get_help("help_broadcast")
 
-import asyncio
 import io
 
 from telethon.utils import get_display_name
 
 from pyUltroid.dB.base import KeyManager
 
-from . import HNDLR, LOGS, eor, get_string, udB, ultroid_bot, ultroid_cmd
+from . import (
+    HNDLR,
+    LOGS,
+    eor,
+    get_string,
+    scheduler,
+    udB,
+    ultroid_bot,
+    ultroid_cmd,
+)
 
 KeyM = KeyManager("BROADCAST", cast=list)
 
@@ -61,8 +69,7 @@ async def broadcast_adder(event):
             if not KeyM.contains(channel_id):
                 KeyM.add(channel_id)
         await x.edit(get_string("bd_4"))
-        await asyncio.sleep(3)
-        await event.delete()
+        scheduler.delete_later(event, 3)
         return
     chat_id = event.chat_id
     if chat_id == udB.get_key("LOG_CHANNEL"):
@@ -73,8 +80,7 @@ async def broadcast_adder(event):
         await x.edit(get_string("bd_5"))
     else:
         await x.edit(get_string("sf_8"))
-    await asyncio.sleep(3)
-    await x.delete()
+    scheduler.delete_later(x, 3)
 
 
 @ultroid_cmd(
@@ -94,8 +100,7 @@ async def broadcast_remover(event):
         await x.edit(get_string("bd_7"))
     else:
         await x.edit(get_string("bd_9"))
-    await asyncio.sleep(3)
-    await x.delete()
+    scheduler.delete_later(x, 3)
 
 
 @ultroid_cmd(
@@ -13,11 +13,11 @@ import asyncio
 import io
 
 from telethon.errors.rpcerrorlist import FloodWaitError
-from telethon.utils import get_display_name, get_peer_id
+from telethon.utils import get_display_name
 
 from pyUltroid.dB.base import KeyManager
 
-from . import LOGS, asst, eor, events, get_string, udB, ultroid_bot, ultroid_cmd
+from . import LOGS, asst, eor, get_string, udB, ultroid_bot, ultroid_cmd
 
 ERROR = {}
 SourceM = KeyManager("CH_SOURCE", cast=list)
@@ -25,12 +25,6 @@ DestiM = KeyManager("CH_DESTINATIONS", cast=list)
 
 
 async def autopost_func(e):
-    if not udB.get_key("AUTOPOST"):
-        return
-    x = SourceM.get()
-    th = await e.get_chat()
-    if get_peer_id(th) not in x:
-        return
     y = DestiM.get()
     for ys in y:
         try:
@@ -85,7 +79,6 @@ async def source(e):
     if not SourceM.contains(y):
         SourceM.add(y)
         await e.eor(get_string("cha_2"))
-        ultroid_bot.add_handler(autopost_func, events.NewMessage())
     else:
         await e.eor(get_string("cha_3"))
 
@@ -220,5 +213,6 @@ async def list_all(event):
         await x.edit(msg)
 
 
-if udB.get_key("AUTOPOST"):
-    ultroid_bot.add_handler(autopost_func, events.NewMessage())
+ultroid_bot.router.subscribe(
+    autopost_func, func=lambda e: udB.get_key("AUTOPOST") and SourceM.contains(e.chat_id)
+)
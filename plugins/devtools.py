@@ -18,7 +18,7 @@ from pprint import pprint
 
 from telethon.utils import get_display_name
 
-from pyUltroid import _ignore_eval
+from pyUltroid._misc import SUDO_M
 
 from . import *
 
@@ -242,7 +242,7 @@ async def _(event):
         await warning.reply(
             f"Malicious Activities suspected by {inline_mention(await event.get_sender())}"
         )
-        _ignore_eval.append(event.sender_id)
+        SUDO_M.ignore(event.sender_id)
         return await xx.edit(
             "`Malicious Activities suspected⚠️!\nReported to owner. Aborted this request!`"
         )
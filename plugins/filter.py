@@ -10,15 +10,20 @@ from . import get_help
 __doc__ = get_help("help_filter")
 
 import os
-import re
 
 from telethon.tl.types import User
 from telethon.utils import pack_bot_file_id
 
-from pyUltroid.dB.filter_db import add_filter, get_filter, list_filter, rem_filter
+from pyUltroid.dB.filter_db import (
+    add_filter,
+    find_filters,
+    get_filter,
+    list_filter,
+    rem_filter,
+)
 from pyUltroid.fns.tools import create_tl_btn, format_btn, get_msg_button
 
-from . import events, get_string, mediainfo, udB, ultroid_bot, ultroid_cmd, upload_file
+from . import get_string, mediainfo, ultroid_bot, ultroid_cmd, upload_file
 from ._inline import something
 
 
@@ -57,7 +62,6 @@ async def af(e):
             txt, btn = get_msg_button(wt.text)
         add_filter(chat, wrd, txt, None, btn)
     await e.eor(get_string("flr_4").format(wrd))
-    ultroid_bot.add_handler(filter_func, events.NewMessage())
 
 
 @ultroid_cmd(pattern="remfilter( (.*)|$)")
@@ -81,20 +85,16 @@ async def lsnote(e):
 async def filter_func(e):
     if isinstance(e.sender, User) and e.sender.bot:
         return
-    xx = (e.text).lower()
     chat = e.chat_id
     if x := get_filter(chat):
-        for c in x:
-            pat = r"( |^|[^\w])" + re.escape(c) + r"( |$|[^\w])"
-            if re.search(pat, xx):
-                if k := x.get(c):
-                    msg = k["msg"]
-                    media = k["media"]
-                    if k.get("button"):
-                        btn = create_tl_btn(k["button"])
-                        return await something(e, msg, media, btn)
-                    await e.reply(msg, file=media)
-
-
-if udB.get_key("FILTERS"):
-    ultroid_bot.add_handler(filter_func, events.NewMessage())
+        for c in find_filters(chat, e.lower):
+            if k := x.get(c):
+                msg = k["msg"]
+                media = k["media"]
+                if k.get("button"):
+                    btn = create_tl_btn(k["button"])
+                    return await something(e, msg, media, btn)
+                await e.reply(msg, file=media)
+
+
+ultroid_bot.router.subscribe(filter_func, feature="filters")
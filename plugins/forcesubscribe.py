@@ -39,11 +39,9 @@ from . import (
     LOGS,
     asst,
     callback,
-    events,
     get_string,
     in_pattern,
     inline_mention,
-    udB,
     ultroid_bot,
     ultroid_cmd,
 )
@@ -62,7 +60,6 @@ async def addfor(e):
         return await e.eor(get_string("fsub_2"), time=5)
     add_forcesub(e.chat_id, match)
     await e.eor("Added ForceSub in This Chat !")
-    ultroid_bot.add_handler(force_sub, events.NewMessage(incoming=True))
 
 
 @ultroid_cmd(pattern="remfsub$")
@@ -132,8 +129,6 @@ async def diesoon(e):
 
 
 async def force_sub(ult):
-    if not udB.get_key("FORCESUB"):
-        return
     user = await ult.get_sender()
     joinchat = get_forcesetting(ult.chat_id)
     if (not joinchat) or (isinstance(user, User) and user.bot):
@@ -175,5 +170,4 @@ async def force_sub(ult):
     await res[0].click(ult.chat_id, reply_to=ult.id)
 
 
-if udB.get_key("FORCESUB"):
-    ultroid_bot.add_handler(force_sub, events.NewMessage(incoming=True))
+ultroid_bot.router.subscribe(force_sub, feature="forcesub", incoming=True)
@@ -90,7 +90,7 @@ _gdemote_rights = ChatAdminRights(
     pin_messages=False,
 )
 
-keym = KeyManager("GBLACKLISTS", cast=list)
+keym = KeyManager("GBLACKLISTS", cast=set)
 
 
 @ultroid_cmd(pattern="gpromote( (.*)|$)", fullsudo=True)
@@ -716,9 +716,8 @@ async def gstat_(e):
         return await xx.eor("`Reply to some msg or add their id.`", time=5)
     name = (await e.client.get_entity(userid)).first_name
     msg = f"**{name} is "
-    is_banned = is_gbanned(userid)
-    reason = list_gbanned().get(userid)
-    if is_banned:
+    reason = is_gbanned(userid)
+    if reason:
         msg += "Globally Banned"
         msg += f" with reason** `{reason}`" if reason else ".**"
     else:
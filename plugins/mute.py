@@ -27,7 +27,6 @@
     Mute user in current chat with time.
 """
 
-from telethon import events
 from telethon.utils import get_display_name
 
 from pyUltroid.dB.mute_db import is_muted, mute, unmute
@@ -36,7 +35,6 @@ from pyUltroid.fns.admins import ban_time
 from . import asst, eod, get_string, inline_mention, ultroid_bot, ultroid_cmd
 
 
-@ultroid_bot.on(events.NewMessage(incoming=True))
 async def watcher(event):
     if is_muted(event.chat_id, event.sender_id):
         await event.delete()
@@ -44,6 +42,9 @@ async def watcher(event):
         await event.delete()
 
 
+ultroid_bot.router.subscribe(watcher, feature="mute", incoming=True)
+
+
 @ultroid_cmd(
     pattern="dmute( (.*)|$)",
 )
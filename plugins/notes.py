@@ -26,10 +26,10 @@ import os
 from . import upload_file as uf
 from telethon.utils import pack_bot_file_id
 
-from pyUltroid.dB.notes_db import add_note, get_notes, list_note, rem_note
+from pyUltroid.dB.notes_db import add_note, find_notes, get_notes, list_note, rem_note
 from pyUltroid.fns.tools import create_tl_btn, format_btn, get_msg_button
 
-from . import events, get_string, mediainfo, udB, ultroid_bot, ultroid_cmd
+from . import get_string, mediainfo, ultroid_bot, ultroid_cmd
 from ._inline import something
 
 
@@ -70,7 +70,6 @@ async def an(e):
             txt, btn = get_msg_button(wt.text)
         add_note(chat, wrd, txt, None, btn)
     await e.eor(get_string("notes_2").format(wrd))
-    ultroid_bot.add_handler(notes, events.NewMessage())
 
 
 @ultroid_cmd(pattern="remnote( (.*)|$)", admins_only=True)
@@ -94,8 +93,7 @@ async def lsnote(e):
 
 
 async def notes(e):
-    xx = [z.replace("#", "") for z in e.text.lower().split() if z.startswith("#")]
-    for word in xx:
+    for word in find_notes(e.chat_id, e.lower):
         if k := get_notes(e.chat_id, word):
             msg = k["msg"]
             media = k["media"]
@@ -107,5 +105,4 @@ async def notes(e):
             )
 
 
-if udB.get_key("NOTE"):
-    ultroid_bot.add_handler(notes, events.NewMessage())
+ultroid_bot.router.subscribe(notes, feature="notes", func=lambda e: "#" in e.lower)
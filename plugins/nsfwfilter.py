@@ -25,7 +25,7 @@ except ImportError:
     LOGS.error("nsfwfilter: 'Profanitydetector' not installed!")
 from pyUltroid.dB.nsfw_db import is_nsfw, nsfw_chat, rem_nsfw
 
-from . import HNDLR, async_searcher, eor, events, udB, ultroid_bot, ultroid_cmd
+from . import HNDLR, async_searcher, eor, udB, ultroid_bot, ultroid_cmd
 
 
 @ultroid_cmd(pattern="addnsfw( (.*)|$)", admins_only=True)
@@ -38,7 +38,6 @@ async def addnsfw(e):
     if not action or ("ban" or "kick" or "mute") not in action:
         action = "mute"
     nsfw_chat(e.chat_id, action)
-    ultroid_bot.add_handler(nsfw_check, events.NewMessage(incoming=True))
     await e.eor("Added This Chat To Nsfw Filter")
 
 
@@ -145,5 +144,4 @@ async def nsfw_check(e):
                 )
 
 
-if udB.get_key("NSFW"):
-    ultroid_bot.add_handler(nsfw_check, events.NewMessage(incoming=True))
+ultroid_bot.router.subscribe(nsfw_check, feature="nsfw", incoming=True)
@@ -71,8 +71,8 @@ U_WARNS = {}
 if isinstance(udB.get_key("PMPERMIT"), (int, str)):
     value = [udB.get_key("PMPERMIT")]
     udB.set_key("PMPERMIT", value)
-keym = KeyManager("PMPERMIT", cast=list)
-Logm = KeyManager("LOGUSERS", cast=list)
+keym = KeyManager("PMPERMIT", cast=set)
+Logm = KeyManager("LOGUSERS", cast=set)
 PMPIC = udB.get_key("PMPIC")
 LOG_CHANNEL = udB.get_key("LOG_CHANNEL")
 UND = get_string("pmperm_1")
@@ -29,7 +29,7 @@ from pyUltroid._misc import sudoers
 from pyUltroid.dB.snips_db import add_snip, get_snips, list_snip, rem_snip
 from pyUltroid.fns.tools import create_tl_btn, format_btn, get_msg_button
 
-from . import events, get_string, mediainfo, udB, ultroid_bot, ultroid_cmd
+from . import get_string, mediainfo, ultroid_bot, ultroid_cmd
 from ._inline import something
 
 
@@ -69,7 +69,6 @@ async def an(e):
             txt, btn = get_msg_button(wt.text)
         add_snip(wrd, txt, None, btn)
     await e.eor(f"Done : snip `${wrd}` Saved.")
-    ultroid_bot.add_handler(add_snips, events.NewMessage())
 
 
 @ultroid_cmd(pattern="remsnip( (.*)|$)")
@@ -94,7 +93,7 @@ async def lsnote(e):
 async def add_snips(e):
     if not e.out and e.sender_id not in sudoers():
         return
-    xx = [z.replace("$", "") for z in e.text.lower().split() if z.startswith("$")]
+    xx = [z.replace("$", "") for z in e.lower.split() if z.startswith("$")]
     for z in xx:
         if k := get_snips(z):
             msg = k["msg"]
@@ -113,5 +112,4 @@ async def add_snips(e):
                 await ultroid_bot.send_message(e.chat_id, msg, file=media)
 
 
-if udB.get_key("SNIP"):
-    ultroid_bot.add_handler(add_snips, events.NewMessage())
+ultroid_bot.router.subscribe(add_snips, func=lambda e: "$" in e.lower)
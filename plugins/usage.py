@@ -15,6 +15,12 @@
 
 • `{i}usage db`
    Get database storage usage.
+
+• `{i}usage peers`
+   Get hit rates of the user/chat cache.
+
+• `{i}usage tasks`
+   Get queued handlers, pending timers and transfer connections.
 """
 
 import math
@@ -30,7 +36,9 @@ from . import (
     async_searcher,
     get_string,
     humanbytes,
+    scheduler,
     udB,
+    ultroid_bot,
     ultroid_cmd,
 )
 
@@ -61,6 +69,10 @@ async def usage_finder(event):
 
     if opt == "db":
         await x.edit(db_usage())
+    elif opt == "peers":
+        await x.edit(peer_usage())
+    elif opt == "tasks":
+        await x.edit(task_usage())
     elif opt == "heroku":
         is_hk, hk = await heroku_usage()
         await x.edit(hk)
@@ -178,11 +190,47 @@ def db_usage():
     used = udB.usage
     a = f"{humanbytes(used)}/{humanbytes(total)}"
     b = f"{str(round((used / total) * 100, 2))}%"
-    return f"**{udB.name}**\n\n**Storage Used**: `{a}`\n**Usage percentage**: **{b}**"
+    cache = udB.cache_stats()
+    c = (
+        f"{cache['entries']} keys, {humanbytes(cache['bytes'])}, "
+        f"{round(cache['hit_rate'] * 100, 2)}% hits, {cache['evictions']} evicted"
+    )
+    return f"**{udB.name}**\n\n**Storage Used**: `{a}`\n**Usage percentage**: **{b}**\n**Cache**: `{c}`"
+
+
+def peer_usage():
+    if not ultroid_bot.peer_cache:
+        return "**Peer Cache**: `disabled`"
+    text = "**Peer Cache**\n"
+    for name, cache in ultroid_bot.peer_cache.stats().items():
+        text += (
+            f"\n**{name.title()}**: `{cache['entries']} cached, "
+            f"{round(cache['hit_rate'] * 100, 2)}% hits, {cache['expired']} expired`"
+        )
+    return text
+
+
+def task_usage():
+    stats = scheduler.stats()
+    timers = stats["timers"]
+    text = f"**Scheduler**\n\n**Timers**: `{timers['pending']} pending, {timers['fired']} fired`"
+    for name, queue in stats["queues"].items():
+        text += (
+            f"\n**{name.title()}**: `{queue['running']}/{queue['limit']} running, "
+            f"{queue['depth']} queued (max {queue['max_depth']}), "
+            f"{queue['dropped']} dropped, {queue['merged']} merged`"
+        )
+    if ultroid_bot.sender_pool:
+        pool = ultroid_bot.sender_pool.stats()
+        text += (
+            f"\n**Transfer Connections**: `{pool['leased']} in use, {pool['idle']} idle, "
+            f"{round(pool['hit_rate'] * 100, 2)}% reused ({pool['hits']}/{pool['hits'] + pool['misses']})`"
+        )
+    return text
 
 
 async def get_full_usage():
     is_hk, hk = await heroku_usage()
     her = hk if is_hk else ""
     rd = db_usage()
-    return her + "\n\n" + rd
+    return her + "\n\n" + rd + "\n\n" + peer_usage() + "\n\n" + task_usage()
@@ -24,6 +24,7 @@ if run_as_module:
     from .configs import Var
     from .startup import *
     from .startup._database import UltroidDB
+    from .startup._scheduler import scheduler
     from .startup.BaseClient import UltroidClient
     from .startup.connections import validate_session, vc_connection
     from .startup.funcs import _version_changes, autobot, enable_inline, update_envs
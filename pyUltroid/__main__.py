@@ -37,6 +37,7 @@ def main():
     ):
         ultroid_bot.run_in_loop(bash("bash installer.sh"))
 
+        udB.flush()
         os.execl(sys.executable, sys.executable, "-m", "pyUltroid")
 
     ultroid_bot.run_in_loop(startup_stuff())
@@ -12,19 +12,65 @@ CMD_HELP = {}
 # ----------------------------------------------#
 
 
+def _user_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class _Permissions:
+    """Who may use the bot, as frozensets, from one read of the database."""
+
+    __slots__ = ("owner", "sudos", "owner_and_sudos", "fullsudos", "ignored")
+
+    def __init__(self, owner, sudos, fullsudos, ignored):
+        owner = {owner} if owner else set()
+        self.owner = frozenset(owner)
+        self.sudos = frozenset(sudos)
+        self.owner_and_sudos = self.owner | self.sudos
+        self.fullsudos = self.owner | frozenset(fullsudos)
+        self.ignored = frozenset(ignored)
+
+
 class _SudoManager:
+    # Keys the snapshot is made of, it's dropped when this process writes
+    # one of them (see udB.watch). Another process, e.g. of multi_client.py,
+    # changing them is only noticed with DB_SYNC on, or after a restart.
+    KEYS = ("OWNER_ID", "SUDOS", "FULLSUDO")
+
     def __init__(self):
         self.db = None
         self.owner = None
-        self._owner_sudos = []
+        self._snapshot = None
 
     def _init_db(self):
         if not self.db:
             from .. import udB
 
             self.db = udB
+            udB.watch(self.KEYS, self.invalidate)
         return self.db
 
+    def invalidate(self, *_):
+        self._snapshot = None
+
+    @property
+    def snapshot(self):
+        """The current _Permissions, read again after a write to KEYS."""
+        if self._snapshot is None:
+            from .. import _ignore_eval
+
+            db = self._init_db()
+            self.owner = _user_id(db.get_key("OWNER_ID"))
+            self._snapshot = _Permissions(
+                self.owner,
+                map(_user_id, self.get_sudos()),
+                map(_user_id, str(db.get_key("FULLSUDO") or "").split()),
+                _ignore_eval,
+            )
+        return self._snapshot
+
     def get_sudos(self):
         db = self._init_db()
         SUDOS = db.get_key("SUDOS")
@@ -36,25 +82,24 @@ class _SudoManager:
         return db.get_key("SUDO")
 
     def owner_and_sudos(self):
-        if not self.owner:
-            db = self._init_db()
-            self.owner = db.get_key("OWNER_ID")
-        return [self.owner, *self.get_sudos()]
+        return self.snapshot.owner_and_sudos
 
     @property
     def fullsudos(self):
-        db = self._init_db()
-        fsudos = db.get("FULLSUDO")
-        if not self.owner:
-            self.owner = db.get_key("OWNER_ID")
-        if not fsudos:
-            return [self.owner]
-        fsudos = fsudos.split()
-        fsudos.append(self.owner)
-        return [int(_) for _ in fsudos]
+        return self.snapshot.fullsudos
 
     def is_sudo(self, id_):
-        return bool(id_ in self.get_sudos())
+        return id_ in self.snapshot.sudos
+
+    def is_ignored(self, id_):
+        return id_ in self.snapshot.ignored
+
+    def ignore(self, id_):
+        """Stop taking commands from `id_` until restart."""
+        from .. import _ignore_eval
+
+        _ignore_eval.append(id_)
+        self.invalidate()
 
 
 SUDO_M = _SudoManager()
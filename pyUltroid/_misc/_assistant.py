@@ -72,11 +72,13 @@ def callback(data=None, from_users=[], admins=False, owner=False, **kwargs):
         from_users.remove("me")
         from_users.append(ultroid_bot.uid)
 
+    users = frozenset(from_users)
+
     def ultr(func):
         async def wrapper(event):
             if admins and not await admin_check(event):
                 return
-            if from_users and event.sender_id not in from_users:
+            if users and event.sender_id not in users:
                 return await event.answer("Not for You!", alert=True)
             if owner and event.sender_id not in owner_and_sudos():
                 return await event.answer(f"This is {OWNER}'s bot!!")
@@ -143,7 +145,9 @@ def in_pattern(pattern=None, owner=False, **kwargs):
                     LOGS.exception(err)
                 except Exception as er:
                     LOGS.exception(er)
-                    await asst.send_message(udB.get_key("LOG_CHANNEL"), error_text())
+                    await asst.send_message(
+                        await udB.aget_key("LOG_CHANNEL"), error_text()
+                    )
 
         asst.add_event_handler(wrapper, InlineQuery(pattern=pattern, **kwargs))
 
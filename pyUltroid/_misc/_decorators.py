@@ -31,14 +31,13 @@ from telethon.errors.rpcerrorlist import (
     MessageNotModifiedError,
     UserIsBotError,
 )
-from telethon.events import MessageEdited, NewMessage
+from telethon.events import MessageEdited
 from telethon.utils import get_display_name
 
 from pyUltroid.exceptions import DependencyMissingError
 from strings import get_string
 
 from .. import *
-from .. import _ignore_eval
 from ..dB import DEVLIST
 from ..dB._core import LIST, LOADED
 from ..fns.admins import admin_check
@@ -46,7 +45,7 @@ from ..fns.helper import bash
 from ..fns.helper import time_formatter as tf
 from ..version import __version__ as pyver
 from ..version import ultroid_version as ult_ver
-from . import SUDO_M, owner_and_sudos
+from . import SUDO_M
 from ._wrappers import eod
 
 MANAGER = udB.get_key("MANAGER")
@@ -81,14 +80,15 @@ def ultroid_cmd(
             if not ult.out:
                 if owner_only:
                     return
-                if ult.sender_id not in owner_and_sudos():
+                perms = SUDO_M.snapshot
+                if ult.sender_id not in perms.owner_and_sudos:
                     return
-                if ult.sender_id in _ignore_eval:
+                if ult.sender_id in perms.ignored:
                     return await eod(
                         ult,
                         get_string("py_d1"),
                     )
-                if fullsudo and ult.sender_id not in SUDO_M.fullsudos:
+                if fullsudo and ult.sender_id not in perms.fullsudos:
                     return await eod(ult, get_string("py_d2"), time=15)
             chat = ult.chat
             if hasattr(chat, "title"):
@@ -102,7 +102,7 @@ def ultroid_cmd(
                 return await eod(ult, get_string("py_d3"))
             elif admins_only and not (chat.admin_rights or chat.creator):
                 return await eod(ult, get_string("py_d5"))
-            if only_devs and not udB.get_key("I_DEV"):
+            if only_devs and not await udB.aget_key("I_DEV"):
                 return await eod(
                     ult,
                     get_string("py_d4").format(HNDLR),
@@ -112,14 +112,14 @@ def ultroid_cmd(
                 await dec(ult)
             except FloodWaitError as fwerr:
                 await asst.send_message(
-                    udB.get_key("LOG_CHANNEL"),
+                    await udB.aget_key("LOG_CHANNEL"),
                     f"`FloodWaitError:\n{str(fwerr)}\n\nSleeping for {tf((fwerr.seconds + 10) * 1000)}`",
                 )
                 await ultroid_bot.disconnect()
                 await asyncio.sleep(fwerr.seconds + 10)
                 await ultroid_bot.connect()
                 await asst.send_message(
-                    udB.get_key("LOG_CHANNEL"),
+                    await udB.aget_key("LOG_CHANNEL"),
                     "`Bot is working again`",
                 )
                 return
@@ -145,7 +145,7 @@ def ultroid_cmd(
             except AuthKeyDuplicatedError as er:
                 LOGS.exception(er)
                 await asst.send_message(
-                    udB.get_key("LOG_CHANNEL"),
+                    await udB.aget_key("LOG_CHANNEL"),
                     "Session String expired, create new session from 👇",
                     buttons=[
                         Button.url("Bot", "t.me/SessionGeneratorBot?start="),
@@ -192,13 +192,13 @@ def ultroid_cmd(
                     with BytesIO(ftext.encode()) as file:
                         file.name = "logs.txt"
                         error_log = await asst.send_file(
-                            udB.get_key("LOG_CHANNEL"),
+                            await udB.aget_key("LOG_CHANNEL"),
                             file,
                             caption="**Ultroid Client Error:** `Forward this to` @UltroidSupportChat\n\n",
                         )
                 else:
                     error_log = await asst.send_message(
-                        udB.get_key("LOG_CHANNEL"),
+                        await udB.aget_key("LOG_CHANNEL"),
                         ftext,
                     )
                 if ult.out:
@@ -218,44 +218,42 @@ def ultroid_cmd(
         if _add_new:
             if pattern:
                 cmd = compile_pattern(pattern, SUDO_HNDLR)
-            ultroid_bot.add_event_handler(
+            ultroid_bot.commands.add(
                 wrapp,
-                NewMessage(
-                    pattern=cmd,
-                    incoming=True,
-                    forwards=False,
-                    func=func,
-                    chats=chats,
-                    blacklist_chats=blacklist_chats,
-                ),
-            )
-        if pattern:
-            cmd = compile_pattern(pattern, HNDLR)
-        ultroid_bot.add_event_handler(
-            wrapp,
-            NewMessage(
-                outgoing=True if _add_new else None,
-                pattern=cmd,
+                cmd,
+                incoming=True,
                 forwards=False,
                 func=func,
+                module=dec.__module__,
                 chats=chats,
                 blacklist_chats=blacklist_chats,
-            ),
+            )
+        if pattern:
+            cmd = compile_pattern(pattern, HNDLR)
+        ultroid_bot.commands.add(
+            wrapp,
+            cmd,
+            outgoing=True if _add_new else None,
+            forwards=False,
+            func=func,
+            module=dec.__module__,
+            chats=chats,
+            blacklist_chats=blacklist_chats,
         )
         if TAKE_EDITS:
 
             def func_(x):
                 return not x.via_bot_id and not (x.is_channel and x.chat.broadcast)
 
-            ultroid_bot.add_event_handler(
+            ultroid_bot.commands.add(
                 wrapp,
-                MessageEdited(
-                    pattern=cmd,
-                    forwards=False,
-                    func=func_,
-                    chats=chats,
-                    blacklist_chats=blacklist_chats,
-                ),
+                cmd,
+                MessageEdited,
+                forwards=False,
+                func=func_,
+                module=dec.__module__,
+                chats=chats,
+                blacklist_chats=blacklist_chats,
             )
         if manager and MANAGER:
             allow_all = kwargs.get("allow_all", False)
@@ -270,7 +268,7 @@ def ultroid_cmd(
                 try:
                     await dec(ult)
                 except Exception as er:
-                    if chat := udB.get_key("MANAGER_LOG"):
+                    if chat := await udB.aget_key("MANAGER_LOG"):
                         text = f"**#MANAGER_LOG\n\nChat:** `{get_display_name(ult.chat)}` `{ult.chat_id}`"
                         text += f"\n**Replied :** `{ult.is_reply}`\n**Command :** {ult.text}\n\n**Error :** `{er}`"
                         try:
@@ -284,30 +282,28 @@ def ultroid_cmd(
 
             if pattern:
                 cmd = compile_pattern(pattern, "/")
-            asst.add_event_handler(
+            asst.commands.add(
                 manager_cmd,
-                NewMessage(
-                    pattern=cmd,
-                    forwards=False,
-                    incoming=True,
-                    func=func,
-                    chats=chats,
-                    blacklist_chats=blacklist_chats,
-                ),
+                cmd,
+                forwards=False,
+                incoming=True,
+                func=func,
+                module=dec.__module__,
+                chats=chats,
+                blacklist_chats=blacklist_chats,
             )
         if DUAL_MODE and not (manager and DUAL_HNDLR == "/"):
             if pattern:
                 cmd = compile_pattern(pattern, DUAL_HNDLR)
-            asst.add_event_handler(
+            asst.commands.add(
                 wrapp,
-                NewMessage(
-                    pattern=cmd,
-                    incoming=True,
-                    forwards=False,
-                    func=func,
-                    chats=chats,
-                    blacklist_chats=blacklist_chats,
-                ),
+                cmd,
+                incoming=True,
+                forwards=False,
+                func=func,
+                module=dec.__module__,
+                chats=chats,
+                blacklist_chats=blacklist_chats,
             )
         file = Path(inspect.stack()[1].filename)
         if "addons/" in str(file):
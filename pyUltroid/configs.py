@@ -44,11 +44,32 @@ class Var:
     VC_SESSION = config("VC_SESSION", default=None)
     ADDONS = config("ADDONS", default=False, cast=bool)
     VCBOT = config("VCBOT", default=False, cast=bool)
+    # value encoding for the database: msgpack, json or literal
+    DB_CODEC = config("DB_CODEC", default=None)
+    # seconds to hold database writes for batching, 0 writes through
+    DB_WRITE_DELAY = config("DB_WRITE_DELAY", default=0, cast=float)
+    # load every key into the cache on start
+    DB_PRELOAD = config("DB_PRELOAD", default=True, cast=bool)
+    # drop cache entries other processes on the same database write to
+    DB_SYNC = config("DB_SYNC", default=False, cast=bool)
+    # read cache limits, 0 is unbounded; TTL as "300" or "GBAN=3600,USERNAME_DB=600"
+    DB_CACHE_SIZE = config("DB_CACHE_SIZE", default=0, cast=int)
+    DB_CACHE_BYTES = config("DB_CACHE_BYTES", default=0, cast=int)
+    DB_CACHE_TTL = config("DB_CACHE_TTL", default=None)
+    # extra keys to never evict, besides handlers, sudos and LOG_CHANNEL
+    DB_CACHE_PIN = config("DB_CACHE_PIN", default=None)
+    # seconds to keep fetched users/chats (permissions at most 60), 0 disables
+    PEER_CACHE_TTL = config("PEER_CACHE_TTL", default=300, cast=int)
+    PEER_CACHE_SIZE = config("PEER_CACHE_SIZE", default=10000, cast=int)
+    # seconds to keep idle upload/download connections open, 0 disables
+    SENDER_POOL_IDLE = config("SENDER_POOL_IDLE", default=60, cast=int)
     # for railway
     REDISPASSWORD = config("REDISPASSWORD", default=None)
     REDISHOST = config("REDISHOST", default=None)
     REDISPORT = config("REDISPORT", default=None)
     REDISUSER = config("REDISUSER", default=None)
+    # connections shared by the redis client, callers wait when all are busy
+    REDIS_POOL_SIZE = config("REDIS_POOL_SIZE", default=10, cast=int)
     # for sql
     DATABASE_URL = config("DATABASE_URL", default=None)
     # for MONGODB users
@@ -8,25 +8,24 @@
 
 from .. import udB
 
+udB.split_chat_key("ANTIFLOOD", "antiflood")
+
 
 def get_flood():
-    return udB.get_key("ANTIFLOOD") or {}
+    return udB.chat_items("antiflood")
+
+
+def get_flood_chats():
+    return udB.chats("antiflood")
 
 
 def set_flood(chat_id, limit):
-    omk = get_flood()
-    omk.update({chat_id: limit})
-    return udB.set_key("ANTIFLOOD", omk)
+    return udB.chat(chat_id).set("antiflood", limit)
 
 
 def get_flood_limit(chat_id):
-    omk = get_flood()
-    if chat_id in omk.keys():
-        return omk[chat_id]
+    return udB.chat(chat_id).get("antiflood")
 
 
 def rem_flood(chat_id):
-    omk = get_flood()
-    if chat_id in omk.keys():
-        del omk[chat_id]
-        return udB.set_key("ANTIFLOOD", omk)
+    return udB.chat(chat_id).delete("antiflood") or None
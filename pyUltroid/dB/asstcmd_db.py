@@ -10,30 +10,24 @@ from .. import udB
 
 
 def get_stuff():
-    return udB.get_key("ASST_CMDS") or {}
+    return udB.hgetall("ASST_CMDS")
 
 
 def add_cmd(cmd, msg, media, button):
-    ok = get_stuff()
-    ok.update({cmd: {"msg": msg, "media": media, "button": button}})
-    return udB.set_key("ASST_CMDS", ok)
+    return udB.hset("ASST_CMDS", cmd, {"msg": msg, "media": media, "button": button})
 
 
 def rem_cmd(cmd):
-    ok = get_stuff()
-    if ok.get(cmd):
-        ok.pop(cmd)
-        return udB.set_key("ASST_CMDS", ok)
+    if udB.hget("ASST_CMDS", cmd):
+        return udB.hdel("ASST_CMDS", cmd)
 
 
 def cmd_reply(cmd):
-    ok = get_stuff()
-    if ok.get(cmd):
-        okk = ok[cmd]
-        return okk["msg"], okk["media"], okk["button"] if ok.get("button") else None
+    okk = udB.hget("ASST_CMDS", cmd)
+    if okk:
+        return okk["msg"], okk["media"], okk["button"] if okk.get("button") else None
     return
 
 
 def list_cmds():
-    ok = get_stuff()
-    return ok.keys()
+    return udB.hkeys("ASST_CMDS")
@@ -1,12 +1,27 @@
+import sys
+from array import array
+from bisect import bisect_left, insort
+from heapq import merge
+
 from .. import udB
 
 
 class KeyManager:
+    """Manages a list, set or dict stored at `key`.
+
+    Lists (`cast=list`) keep their order and are rewritten on change. Keys
+    only used for membership, where order doesn't matter, use `cast=set`:
+    udB keeps them as membership sets, so `contains`, `add` and `remove`
+    are O(1) and only write the changed item. `get` returns their members
+    as a list, in no particular order."""
+
     def __init__(self, key, cast=None) -> None:
         self._key = key
         self._cast = cast
 
     def get(self):
+        if self._cast is set:
+            return udB.smembers(self._key)
         _data = udB.get_key(self._key)
         if self._cast and not isinstance(_data, self._cast):
             return [_data] if self._cast == list else self._cast(_data)
@@ -19,6 +34,8 @@ class KeyManager:
         return len(self.get())
 
     def add(self, item):
+        if self._cast is set:
+            return udB.sadd(self._key, item)
         content = self.get()
         if content == None and callable(type(item)):
             content = type(item)()
@@ -31,6 +48,8 @@ class KeyManager:
         udB.set_key(self._key, content)
 
     def remove(self, item):
+        if self._cast is set:
+            return udB.srem(self._key, item)
         content = self.get()
         if isinstance(content, list) and item in content:
             content.remove(item)
@@ -41,4 +60,242 @@ class KeyManager:
         udB.set_key(self._key, content)
 
     def contains(self, item):
+        if self._cast is set:
+            return udB.sismember(self._key, item)
         return item in self.get()
+
+
+class IdSet:
+    """Sorted set of 64 bit ids packed in an array: 8 bytes an id, O(log n) lookups."""
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids=()):
+        self._ids = array("q", sorted({int(_) for _ in ids}))
+
+    @classmethod
+    def from_bytes(cls, data):
+        self = cls()
+        self._ids.frombytes(data)
+        if sys.byteorder == "big":
+            # stored little endian
+            self._ids.byteswap()
+        return self
+
+    def to_bytes(self):
+        if sys.byteorder == "big":
+            ids = array("q", self._ids)
+            ids.byteswap()
+            return ids.tobytes()
+        return self._ids.tobytes()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, id):
+        index = bisect_left(self._ids, id)
+        return index < len(self._ids) and self._ids[index] == id
+
+    def add(self, id):
+        if id in self:
+            return False
+        insort(self._ids, id)
+        return True
+
+    def discard(self, id):
+        index = bisect_left(self._ids, id)
+        if index < len(self._ids) and self._ids[index] == id:
+            del self._ids[index]
+            return True
+        return False
+
+    def update(self, ids):
+        """Add many ids at once, returns how many were new."""
+        new = {int(_) for _ in ids}
+        new = [_ for _ in new if _ not in self]
+        if new:
+            self._ids = array("q", merge(self._ids, sorted(new)))
+        return len(new)
+
+    def difference_update(self, ids):
+        """Remove many ids at once, returns how many were present."""
+        gone = {int(_) for _ in ids}
+        size = len(self._ids)
+        self._ids = array("q", (_ for _ in self._ids if _ not in gone))
+        return size - len(self._ids)
+
+
+class IdSetKey:
+    """Ids stored as the membership set `key`, read through an IdSet.
+
+    Adding or removing an id writes only that member. The IdSet is an index
+    in memory, built from the members again only when udB reloads them.
+    Bytes, lists of strings and dicts stored by older versions are moved to
+    the set on first read."""
+
+    def __init__(self, key) -> None:
+        self._key = key
+        self._members = None
+        self._set = None
+
+    def _migrate(self):
+        data = udB.get_key(self._key)
+        if isinstance(data, bytes):
+            ids = IdSet.from_bytes(data)
+        elif isinstance(data, (dict, list)) and not all(
+            isinstance(_, int) for _ in data
+        ):
+            ids = IdSet(data)
+        else:
+            return
+        udB.del_key(self._key)
+        udB.sadd_many(self._key, list(ids))
+
+    def get(self):
+        if self._set is None:
+            self._migrate()
+        members = udB.smembers(self._key)
+        if members is not self._members or len(members) != len(self._set):
+            self._set = IdSet(members)
+            self._members = members
+        return self._set
+
+    def add(self, id):
+        if not self.get().add(id):
+            return False
+        udB.sadd(self._key, id)
+        self._members = udB.smembers(self._key)
+        return True
+
+    def discard(self, id):
+        if not self.get().discard(id):
+            return False
+        udB.srem(self._key, id)
+        self._members = udB.smembers(self._key)
+        return True
+
+    def update(self, ids):
+        """Add many ids in one write, returns how many were new."""
+        current = self.get()
+        new = [_ for _ in {int(_) for _ in ids} if _ not in current]
+        if new:
+            current.update(new)
+            udB.sadd_many(self._key, new)
+            self._members = udB.smembers(self._key)
+        return len(new)
+
+
+def _is_word(char):
+    # what \w matches
+    return char.isalnum() or char == "_"
+
+
+class KeywordMatcher:
+    """Finds which of many keywords a text contains, in one pass over it.
+
+    An Aho-Corasick automaton: the keywords are merged into one trie with
+    failure links, so the cost of a search follows the length of the text,
+    not the number of keywords. A keyword only counts where it stands alone:
+    between non-word characters with `boundary="word"` (like the old
+    `( |^|[^\\w])word( |$|[^\\w])` filter regex), between whitespace with
+    `boundary="space"` (like comparing the words of `text.split()`)."""
+
+    __slots__ = ("keywords", "_goto", "_fail", "_out", "_inside")
+
+    def __init__(self, keywords, boundary="word"):
+        self.keywords = list(dict.fromkeys(_ for _ in keywords if _))
+        self._inside = _is_word if boundary == "word" else (lambda c: not c.isspace())
+        self._goto = [{}]
+        self._out = [()]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._out.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state] += (index,)
+        # breadth first, so the failure state of a node is done before it
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._out[child] += self._out[fail]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _scan(self, text):
+        goto, fail, out, inside = self._goto, self._fail, self._out, self._inside
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                start = end - len(self.keywords[index])
+                if (start and inside(text[start - 1])) or (
+                    end < len(text) and inside(text[end])
+                ):
+                    continue
+                yield index
+
+    def find(self, text):
+        """Keywords contained in `text`, in the order they were given."""
+        return [self.keywords[_] for _ in sorted(set(self._scan(text)))]
+
+    def search(self, text):
+        """The first keyword found in `text`, None if there's none."""
+        return next((self.keywords[_] for _ in self._scan(text)), None)
+
+
+class ChatKeywords:
+    """KeywordMatcher of a per-chat feature whose value is keyed by keyword.
+
+    A matcher is built on first use in a chat and kept until the stored
+    value changes. Helpers that change the value in place call `forget`."""
+
+    def __init__(self, name, boundary="word", prefix="") -> None:
+        self._name = name
+        self._boundary = boundary
+        self._prefix = prefix
+        self._matchers = {}
+
+    def get(self, chat):
+        chat = int(chat)
+        data = udB.chat(chat).get(self._name)
+        cached = self._matchers.get(chat)
+        if cached and cached[0] is data:
+            return cached[1]
+        if not data:
+            self._matchers.pop(chat, None)
+            return None
+        matcher = KeywordMatcher(
+            (self._prefix + str(_) for _ in data), boundary=self._boundary
+        )
+        self._matchers[chat] = (data, matcher)
+        return matcher
+
+    def find(self, chat, text):
+        """Keywords of the chat in `text`, without the prefix."""
+        if not (matcher := self.get(chat)):
+            return []
+        return [_[len(self._prefix) :] for _ in matcher.find(text)]
+
+    def search(self, chat, text):
+        if matcher := self.get(chat):
+            if found := matcher.search(text):
+                return found[len(self._prefix) :]
+
+    def forget(self, chat):
+        self._matchers.pop(int(chat), None)
@@ -6,39 +6,55 @@
 # <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
 
 from .. import udB
+from .base import ChatKeywords
+
+udB.split_chat_key("BLACKLIST_DB", "blacklist")
+
+_KEYWORDS = ChatKeywords("blacklist", boundary="space")
 
 
 def get_stuff():
-    return udB.get_key("BLACKLIST_DB") or {}
+    return udB.chat_items("blacklist")
 
 
 def add_blacklist(chat, word):
-    ok = get_stuff()
-    if ok.get(chat):
+    store = udB.chat(chat)
+    ok = store.get("blacklist")
+    if ok:
         for z in word.split():
-            if z not in ok[chat]:
-                ok[chat].append(z)
+            if z not in ok:
+                ok.append(z)
     else:
-        ok.update({chat: [word]})
-    return udB.set_key("BLACKLIST_DB", ok)
+        ok = [word]
+    _KEYWORDS.forget(chat)
+    return store.set("blacklist", ok)
 
 
 def rem_blacklist(chat, word):
-    ok = get_stuff()
-    if ok.get(chat) and word in ok[chat]:
-        ok[chat].remove(word)
-        return udB.set_key("BLACKLIST_DB", ok)
+    store = udB.chat(chat)
+    ok = store.get("blacklist")
+    if ok and word in ok:
+        ok.remove(word)
+        _KEYWORDS.forget(chat)
+        if not ok:
+            return store.delete("blacklist")
+        return store.set("blacklist", ok)
 
 
 def list_blacklist(chat):
-    ok = get_stuff()
-    if ok.get(chat):
-        txt = "".join(f"👉`{z}`\n" for z in ok[chat])
+    ok = udB.chat(chat).get("blacklist")
+    if ok:
+        txt = "".join(f"👉`{z}`\n" for z in ok)
         if txt:
             return txt
 
 
 def get_blacklist(chat):
-    ok = get_stuff()
-    if ok.get(chat):
-        return ok[chat]
+    ok = udB.chat(chat).get("blacklist")
+    if ok:
+        return ok
+
+
+def is_blacklisted(chat, text):
+    """The first blacklisted word of the chat in `text`, None if there's none."""
+    return _KEYWORDS.search(chat, text)
@@ -10,32 +10,26 @@ from .. import udB
 
 
 def get_stuff():
-    return udB.get_key("BOTCHAT") or {}
+    return udB.hgetall("BOTCHAT")
 
 
 def add_stuff(msg_id, user_id):
-    ok = get_stuff()
-    ok.update({msg_id: user_id})
-    return udB.set_key("BOTCHAT", ok)
+    return udB.hset("BOTCHAT", msg_id, user_id)
 
 
 def get_who(msg_id):
-    ok = get_stuff()
-    if ok.get(msg_id):
-        return ok[msg_id]
+    return udB.hget("BOTCHAT", msg_id)
 
 
 def tag_add(msg, chat, user):
-    ok = get_stuff()
-    if not ok.get("TAG"):
-        ok.update({"TAG": {msg: [chat, user]}})
-    else:
-        ok["TAG"].update({msg: [chat, user]})
-    return udB.set_key("BOTCHAT", ok)
+    return udB.hset("BOTCHAT_TAG", msg, [chat, user])
 
 
 def who_tag(msg):
-    ok = get_stuff()
-    if ok.get("TAG") and ok["TAG"].get(msg):
-        return ok["TAG"][msg]
+    if tag := udB.hget("BOTCHAT_TAG", msg):
+        return tag
+    # Tags logged before BOTCHAT_TAG existed.
+    old = udB.hget("BOTCHAT", "TAG")
+    if old and old.get(msg):
+        return old[msg]
     return False, False
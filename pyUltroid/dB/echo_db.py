@@ -7,37 +7,33 @@
 
 from .. import udB
 
+udB.split_chat_key("ECHO", "echo")
+
 
 def get_stuff():
-    return udB.get_key("ECHO") or {}
+    return udB.chat_items("echo")
 
 
 def add_echo(chat, user):
-    x = get_stuff()
-    if k := x.get(int(chat)):
-        if user not in k:
-            k.append(int(user))
-        x.update({int(chat): k})
-    else:
-        x.update({int(chat): [int(user)]})
-    return udB.set_key("ECHO", x)
+    store = udB.chat(chat)
+    k = store.get("echo") or []
+    if int(user) not in k:
+        k.append(int(user))
+    return store.set("echo", k)
 
 
 def rem_echo(chat, user):
-    x = get_stuff()
-    if k := x.get(int(chat)):
-        if user in k:
-            k.remove(int(user))
-        x.update({int(chat): k})
-    return udB.set_key("ECHO", x)
+    store = udB.chat(chat)
+    k = store.get("echo")
+    if k and int(user) in k:
+        k.remove(int(user))
+        return store.set("echo", k) if k else store.delete("echo")
 
 
 def check_echo(chat, user):
-    x = get_stuff()
-    if (k := x.get(int(chat))) and int(user) in k:
+    if (k := udB.chat(chat).get("echo")) and int(user) in k:
         return True
 
 
 def list_echo(chat):
-    x = get_stuff()
-    return x.get(int(chat))
+    return udB.chat(chat).get("echo")
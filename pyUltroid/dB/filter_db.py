@@ -6,42 +6,51 @@
 # <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
 
 from .. import udB
+from .base import ChatKeywords
+
+udB.split_chat_key("FILTERS", "filters")
+
+_KEYWORDS = ChatKeywords("filters")
 
 
 def get_stuff():
-    return udB.get_key("FILTERS") or {}
+    return udB.chat_items("filters")
 
 
 def add_filter(chat, word, msg, media, button):
-    ok = get_stuff()
-    if ok.get(chat):
-        ok[chat].update({word: {"msg": msg, "media": media, "button": button}})
-    else:
-        ok.update({chat: {word: {"msg": msg, "media": media, "button": button}}})
-    udB.set_key("FILTERS", ok)
+    store = udB.chat(chat)
+    ok = store.get("filters") or {}
+    ok.update({word: {"msg": msg, "media": media, "button": button}})
+    store.set("filters", ok)
+    _KEYWORDS.forget(chat)
 
 
 def rem_filter(chat, word):
-    ok = get_stuff()
-    if ok.get(chat) and ok[chat].get(word):
-        ok[chat].pop(word)
-        udB.set_key("FILTERS", ok)
+    store = udB.chat(chat)
+    ok = store.get("filters")
+    if ok and ok.get(word):
+        ok.pop(word)
+        if ok:
+            store.set("filters", ok)
+        else:
+            store.delete("filters")
+        _KEYWORDS.forget(chat)
 
 
 def rem_all_filter(chat):
-    ok = get_stuff()
-    if ok.get(chat):
-        ok.pop(chat)
-        udB.set_key("FILTERS", ok)
+    udB.chat(chat).delete("filters")
 
 
 def get_filter(chat):
-    ok = get_stuff()
-    if ok.get(chat):
-        return ok[chat]
+    return udB.chat(chat).get("filters")
 
 
 def list_filter(chat):
-    ok = get_stuff()
-    if ok.get(chat):
-        return "".join(f"👉 `{z}`\n" for z in ok[chat])
+    ok = udB.chat(chat).get("filters")
+    if ok:
+        return "".join(f"👉 `{z}`\n" for z in ok)
+
+
+def find_filters(chat, text):
+    """Filter words of the chat standing alone in `text`."""
+    return _KEYWORDS.find(chat, text)
@@ -8,28 +8,20 @@
 
 from .. import udB
 
+udB.split_chat_key("FORCESUB", "forcesub")
+
 
 def get_chats():
-    return udB.get_key("FORCESUB") or {}
+    return udB.chat_items("forcesub")
 
 
 def add_forcesub(chat_id, chattojoin):
-    omk = get_chats()
-    omk.update({chat_id: chattojoin})
-    return udB.set_key("FORCESUB", omk)
+    return udB.chat(chat_id).set("forcesub", chattojoin)
 
 
 def get_forcesetting(chat_id):
-    omk = get_chats()
-    if chat_id in omk.keys():
-        return omk[chat_id]
+    return udB.chat(chat_id).get("forcesub")
 
 
 def rem_forcesub(chat_id):
-    omk = get_chats()
-    if chat_id in omk.keys():
-        try:
-            del omk[chat_id]
-            return udB.set_key("FORCESUB", omk)
-        except KeyError:
-            return False
+    return udB.chat(chat_id).delete("forcesub") or None
@@ -6,47 +6,92 @@
 # <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
 
 from .. import udB
+from .base import IdSet, IdSetKey
+
+# Ids are kept in membership sets, one member a user, and checked on every
+# join through a compact IdSet. Gban reasons stay in the GBAN collection,
+# which is only read once a gbanned user shows up.
+_GBANNED = IdSetKey("GBAN_IDS")
+_GMUTED = IdSetKey("GMUTE")
+
+_NO_REASON = "No Reason. "
+
+if udB.get_key("GBAN_IDS") is None and (_users := udB.hkeys("GBAN")):
+    _GBANNED.update(_users)
+
+
+def _ids(users):
+    return IdSet.from_bytes(users) if isinstance(users, bytes) else users
 
 
 def list_gbanned():
-    return udB.get_key("GBAN") or {}
+    reasons = udB.hgetall("GBAN")
+    return {user: reasons.get(user, _NO_REASON) for user in _GBANNED.get()}
 
 
 def gban(user, reason):
-    ok = list_gbanned()
-    ok.update({int(user): reason or "No Reason. "})
-    return udB.set_key("GBAN", ok)
+    _GBANNED.add(int(user))
+    if reason:
+        return udB.hset("GBAN", int(user), reason)
+    udB.hdel("GBAN", int(user))
+    return True
 
 
 def ungban(user):
-    ok = list_gbanned()
-    if ok.get(int(user)):
-        del ok[int(user)]
-        return udB.set_key("GBAN", ok)
+    if _GBANNED.discard(int(user)):
+        udB.hdel("GBAN", int(user))
+        return True
 
 
 def is_gbanned(user):
-    ok = list_gbanned()
-    if ok.get(int(user)):
-        return ok[int(user)]
+    if int(user) in _GBANNED.get():
+        return udB.hget("GBAN", int(user)) or _NO_REASON
+
+
+def import_gbanned(users, reason=None):
+    """
+    Gban many users in one write, for syncing large ban lists.
+
+    `users` are ids, `{id: reason}`, or bytes from export_gbanned().
+    Returns how many users weren't gbanned yet.
+    """
+    users = _ids(users)
+    added = _GBANNED.update(users)
+    if isinstance(users, dict):
+        reasons = {int(user): why for user, why in users.items() if why}
+    else:
+        reasons = dict.fromkeys(map(int, users), reason) if reason else {}
+    udB.hset_many("GBAN", reasons)
+    return added
+
+
+def export_gbanned():
+    """Ids of all gbanned users, 8 bytes each, as accepted by import_gbanned()."""
+    return _GBANNED.get().to_bytes()
 
 
 def gmute(user):
-    ok = list_gmuted()
-    ok.append(int(user))
-    return udB.set_key("GMUTE", ok)
+    _GMUTED.add(int(user))
+    return True
 
 
 def ungmute(user):
-    ok = list_gmuted()
-    if user in ok:
-        ok.remove(int(user))
-        return udB.set_key("GMUTE", ok)
+    if _GMUTED.discard(int(user)):
+        return True
 
 
 def is_gmuted(user):
-    return int(user) in list_gmuted()
+    return int(user) in _GMUTED.get()
 
 
 def list_gmuted():
-    return udB.get_key("GMUTE") or []
+    return list(_GMUTED.get())
+
+
+def import_gmuted(users):
+    """Gmute many users in one write, `users` as for import_gbanned()."""
+    return _GMUTED.update(_ids(users))
+
+
+def export_gmuted():
+    return _GMUTED.get().to_bytes()
@@ -9,58 +9,47 @@ from .. import udB
 
 
 def get_stuff(key=None):
-    return udB.get_key(key) or {}
+    return udB.hgetall(key)
 
 
 def add_welcome(chat, msg, media, button):
-    ok = get_stuff("WELCOME")
-    ok.update({chat: {"welcome": msg, "media": media, "button": button}})
-    return udB.set_key("WELCOME", ok)
+    return udB.hset(
+        "WELCOME", chat, {"welcome": msg, "media": media, "button": button}
+    )
 
 
 def get_welcome(chat):
-    ok = get_stuff("WELCOME")
-    return ok.get(chat)
+    return udB.hget("WELCOME", chat)
 
 
 def delete_welcome(chat):
-    ok = get_stuff("WELCOME")
-    if ok.get(chat):
-        ok.pop(chat)
-        return udB.set_key("WELCOME", ok)
+    if udB.hget("WELCOME", chat):
+        return udB.hdel("WELCOME", chat)
 
 
 def add_goodbye(chat, msg, media, button):
-    ok = get_stuff("GOODBYE")
-    ok.update({chat: {"goodbye": msg, "media": media, "button": button}})
-    return udB.set_key("GOODBYE", ok)
+    return udB.hset(
+        "GOODBYE", chat, {"goodbye": msg, "media": media, "button": button}
+    )
 
 
 def get_goodbye(chat):
-    ok = get_stuff("GOODBYE")
-    return ok.get(chat)
+    return udB.hget("GOODBYE", chat)
 
 
 def delete_goodbye(chat):
-    ok = get_stuff("GOODBYE")
-    if ok.get(chat):
-        ok.pop(chat)
-        return udB.set_key("GOODBYE", ok)
+    if udB.hget("GOODBYE", chat):
+        return udB.hdel("GOODBYE", chat)
 
 
 def add_thanks(chat):
-    x = get_stuff("THANK_MEMBERS")
-    x.update({chat: True})
-    return udB.set_key("THANK_MEMBERS", x)
+    return udB.hset("THANK_MEMBERS", chat, True)
 
 
 def remove_thanks(chat):
-    x = get_stuff("THANK_MEMBERS")
-    if x.get(chat):
-        x.pop(chat)
-        return udB.set_key("THANK_MEMBERS", x)
+    if udB.hget("THANK_MEMBERS", chat):
+        return udB.hdel("THANK_MEMBERS", chat)
 
 
 def must_thank(chat):
-    x = get_stuff("THANK_MEMBERS")
-    return x.get(chat)
+    return udB.hget("THANK_MEMBERS", chat)
@@ -7,28 +7,29 @@
 
 from .. import udB
 
+udB.split_chat_key("MUTE", "mute")
+
 
 def get_muted():
-    return udB.get_key("MUTE") or {}
+    return udB.chat_items("mute")
 
 
 def mute(chat, id):
-    ok = get_muted()
-    if ok.get(chat):
-        if id not in ok[chat]:
-            ok[chat].append(id)
-    else:
-        ok.update({chat: [id]})
-    return udB.set_key("MUTE", ok)
+    store = udB.chat(chat)
+    ok = store.get("mute") or []
+    if id not in ok:
+        ok.append(id)
+    return store.set("mute", ok)
 
 
 def unmute(chat, id):
-    ok = get_muted()
-    if ok.get(chat) and id in ok[chat]:
-        ok[chat].remove(id)
-    return udB.set_key("MUTE", ok)
+    store = udB.chat(chat)
+    ok = store.get("mute")
+    if ok and id in ok:
+        ok.remove(id)
+        return store.set("mute", ok) if ok else store.delete("mute")
 
 
 def is_muted(chat, id):
-    ok = get_muted()
-    return bool(ok.get(chat) and id in ok[chat])
+    ok = udB.chat(chat).get("mute")
+    return bool(ok and id in ok)
@@ -6,42 +6,50 @@
 # <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
 
 from .. import udB
+from .base import ChatKeywords
+
+udB.split_chat_key("NOTE", "notes")
+
+_KEYWORDS = ChatKeywords("notes", boundary="space", prefix="#")
 
 
 def get_stuff():
-    return udB.get_key("NOTE") or {}
+    return udB.chat_items("notes")
 
 
 def add_note(chat, word, msg, media, button):
-    ok = get_stuff()
-    if ok.get(int(chat)):
-        ok[int(chat)].update({word: {"msg": msg, "media": media, "button": button}})
-    else:
-        ok.update({int(chat): {word: {"msg": msg, "media": media, "button": button}}})
-    udB.set_key("NOTE", ok)
+    store = udB.chat(chat)
+    ok = store.get("notes") or {}
+    ok.update({word: {"msg": msg, "media": media, "button": button}})
+    store.set("notes", ok)
+    _KEYWORDS.forget(chat)
 
 
 def rem_note(chat, word):
-    ok = get_stuff()
-    if ok.get(int(chat)) and ok[int(chat)].get(word):
-        ok[int(chat)].pop(word)
-        return udB.set_key("NOTE", ok)
+    store = udB.chat(chat)
+    ok = store.get("notes")
+    if ok and ok.get(word):
+        ok.pop(word)
+        _KEYWORDS.forget(chat)
+        return store.set("notes", ok) if ok else store.delete("notes")
 
 
 def rem_all_note(chat):
-    ok = get_stuff()
-    if ok.get(int(chat)):
-        ok.pop(int(chat))
-        return udB.set_key("NOTE", ok)
+    return udB.chat(chat).delete("notes") or None
 
 
 def get_notes(chat, word):
-    ok = get_stuff()
-    if ok.get(int(chat)) and ok[int(chat)].get(word):
-        return ok[int(chat)][word]
+    ok = udB.chat(chat).get("notes")
+    if ok and ok.get(word):
+        return ok[word]
 
 
 def list_note(chat):
-    ok = get_stuff()
-    if ok.get(int(chat)):
-        return "".join(f"👉 #{z}\n" for z in ok[chat])
+    ok = udB.chat(chat).get("notes")
+    if ok:
+        return "".join(f"👉 #{z}\n" for z in ok)
+
+
+def find_notes(chat, text):
+    """Notes of the chat called with `#note` in `text`."""
+    return _KEYWORDS.find(chat, text)
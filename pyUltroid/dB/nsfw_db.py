@@ -8,44 +8,33 @@
 
 from .. import udB
 
+udB.split_chat_key("NSFW", "nsfw")
+udB.split_chat_key("PROFANITY", "profanity")
+
 
 def get_stuff(key="NSFW"):
-    return udB.get_key(key) or {}
+    return udB.chat_items(key.lower())
 
 
 def nsfw_chat(chat, action):
-    x = get_stuff()
-    x.update({chat: action})
-    return udB.set_key("NSFW", x)
+    return udB.chat(chat).set("nsfw", action)
 
 
 def rem_nsfw(chat):
-    x = get_stuff()
-    if x.get(chat):
-        x.pop(chat)
-        return udB.set_key("NSFW", x)
+    return udB.chat(chat).delete("nsfw") or None
 
 
 def is_nsfw(chat):
-    x = get_stuff()
-    if x.get(chat):
-        return x[chat]
+    return udB.chat(chat).get("nsfw") or None
 
 
 def profan_chat(chat, action):
-    x = get_stuff("PROFANITY")
-    x.update({chat: action})
-    return udB.set_key("PROFANITY", x)
+    return udB.chat(chat).set("profanity", action)
 
 
 def rem_profan(chat):
-    x = get_stuff("PROFANITY")
-    if x.get(chat):
-        x.pop(chat)
-        return udB.set_key("PROFANITY", x)
+    return udB.chat(chat).delete("profanity") or None
 
 
 def is_profan(chat):
-    x = get_stuff("PROFANITY")
-    if x.get(chat):
-        return x[chat]
+    return udB.chat(chat).get("profanity") or None
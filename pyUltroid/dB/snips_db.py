@@ -9,28 +9,21 @@ from .. import udB
 
 
 def get_all_snips():
-    return udB.get_key("SNIP") or {}
+    return udB.hgetall("SNIP")
 
 
 def add_snip(word, msg, media, button):
-    ok = get_all_snips()
-    ok.update({word: {"msg": msg, "media": media, "button": button}})
-    udB.set_key("SNIP", ok)
+    udB.hset("SNIP", word, {"msg": msg, "media": media, "button": button})
 
 
 def rem_snip(word):
-    ok = get_all_snips()
-    if ok.get(word):
-        ok.pop(word)
-        udB.set_key("SNIP", ok)
+    if udB.hget("SNIP", word):
+        udB.hdel("SNIP", word)
 
 
 def get_snips(word):
-    ok = get_all_snips()
-    if ok.get(word):
-        return ok[word]
-    return False
+    return udB.hget("SNIP", word) or False
 
 
 def list_snip():
-    return "".join(f"👉 ${z}\n" for z in get_all_snips())
+    return "".join(f"👉 ${z}\n" for z in udB.hkeys("SNIP"))
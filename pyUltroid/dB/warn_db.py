@@ -7,33 +7,32 @@
 
 from .. import udB
 
+udB.split_chat_key("WARNS", "warns")
+
 
 def get_stuff():
-    return udB.get_key("WARNS") or {}
+    return udB.chat_items("warns")
 
 
 def add_warn(chat, user, count, reason):
-    x = get_stuff()
-    try:
-        x[chat].update({user: [count, reason]})
-    except BaseException:
-        x.update({chat: {user: [count, reason]}})
-    return udB.set_key("WARNS", x)
+    store = udB.chat(chat)
+    x = store.get("warns") or {}
+    x.update({user: [count, reason]})
+    return store.set("warns", x)
 
 
 def warns(chat, user):
-    x = get_stuff()
+    x = udB.chat(chat).get("warns") or {}
     try:
-        count, reason = x[chat][user][0], x[chat][user][1]
+        count, reason = x[user][0], x[user][1]
         return count, reason
     except BaseException:
         return 0, None
 
 
 def reset_warn(chat, user):
-    x = get_stuff()
-    try:
-        x[chat].pop(user)
-        return udB.set_key("WARNS", x)
-    except BaseException:
-        return
+    store = udB.chat(chat)
+    x = store.get("warns")
+    if x and user in x:
+        x.pop(user)
+        return store.set("warns", x) if x else store.delete("warns")
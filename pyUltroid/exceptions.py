@@ -17,3 +17,6 @@ class DependencyMissingError(ImportError): ...
 
 
 class RunningAsFunctionLibError(pyUltroidError): ...
+
+
+class DatabaseCodecError(pyUltroidError): ...
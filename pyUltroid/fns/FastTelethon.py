@@ -20,6 +20,7 @@ from typing import (
 
 from telethon import TelegramClient, helpers, utils
 from telethon.crypto import AuthKey
+from telethon.errors import FloodError
 from telethon.helpers import _maybe_await
 from telethon.network import MTProtoSender
 from telethon.tl.alltlobjects import LAYER
@@ -58,34 +59,40 @@ TypeLocation = Union[
 class DownloadSender:
     client: TelegramClient
     sender: MTProtoSender
-    request: GetFileRequest
-    remaining: int
-    stride: int
+    file: TypeLocation
+    limit: int
+    in_flight: int
 
     def __init__(
         self,
         client: TelegramClient,
         sender: MTProtoSender,
         file: TypeLocation,
-        offset: int,
         limit: int,
-        stride: int,
-        count: int,
     ) -> None:
         self.sender = sender
         self.client = client
-        self.request = GetFileRequest(file, offset=offset, limit=limit)
-        self.stride = stride
-        self.remaining = count
-
-    async def next(self) -> Optional[bytes]:
-        if not self.remaining:
-            return None
-        result = await self.client._call(self.sender, self.request)
-        self.remaining -= 1
-        self.request.offset += self.stride
+        self.file = file
+        self.limit = limit
+        self.in_flight = 0
+
+    def get(self, offset: int) -> Awaitable[bytes]:
+        # counted right away, the request starts when the task runs
+        self.in_flight += 1
+        return self._get(offset)
+
+    async def _get(self, offset: int) -> bytes:
+        try:
+            result = await self.client._call(
+                self.sender, GetFileRequest(self.file, offset=offset, limit=self.limit)
+            )
+        finally:
+            self.in_flight -= 1
         return result.bytes
 
+    async def finish(self) -> None:
+        pass
+
     def disconnect(self) -> Awaitable[None]:
         return self.sender.disconnect()
 
@@ -131,12 +138,136 @@ class UploadSender:
         await self.client._call(self.sender, self.request)
         self.request.file_part += self.stride
 
-    async def disconnect(self) -> None:
+    async def finish(self) -> None:
         if self.previous:
             await self.previous
+
+    async def disconnect(self) -> None:
+        await self.finish()
         return await self.sender.disconnect()
 
 
+MAX_CONNECTIONS = 20
+# GetFile requests on the way per download connection
+DOWNLOAD_DEPTH = 2
+# most bytes of parts downloaded early, waiting for a slower one before them
+REORDER_BYTES = 32 * (1024**2)
+MAX_PART_KB = 512
+MIN_PART_KB = 64
+
+
+class _TransferState:
+    __slots__ = ("connections", "part_kb", "best", "best_rate", "holding")
+
+    def __init__(self, connections: int) -> None:
+        self.connections = connections
+        self.part_kb = None
+        self.best = connections
+        self.best_rate = 0.0
+        self.holding = 0
+
+
+class TransferTuner:
+    """Connection count and part size of transfers, per DC and direction.
+
+    Learns from the transfers it planned: while throughput keeps improving
+    the next transfer gets `step` more connections and twice the part size
+    (up to 512 KB), otherwise it goes back to the best count seen, trying
+    `step` more again every `probe` transfers in case the link got better.
+    A FloodWait halves the connections, other failures (dropped or timed
+    out connections) halve the part size.
+    Transfers smaller than `min_sample` are planned but not learned from.
+    """
+
+    def __init__(
+        self,
+        start: int = 8,
+        step: int = 2,
+        limit: int = MAX_CONNECTIONS,
+        min_sample: int = 4 * (1024**2),
+        probe: int = 3,
+    ) -> None:
+        self.start = start
+        self.step = step
+        self.limit = limit
+        self.min_sample = min_sample
+        self.probe = probe
+        # (dc_id, "upload" or "download") -> _TransferState
+        self._states = {}
+
+    def state(self, dc_id: int, kind: str) -> _TransferState:
+        if (dc_id, kind) not in self._states:
+            self._states[(dc_id, kind)] = _TransferState(self.start)
+        return self._states[(dc_id, kind)]
+
+    def _min_part_kb(self, kind: str, file_size: int) -> int:
+        # uploads are limited in part count, smaller parts don't fit big files
+        if kind == "upload":
+            return utils.get_appropriated_part_size(file_size)
+        return MIN_PART_KB
+
+    def plan(self, dc_id: int, kind: str, file_size: int) -> Tuple[int, int]:
+        """(connections, part size in KB) for a transfer of `file_size` bytes."""
+        state = self.state(dc_id, kind)
+        part_kb = max(
+            self._min_part_kb(kind, file_size),
+            state.part_kb or utils.get_appropriated_part_size(file_size),
+        )
+        part_count = math.ceil(file_size / (part_kb * 1024)) or 1
+        return max(1, min(state.connections, part_count)), part_kb
+
+    def record(
+        self,
+        dc_id: int,
+        kind: str,
+        size: int,
+        elapsed: float,
+        connections: int,
+        part_kb: int,
+        error: Optional[Exception] = None,
+    ) -> None:
+        state = self.state(dc_id, kind)
+        if isinstance(error, FloodError):
+            state.connections = state.best = max(1, connections // 2)
+            state.best_rate = 0.0
+            state.holding = 0
+            return
+        if error:
+            state.connections = state.best
+            state.part_kb = max(MIN_PART_KB, part_kb // 2)
+            return
+        if size < self.min_sample or elapsed <= 0:
+            return
+        rate = size / elapsed
+        if rate > state.best_rate * 1.05:
+            state.best, state.best_rate = connections, rate
+            state.connections = min(self.limit, connections + self.step)
+            state.part_kb = min(MAX_PART_KB, part_kb * 2)
+            state.holding = 0
+            return
+        # no better, the link may have got slower too
+        state.best_rate = max(rate, state.best_rate * 0.9)
+        state.holding += 1
+        if state.holding >= self.probe:
+            state.holding = 0
+            state.connections = min(self.limit, state.best + self.step)
+        else:
+            state.connections = state.best
+
+    def stats(self) -> dict:
+        return {
+            f"{kind} dc{dc_id}": {
+                "connections": state.connections,
+                "part_kb": state.part_kb,
+                "best_rate": state.best_rate,
+            }
+            for (dc_id, kind), state in self._states.items()
+        }
+
+
+tuner = TransferTuner()
+
+
 class ParallelTransferrer:
     client: TelegramClient
     loop: asyncio.AbstractEventLoop
@@ -147,6 +278,8 @@ class ParallelTransferrer:
 
     def __init__(self, client: TelegramClient, dc_id: Optional[int] = None) -> None:
         self.client = client
+        # client.sender_pool of UltroidClient, fresh senders for other clients
+        self.pool = getattr(client, "sender_pool", None)
         try:
             self.client.refresh_auth(client)
         except AttributeError:
@@ -160,14 +293,58 @@ class ParallelTransferrer:
         )
         self.senders = None
         self.upload_ticker = 0
+        # (kind, size, part size in KB, start) of a transfer planned by the tuner
+        self._tuning = None
         try:
             self.client.clear_auth(self.client)
         except AttributeError:
             pass
 
-    async def _cleanup(self) -> None:
-        await asyncio.gather(*[sender.disconnect() for sender in self.senders])
-        self.senders = None
+    def _plan(
+        self,
+        kind: str,
+        file_size: int,
+        part_size_kb: Optional[float],
+        connection_count: Optional[int],
+    ) -> Tuple[int, float]:
+        if part_size_kb or connection_count:
+            return (
+                connection_count or self._get_connection_count(file_size),
+                part_size_kb or utils.get_appropriated_part_size(file_size),
+            )
+        connection_count, part_size_kb = tuner.plan(self.dc_id, kind, file_size)
+        self._tuning = (kind, file_size, part_size_kb, self.loop.time())
+        return connection_count, part_size_kb
+
+    def _learn(self, error: Optional[Exception] = None) -> None:
+        if not self._tuning or not self.senders:
+            return
+        kind, size, part_kb, start = self._tuning
+        self._tuning = None
+        tuner.record(
+            self.dc_id,
+            kind,
+            size,
+            self.loop.time() - start,
+            len(self.senders),
+            part_kb,
+            error,
+        )
+
+    async def _cleanup(self, broken: bool = False) -> None:
+        senders, self.senders = self.senders or [], None
+        if not self.pool:
+            await asyncio.gather(*[sender.disconnect() for sender in senders])
+            return
+        try:
+            await asyncio.gather(*[sender.finish() for sender in senders])
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            await self.pool.release(
+                self.dc_id, [sender.sender for sender in senders], broken
+            )
 
     @staticmethod
     def _get_connection_count(
@@ -178,79 +355,43 @@ class ParallelTransferrer:
             return 20
         return math.ceil((file_size / full_size) * 20)
 
-    async def _init_download(
-        self, connections: int, file: TypeLocation, part_count: int, part_size: int
-    ) -> None:
-        minimum, remainder = divmod(part_count, connections)
-
-        def get_part_count() -> int:
-            nonlocal remainder
-            if remainder > 0:
-                remainder -= 1
-                return minimum + 1
-            return minimum
-
+    async def _create_senders(self, count: int) -> List[MTProtoSender]:
+        if self.pool:
+            return await self.pool.lease(self.dc_id, count)
         # The first cross-DC sender will export+import the authorization, so we always create it
         # before creating any other senders.
-        self.senders = [
-            await self._create_download_sender(
-                file, 0, part_size, connections * part_size, get_part_count()
-            ),
-            *await asyncio.gather(
-                *[
-                    self._create_download_sender(
-                        file, i, part_size, connections * part_size, get_part_count()
-                    )
-                    for i in range(1, connections)
-                ]
-            ),
+        return [
+            await self._create_sender(),
+            *await asyncio.gather(*[self._create_sender() for _ in range(1, count)]),
         ]
 
-    async def _create_download_sender(
-        self,
-        file: TypeLocation,
-        index: int,
-        part_size: int,
-        stride: int,
-        part_count: int,
-    ) -> DownloadSender:
-        return DownloadSender(
-            self.client,
-            await self._create_sender(),
-            file,
-            index * part_size,
-            part_size,
-            stride,
-            part_count,
-        )
+    async def _init_download(
+        self, connections: int, file: TypeLocation, part_size: int
+    ) -> None:
+        # the pool may lease fewer than asked for
+        self.senders = [
+            DownloadSender(self.client, sender, file, part_size)
+            for sender in await self._create_senders(connections)
+        ]
 
     async def _init_upload(
         self, connections: int, file_id: int, part_count: int, big: bool
     ) -> None:
+        senders = await self._create_senders(connections)
         self.senders = [
-            await self._create_upload_sender(file_id, part_count, big, 0, connections),
-            *await asyncio.gather(
-                *[
-                    self._create_upload_sender(file_id, part_count, big, i, connections)
-                    for i in range(1, connections)
-                ]
-            ),
+            UploadSender(
+                self.client,
+                sender,
+                file_id,
+                part_count,
+                big,
+                index,
+                len(senders),
+                loop=self.loop,
+            )
+            for index, sender in enumerate(senders)
         ]
 
-    async def _create_upload_sender(
-        self, file_id: int, part_count: int, big: bool, index: int, stride: int
-    ) -> UploadSender:
-        return UploadSender(
-            self.client,
-            await self._create_sender(),
-            file_id,
-            part_count,
-            big,
-            index,
-            stride,
-            loop=self.loop,
-        )
-
     async def _create_sender(self) -> MTProtoSender:
         dc = await self.client._get_dc(self.dc_id)
         sender = MTProtoSender(self.auth_key, loggers=self.client._log)
@@ -280,8 +421,10 @@ class ParallelTransferrer:
         part_size_kb: Optional[float] = None,
         connection_count: Optional[int] = None,
     ) -> Tuple[int, int, bool]:
-        connection_count = connection_count or self._get_connection_count(file_size)
-        part_size = (part_size_kb or utils.get_appropriated_part_size(file_size)) * 1024
+        connection_count, part_size_kb = self._plan(
+            "upload", file_size, part_size_kb, connection_count
+        )
+        part_size = int(part_size_kb * 1024)
         part_count = (file_size + part_size - 1) // part_size
         is_large = file_size > 10 * (1024**2)
         await self._init_upload(connection_count, file_id, part_count, is_large)
@@ -292,8 +435,22 @@ class ParallelTransferrer:
         self.upload_ticker = (self.upload_ticker + 1) % len(self.senders)
 
     async def finish_upload(self) -> None:
+        try:
+            await asyncio.gather(*[sender.finish() for sender in self.senders])
+        except BaseException as er:
+            # abort() learns, drops the senders and gives their slots back
+            await self.abort(er)
+            raise
+        self._learn()
         await self._cleanup()
 
+    async def abort(self, error: Optional[BaseException] = None) -> None:
+        """Drop the senders of a failed transfer."""
+        # a consumer stopping early (GeneratorExit, cancel) isn't the link's fault
+        if isinstance(error, Exception):
+            self._learn(error)
+        await self._cleanup(broken=True)
+
     async def download(
         self,
         file: TypeLocation,
@@ -301,20 +458,50 @@ class ParallelTransferrer:
         part_size_kb: Optional[float] = None,
         connection_count: Optional[int] = None,
     ) -> AsyncGenerator[bytes, None]:
-        connection_count = connection_count or self._get_connection_count(file_size)
-        part_size = (part_size_kb or utils.get_appropriated_part_size(file_size)) * 1024
+        connection_count, part_size_kb = self._plan(
+            "download", file_size, part_size_kb, connection_count
+        )
+        part_size = int(part_size_kb * 1024)
         part_count = math.ceil(file_size / part_size)
-        await self._init_download(connection_count, file, part_count, part_size)
-
-        part = 0
-        while part < part_count:
-            tasks = [self.loop.create_task(sender.next()) for sender in self.senders]
-            for task in tasks:
-                data = await task
+        await self._init_download(connection_count, file, part_size)
+
+        # Parts are requested ahead of the one to yield next: up to
+        # DOWNLOAD_DEPTH at once on each sender, and at most `window` parts
+        # past it, requested or waiting in `done` for the ones before.
+        in_flight = len(self.senders) * DOWNLOAD_DEPTH
+        window = max(in_flight, min(2 * in_flight, REORDER_BYTES // part_size))
+        tasks = {}
+        done = {}
+        requested = part = 0
+        try:
+            while part < part_count:
+                while requested < min(part_count, part + window):
+                    sender = min(self.senders, key=lambda _: _.in_flight)
+                    if sender.in_flight >= DOWNLOAD_DEPTH:
+                        break
+                    task = self.loop.create_task(sender.get(requested * part_size))
+                    tasks[task] = requested
+                    requested += 1
+                if part not in done:
+                    finished, _ = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in finished:
+                        done[tasks.pop(task)] = task.result()
+                    continue
+                data = done.pop(part)
                 if not data:
                     break
                 yield data
                 part += 1
+        except BaseException as er:
+            for task in tasks:
+                task.cancel()
+            await self.abort(er)
+            raise
+        for task in tasks:
+            task.cancel()
+        self._learn()
         await self._cleanup()
 
 
@@ -344,29 +531,34 @@ async def _internal_transfer_to_telegram(
     uploader = ParallelTransferrer(client)
     part_size, part_count, is_large = await uploader.init_upload(file_id, file_size)
     buffer = bytearray()
-    for data in stream_file(response):
-        if progress_callback:
-            try:
-                await _maybe_await(progress_callback(response.tell(), file_size))
-            except BaseException:
-                pass
-        if not is_large:
-            hash_md5.update(data)
-        if len(buffer) == 0 and len(data) == part_size:
-            await uploader.upload(data)
-            continue
-        new_len = len(buffer) + len(data)
-        if new_len >= part_size:
-            cutoff = part_size - len(buffer)
-            buffer.extend(data[:cutoff])
+    try:
+        for data in stream_file(response):
+            if progress_callback:
+                try:
+                    await _maybe_await(progress_callback(response.tell(), file_size))
+                except BaseException:
+                    pass
+            if not is_large:
+                hash_md5.update(data)
+            if len(buffer) == 0 and len(data) == part_size:
+                await uploader.upload(data)
+                continue
+            new_len = len(buffer) + len(data)
+            if new_len >= part_size:
+                cutoff = part_size - len(buffer)
+                buffer.extend(data[:cutoff])
+                await uploader.upload(bytes(buffer))
+                buffer.clear()
+                buffer.extend(data[cutoff:])
+            else:
+                buffer.extend(data)
+        if len(buffer) > 0:
             await uploader.upload(bytes(buffer))
-            buffer.clear()
-            buffer.extend(data[cutoff:])
-        else:
-            buffer.extend(data)
-    if len(buffer) > 0:
-        await uploader.upload(bytes(buffer))
-    await uploader.finish_upload()
+        await uploader.finish_upload()
+    except BaseException as er:
+        # a no-op when finish_upload already dropped the senders
+        await uploader.abort(er)
+        raise
     if is_large:
         return InputFileBig(file_id, part_count, filename), file_size
     return InputFile(file_id, part_count, filename, hash_md5.hexdigest()), file_size
@@ -109,12 +109,15 @@ def un_plug(shortname):
             for x, _ in client.list_event_handlers():
                 if x in all_func:
                     client.remove_event_handler(x)
+            for x in all_func:
+                client.commands.remove(x)
         del LOADED[shortname]
         del LIST[shortname]
         ADDONS.remove(shortname)
     except (ValueError, KeyError):
         name = f"addons.{shortname}"
         for client in [ultroid_bot, asst]:
+            client.commands.remove_module(name)
             for i in reversed(range(len(client._event_builders))):
                 ev, cb = client._event_builders[i]
                 if cb.__module__ == name:
@@ -582,6 +585,10 @@ async def progress(current, total, event, start, type_of_ps, file_name=None):
 
 
 async def restart(ult=None):
+    from .. import udB
+
+    # persist queued database writes, exec() skips atexit handlers
+    udB.flush()
     if Var.HEROKU_APP_NAME and Var.HEROKU_API:
         try:
             Heroku = heroku3.from_key(Var.HEROKU_API)
@@ -5,6 +5,7 @@
 # PLease read the GNU Affero General Public License in
 # <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
 
+import asyncio
 import contextlib
 import inspect
 import sys
@@ -22,6 +23,10 @@ from telethon.errors import (
 
 from ..configs import Var
 from . import *
+from ._commands import CommandRegistry
+from ._peercache import PeerCache
+from ._router import MessageRouter
+from ._senderpool import SenderPool
 
 
 class UltroidClient(TelegramClient):
@@ -45,11 +50,22 @@ class UltroidClient(TelegramClient):
         self._log_at = log_attempt
         self.logger = logger
         self.udB = udB
+        self.router = MessageRouter(self)
+        self.commands = CommandRegistry(self)
         kwargs["api_id"] = api_id or Var.API_ID
         kwargs["api_hash"] = api_hash or Var.API_HASH
         kwargs["base_logger"] = TelethonLogger
         # Pass *args to super if it might be used by the parent class
         super().__init__(session, *args, **kwargs)
+        self.peer_cache = None
+        if Var.PEER_CACHE_TTL:
+            self.peer_cache = PeerCache(
+                self, ttl=Var.PEER_CACHE_TTL, size=Var.PEER_CACHE_SIZE
+            )
+            self.peer_cache.watch()
+        self.sender_pool = None
+        if Var.SENDER_POOL_IDLE:
+            self.sender_pool = SenderPool(self, idle=Var.SENDER_POOL_IDLE)
         self.run_in_loop(self.start_client(bot_token=bot_token))
         self.dc_id = self.session.dc_id
 
@@ -63,6 +79,9 @@ class UltroidClient(TelegramClient):
 
     async def start_client(self, **kwargs):
         """function to start client"""
+        if self.udB and self.udB._sync:
+            # DB_SYNC evictions run on the loop of the clients.
+            self.udB._sync.attach(asyncio.get_running_loop())
         if self._log_at:
             self.logger.info("Trying to login.")
         try:
@@ -225,6 +244,20 @@ class UltroidClient(TelegramClient):
         """run asyncio loop"""
         self.run_until_disconnected()
 
+    async def get_entity(self, entity):
+        """get_entity, served from the peer cache for ids and peers."""
+        if not self.peer_cache:
+            return await super().get_entity(entity)
+        return await self.peer_cache.get_entity(super().get_entity, entity)
+
+    async def get_permissions(self, entity, user=None):
+        """get_permissions, served from the peer cache."""
+        if not self.peer_cache:
+            return await super().get_permissions(entity, user)
+        return await self.peer_cache.get_permissions(
+            super().get_permissions, entity, user
+        )
+
     def add_handler(self, func, *args, **kwargs):
         """Add new event handler, ignoring if exists"""
         if func in [_[0] for _ in self.list_event_handlers()]:
@@ -0,0 +1,343 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Awaitable access to the database.
+
+Every backend gets `aget_key`, `aset_key`, `adel_key` and the `ah*` field
+methods next to the blocking ones. Both share the same in-memory cache, so
+a cached key costs the same either way; only cache misses and writes go to
+the async client of the backend (redis.asyncio, motor, asyncpg), or to a
+worker thread when that client isn't installed.
+
+With write-behind on (`DB_WRITE_DELAY`), or inside `udB.batch()`, writes
+join the queue of the blocking client instead, so both kinds of calls are
+persisted in order.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from . import LOGS
+from ._codec import HASH_PREFIX, LITERAL, decode, encode, encode_field
+from ._dbcache import MISSING, sizeof
+
+
+class ExecutorDriver:
+    """Runs the blocking client of `db` in a single worker thread."""
+
+    def __init__(self, db):
+        self._db = db._executor_client()
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix="udB")
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    def get(self, key):
+        return self._run(self._db.get, key)
+
+    def set(self, key, value):
+        return self._run(self._db.set, key, value)
+
+    def delete(self, key):
+        return self._run(self._db.delete, key)
+
+    def hgetall(self, key):
+        return self._run(self._db._hgetall, key)
+
+    def hset(self, key, mapping):
+        return self._run(self._db._hset, key, mapping)
+
+    def hdel(self, key, fields):
+        return self._run(self._db._hdel, key, fields)
+
+    def hdrop(self, key):
+        return self._run(self._db._hdrop, key)
+
+
+class RedisDriver:
+    def __init__(self, **kwargs):
+        from redis import asyncio as aioredis
+
+        self.db = aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool(timeout=10, **kwargs)
+        )
+        self.get = self.db.get
+        self.set = self.db.set
+        self.delete = self.db.delete
+
+    async def hgetall(self, key):
+        return await self.db.hgetall(HASH_PREFIX + key)
+
+    async def hset(self, key, mapping):
+        await self.db.hset(HASH_PREFIX + key, mapping=mapping)
+
+    async def hdel(self, key, fields):
+        return await self.db.hdel(HASH_PREFIX + key, *fields)
+
+    async def hdrop(self, key):
+        await self.db.delete(HASH_PREFIX + key)
+
+
+class MongoDriver:
+    def __init__(self, url, dbname, keys="UltroidKV", fields="UltroidHash"):
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo import ReplaceOne
+
+        self._replace = ReplaceOne
+        db = AsyncIOMotorClient(url, serverSelectionTimeoutMS=5000)[dbname]
+        self.kv = db[keys]
+        self.fields = db[fields]
+
+    async def get(self, key):
+        if x := await self.kv.find_one({"_id": key}):
+            return x["value"]
+
+    async def set(self, key, value):
+        await self.kv.replace_one({"_id": key}, {"value": str(value)}, upsert=True)
+        return True
+
+    async def delete(self, key):
+        await self.kv.delete_one({"_id": key})
+
+    async def hgetall(self, key):
+        return {
+            doc["field"]: doc["value"] async for doc in self.fields.find({"key": key})
+        }
+
+    async def hset(self, key, mapping):
+        await self.fields.bulk_write(
+            [
+                self._replace(
+                    {"key": key, "field": field},
+                    {"key": key, "field": field, "value": value},
+                    upsert=True,
+                )
+                for field, value in mapping.items()
+            ],
+            ordered=False,
+        )
+
+    async def hdel(self, key, fields):
+        result = await self.fields.delete_many({"key": key, "field": {"$in": fields}})
+        return result.deleted_count
+
+    async def hdrop(self, key):
+        await self.fields.delete_many({"key": key})
+
+
+class SqlDriver:
+    def __init__(self, url):
+        import asyncpg
+
+        self._asyncpg = asyncpg
+        self._url = url
+        self._pool = None
+        self._lock = asyncio.Lock()
+
+    async def pool(self):
+        async with self._lock:
+            if not self._pool:
+                self._pool = await self._asyncpg.create_pool(
+                    dsn=self._url, min_size=1, max_size=4
+                )
+        return self._pool
+
+    async def get(self, key):
+        pool = await self.pool()
+        value = await pool.fetchval("SELECT value FROM UltroidKV WHERE key = $1", key)
+        if value is None and key != key.upper():
+            # Key migrated from the column layout, see SqlDB._legacy_case.
+            value = await pool.fetchval(
+                "UPDATE UltroidKV SET key = $1, updated_at = now() "
+                "WHERE key = $2 AND updated_at IS NULL RETURNING value",
+                key,
+                key.upper(),
+            )
+        if value is not None:
+            return bytes(value).decode()
+
+    async def set(self, key, value):
+        pool = await self.pool()
+        await pool.execute(
+            "INSERT INTO UltroidKV (key, value, updated_at) VALUES ($1, $2, now()) "
+            "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()",
+            key,
+            str(value).encode(),
+        )
+        return True
+
+    async def delete(self, key):
+        pool = await self.pool()
+        await pool.execute("DELETE FROM UltroidKV WHERE key = $1", key)
+
+    async def hgetall(self, key):
+        pool = await self.pool()
+        rows = await pool.fetch(
+            "SELECT field, value FROM UltroidHash WHERE key = $1", key
+        )
+        return {row[0]: row[1] for row in rows}
+
+    async def hset(self, key, mapping):
+        pool = await self.pool()
+        await pool.executemany(
+            "INSERT INTO UltroidHash (key, field, value) VALUES ($1, $2, $3) "
+            "ON CONFLICT (key, field) DO UPDATE SET value = EXCLUDED.value",
+            [(key, field, value) for field, value in mapping.items()],
+        )
+
+    async def hdel(self, key, fields):
+        pool = await self.pool()
+        result = await pool.execute(
+            "DELETE FROM UltroidHash WHERE key = $1 AND field = ANY($2::text[])",
+            key,
+            list(fields),
+        )
+        return int(result.split()[-1])
+
+    async def hdrop(self, key):
+        pool = await self.pool()
+        await pool.execute("DELETE FROM UltroidHash WHERE key = $1", key)
+
+
+class AsyncUltroidDB:
+    """Awaitable counterparts of the get_key family, mixed into every backend."""
+
+    _adriver = None
+
+    def _async_driver(self):
+        return ExecutorDriver(self)
+
+    def _executor_client(self):
+        """Blocking client for the worker thread of ExecutorDriver."""
+        return self
+
+    @property
+    def aio(self):
+        """Async client of the backend, created on first use."""
+        if self._adriver is None:
+            try:
+                self._adriver = self._async_driver()
+            except ImportError as er:
+                LOGS.info("%s: running database calls in a thread.", er)
+                self._adriver = ExecutorDriver(self)
+        return self._adriver
+
+    async def _awrite(self, op, key, *args):
+        if self._write_delay or self._batching:
+            return self._write(op, key, *args)
+        result = await getattr(self.aio, op)(key, *args)
+        if self._sync:
+            self._sync.publish([key])
+        return result
+
+    async def _aget_data(self, key):
+        data = self._pending_value(str(key))
+        if data is MISSING:
+            data = await self.aio.get(str(key))
+        if data is None:
+            return None
+        value, legacy = decode(data)
+        if legacy and self._codec is not LITERAL:
+            await self._awrite("set", str(key), encode(value, self._codec))
+        return value
+
+    async def aget_key(self, key):
+        if key in self._sets:
+            return self.smembers(key) or None
+        if (value := self._cache.lookup(key)) is not MISSING:
+            return value
+        if key in self._hashes:
+            return await self.ahgetall(key)
+        value = await self._aget_data(key)
+        self._cache.update({key: value})
+        return value
+
+    async def aset_key(self, key, value, cache_only=False):
+        if key in self._sets:
+            return self.set_key(key, value, cache_only)
+        value = self._get_data(data=value)
+        self._cache.set(key, value, pin=cache_only)
+        self._changed(key)
+        if cache_only:
+            return True
+        if key in self._hashes:
+            await self._awrite("hdrop", str(key))
+            if isinstance(value, dict):
+                if value:
+                    await self._awrite("hset", str(key), self._encode_mapping(value))
+                return True
+            self._hashes.discard(key)
+        await self._awrite("set", str(key), encode(value, self._codec))
+        return True
+
+    async def adel_key(self, key):
+        if key in self._sets:
+            return self.del_key(key)
+        if key in self._cache:
+            del self._cache[key]
+        self._changed(key)
+        if key in self._hashes:
+            self._hashes.discard(key)
+            await self._awrite("hdrop", str(key))
+        await self._awrite("delete", str(key))
+        return True
+
+    async def _ahash_ready(self, key):
+        if key in self._hashes:
+            return
+        self._hashes.add(key)
+        legacy = await self._aget_data(key)
+        if isinstance(legacy, dict):
+            if legacy:
+                await self._awrite("hset", str(key), self._encode_mapping(legacy))
+            await self._awrite("delete", str(key))
+
+    async def ahgetall(self, key):
+        if not self._native_hash:
+            return await self.aget_key(key) or {}
+        await self._ahash_ready(key)
+        data = self._cache.get(key)
+        if not isinstance(data, dict):
+            self.flush(str(key))
+            data, legacy = self._decode_mapping(await self.aio.hgetall(str(key)))
+            if legacy:
+                await self._awrite("hset", str(key), legacy)
+            self._cache[key] = data
+        return data
+
+    async def ahget(self, key, field, default=None):
+        return (await self.ahgetall(key)).get(field, default)
+
+    async def ahset(self, key, field, value):
+        if not self._native_hash:
+            data = await self.aget_key(key) or {}
+            data[field] = value
+            return await self.aset_key(key, data)
+        await self._ahash_ready(key)
+        await self._awrite("hset", str(key), self._encode_mapping({field: value}))
+        if key in self._cache:
+            if isinstance(self._cache[key], dict):
+                self._cache[key][field] = value
+                self._cache.grow(key, sizeof(field) + sizeof(value))
+            else:
+                self._cache[key] = {field: value}
+        self._changed(key)
+        return True
+
+    async def ahdel(self, key, field):
+        if not self._native_hash:
+            data = await self.aget_key(key)
+            if not isinstance(data, dict) or field not in data:
+                return False
+            del data[field]
+            return await self.aset_key(key, data)
+        await self._ahash_ready(key)
+        if isinstance(self._cache.get(key), dict) and field in self._cache[key]:
+            self._cache.grow(key, -sizeof(field) - sizeof(self._cache[key].pop(field)))
+        self._changed(key)
+        return bool(await self._awrite("hdel", str(key), [encode_field(field)]))
@@ -0,0 +1,65 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Per-chat storage.
+
+Every chat gets a key of its own (`CHAT_<id>`), a collection whose fields
+are the features set in that chat ("filters", "warns", ...). A chat is only
+read when it is used, so memory follows the active chats, and a write only
+touches the chat it is for.
+
+Which chats have a feature is kept in a membership set (`CHATS_<FEATURE>`),
+so a chat without it is answered without reading anything.
+"""
+
+CHAT_PREFIX = "CHAT_"
+CHATS_PREFIX = "CHATS_"
+
+
+def index_key(name):
+    return CHATS_PREFIX + name.upper()
+
+
+class ChatStore:
+    """Features of one chat, `udB.chat(chat_id)`."""
+
+    __slots__ = ("_db", "chat_id", "key")
+
+    def __init__(self, db, chat_id):
+        self._db = db
+        self.chat_id = int(chat_id)
+        self.key = f"{CHAT_PREFIX}{self.chat_id}"
+
+    def __repr__(self):
+        return f"<ChatStore {self.chat_id}>"
+
+    def __contains__(self, name):
+        return self._db.sismember(index_key(name), self.chat_id)
+
+    def get(self, name, default=None):
+        if name not in self:
+            return default
+        return self._db.hget(self.key, name, default)
+
+    def set(self, name, value):
+        self._db.hset(self.key, name, value)
+        self._db.sadd(index_key(name), self.chat_id)
+        return True
+
+    def delete(self, name):
+        if name not in self:
+            return False
+        self._db.srem(index_key(name), self.chat_id)
+        self._db.hdel(self.key, name)
+        if not self._db.hgetall(self.key):
+            self._db.del_key(self.key)
+        return True
+
+    def all(self):
+        """Every feature set in this chat."""
+        return self._db.hgetall(self.key)
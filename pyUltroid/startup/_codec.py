@@ -0,0 +1,246 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Value codecs for the database.
+
+Every encoded value is text of the form `MAGIC + tag + ":" + payload`,
+where `tag` names the codec and its version. Values without the magic
+prefix were written by older versions as `str(value)` and are read with
+`ast.literal_eval`.
+"""
+
+import ast
+import json
+from base64 import b64decode, b64encode
+
+from ..exceptions import DatabaseCodecError
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAGIC = "\x1e"
+
+# Collection keys moved to field storage live under this prefix on the backend,
+# so they never clash with the plain (whole value) key of the same name.
+HASH_PREFIX = "_H:"
+# Membership sets, stored natively on redis and as fields without a value
+# (under this prefix) elsewhere.
+SET_PREFIX = "_S:"
+
+# Marks python types which JSON can't represent, inside JSON payloads.
+_TYPE = "\x1e"
+
+
+class LiteralCodec:
+    """Legacy `str()` / `ast.literal_eval` encoding."""
+
+    tag = None
+    name = "literal"
+
+    def encode(self, value):
+        return str(value)
+
+    def decode(self, data):
+        try:
+            return ast.literal_eval(data)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return data
+
+
+def _pack(obj):
+    kind = type(obj)
+    if kind is dict:
+        for key in obj:
+            if type(key) is not str or key == _TYPE:
+                return {_TYPE: ["d", [[_pack(k), _pack(v)] for k, v in obj.items()]]}
+        return {key: _pack(value) for key, value in obj.items()}
+    if kind is list:
+        return [_pack(value) for value in obj]
+    if kind is tuple:
+        return {_TYPE: ["t", [_pack(value) for value in obj]]}
+    if kind is set or kind is frozenset:
+        return {_TYPE: ["s" if kind is set else "f", [_pack(value) for value in obj]]}
+    if kind is bytes:
+        return {_TYPE: ["b", b64encode(obj).decode()]}
+    if kind is int and not -(2**63) <= obj < 2**64:
+        return {_TYPE: ["i", str(obj)]}
+    return obj
+
+
+def _unpack_object(obj):
+    # object_hook, called bottom-up, so nested values are already unpacked.
+    if _TYPE not in obj or len(obj) != 1:
+        return obj
+    kind, data = obj[_TYPE]
+    if kind == "d":
+        return {k: v for k, v in data}
+    if kind == "t":
+        return tuple(data)
+    if kind == "s":
+        return set(data)
+    if kind == "f":
+        return frozenset(data)
+    if kind == "b":
+        return b64decode(data)
+    if kind == "i":
+        return int(data)
+    return obj
+
+
+def _unpack(obj):
+    kind = type(obj)
+    if kind is dict:
+        obj = {key: _unpack(value) for key, value in obj.items()}
+        return _unpack_object(obj)
+    if kind is list:
+        return [_unpack(value) for value in obj]
+    return obj
+
+
+class JsonCodec:
+    """JSON, through orjson when it is installed."""
+
+    tag = "j1"
+    name = "json"
+
+    def encode(self, value):
+        value = _pack(value)
+        if orjson:
+            return orjson.dumps(value).decode()
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    def decode(self, data):
+        if orjson:
+            return _unpack(orjson.loads(data))
+        return json.loads(data, object_hook=_unpack_object)
+
+
+def _msgpack_default(obj):
+    kind = type(obj)
+    if kind is tuple:
+        return msgpack.ExtType(1, _msgpack_dumps(list(obj)))
+    if kind is set:
+        return msgpack.ExtType(2, _msgpack_dumps(list(obj)))
+    if kind is frozenset:
+        return msgpack.ExtType(3, _msgpack_dumps(list(obj)))
+    if kind is int:
+        # outside of the 64 bit range msgpack supports
+        return msgpack.ExtType(4, str(obj).encode())
+    # subclasses of builtin types, which strict_types hands over to us
+    for base in (bool, int, float, str, bytes, list, dict):
+        if isinstance(obj, base):
+            return base(obj)
+    raise TypeError(f"Can't encode object of type {kind.__name__}")
+
+
+def _msgpack_ext(code, data):
+    if code == 4:
+        return int(data.decode())
+    items = _msgpack_loads(data)
+    if code == 1:
+        return tuple(items)
+    if code == 2:
+        return set(items)
+    if code == 3:
+        return frozenset(items)
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_dumps(value):
+    return msgpack.packb(
+        value, use_bin_type=True, strict_types=True, default=_msgpack_default
+    )
+
+
+def _msgpack_loads(data):
+    return msgpack.unpackb(
+        data, raw=False, strict_map_key=False, ext_hook=_msgpack_ext
+    )
+
+
+class MsgpackCodec:
+    """msgpack, base64 wrapped, as backends are opened in text mode."""
+
+    tag = "m1"
+    name = "msgpack"
+
+    def encode(self, value):
+        return b64encode(_msgpack_dumps(value)).decode()
+
+    def decode(self, data):
+        return _msgpack_loads(b64decode(data))
+
+
+CODECS = {}
+
+for _codec in (JsonCodec(), MsgpackCodec() if msgpack else None):
+    if _codec:
+        CODECS[_codec.tag] = _codec
+        CODECS[_codec.name] = _codec
+
+LITERAL = LiteralCodec()
+
+
+def get_codec(name=None):
+    """Codec to write with, `name` being a codec name or tag."""
+    if name in CODECS:
+        return CODECS[name]
+    if name == LITERAL.name:
+        return LITERAL
+    return CODECS["msgpack"] if msgpack else CODECS["json"]
+
+
+def encode(value, codec):
+    if codec.tag is None:
+        return codec.encode(value)
+    return f"{MAGIC}{codec.tag}:{codec.encode(value)}"
+
+
+def decode(data):
+    """Returns the decoded value and whether it was in the legacy format."""
+    if not isinstance(data, str):
+        return data, False
+    if data.startswith(MAGIC):
+        tag, _, payload = data[1:].partition(":")
+        if not (codec := CODECS.get(tag)):
+            if tag == MsgpackCodec.tag:
+                raise DatabaseCodecError(
+                    "Value written with DB_CODEC=msgpack, install 'msgpack' to read it."
+                )
+            raise DatabaseCodecError(
+                f"Value written with the unknown codec {tag!r}, by a newer version?"
+            )
+        return codec.decode(payload), False
+    return LITERAL.decode(data), True
+
+
+# Field names of collection keys are stored as repr() of the python key.
+
+
+def encode_field(field):
+    return repr(field)
+
+
+def decode_field(field):
+    if field[0] in "'\"" and "\\" not in field:
+        return field[1:-1]
+    try:
+        return int(field)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(field)
+    except (ValueError, SyntaxError, TypeError):
+        return field
@@ -0,0 +1,210 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Command lookup for `ultroid_cmd`.
+
+Every command used to be an event builder of its own, so each message was
+matched against the regex of every loaded command. Commands sharing the
+same builder settings (handler, direction, chats) are kept in one
+`CommandTable` instead, behind a single builder. The table indexes the
+commands in a trie by the literal start of their pattern, handler included
+(`\\.ping` -> ".ping"), so a message only walks as many trie nodes as it
+shares characters with a command, and only the regexes of those commands
+run. Patterns without a literal start (`(s|f)tats`, case insensitive ones)
+are tried on every message of the table, as before.
+"""
+
+import inspect
+import re
+from itertools import count
+
+from telethon import events
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from . import LOGS
+
+_ORDER = count()
+
+
+def literal_prefix(regex):
+    """The text every match of `regex` starts with, "" if there's none."""
+    if regex is None or regex.flags & re.IGNORECASE:
+        return ""
+    prefix = []
+    for op, arg in sre_parse.parse(regex.pattern):
+        if op is sre_parse.AT and arg is sre_parse.AT_BEGINNING and not prefix:
+            continue
+        if op is not sre_parse.LITERAL:
+            break
+        prefix.append(chr(arg))
+    return "".join(prefix)
+
+
+class _Command:
+    __slots__ = ("callback", "regex", "func", "module", "order")
+
+    def __init__(self, callback, regex, func, module=None):
+        self.callback = callback
+        self.regex = regex
+        self.func = func
+        # plugin the command comes from, callbacks may be wrappers
+        self.module = module or getattr(callback, "__module__", None)
+        self.order = next(_ORDER)
+
+
+class CommandTable:
+    """Commands sharing one event builder, indexed by their literal prefix."""
+
+    def __init__(self):
+        # nested {char: node}, commands of a node are kept under None
+        self._trie = {}
+        self._any = []
+        self.size = 0
+
+    def add(self, callback, regex, func=None, module=None):
+        command = _Command(callback, regex, func, module)
+        if prefix := literal_prefix(regex):
+            node = self._trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(command)
+        else:
+            self._any.append(command)
+        self.size += 1
+
+    def remove(self, callback):
+        removed = self._prune(self._trie, callback)
+        before = len(self._any)
+        self._any = [_ for _ in self._any if _.callback != callback]
+        removed += before - len(self._any)
+        self.size -= removed
+        return removed
+
+    def _prune(self, node, callback):
+        removed = 0
+        for key, child in list(node.items()):
+            if key is None:
+                kept = [_ for _ in child if _.callback != callback]
+                removed += len(child) - len(kept)
+                if kept:
+                    node[None] = kept
+                else:
+                    del node[None]
+                continue
+            removed += self._prune(child, callback)
+            if not child:
+                del node[key]
+        return removed
+
+    def commands(self):
+        yield from self._any
+        nodes = [self._trie]
+        for node in nodes:
+            for key, child in node.items():
+                if key is None:
+                    yield from child
+                else:
+                    nodes.append(child)
+
+    def candidates(self, text):
+        """Commands whose literal prefix `text` starts with, in registration order."""
+        found = list(self._any)
+        node = self._trie
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found.extend(node[None])
+        if len(found) > 1:
+            found.sort(key=lambda command: command.order)
+        return found
+
+    def matches(self, text):
+        """(command, match) of every command whose pattern matches `text`."""
+        for command in self.candidates(text):
+            if command.regex is None:
+                yield command, None
+            elif match := command.regex.match(text):
+                yield command, match
+
+
+class CommandRegistry:
+    """`client.commands`, one CommandTable per event builder setting."""
+
+    def __init__(self, client):
+        self.client = client
+        self._tables = {}
+
+    def __repr__(self):
+        return f"<CommandRegistry commands={sum(_.size for _ in self._tables.values())}>"
+
+    def add(
+        self,
+        callback,
+        regex,
+        builder=events.NewMessage,
+        func=None,
+        module=None,
+        **filters,
+    ):
+        """Call `callback` on messages matching `regex` from the start.
+
+        `filters` are the settings of the builder (incoming, outgoing, chats,
+        ...); commands with equal settings share it. `func` is checked per
+        command, after its pattern matched, and may be async. `module` is the
+        plugin the command belongs to, for remove_module(); it defaults to
+        the module of `callback`.
+
+        Commands of one table run in registration order; each table is a
+        handler of its own, so across tables the order is the one in which
+        the tables were made.
+        """
+        # chats may be a list, so the settings are keyed by their repr
+        key = (builder, repr(sorted(filters.items())))
+        if not (table := self._tables.get(key)):
+            table = self._tables[key] = CommandTable()
+
+            async def dispatch(event, table=table):
+                await self._dispatch(table, event)
+
+            self.client.add_event_handler(dispatch, builder(**filters))
+        table.add(callback, regex, func, module)
+
+    def remove(self, callback):
+        return sum(table.remove(callback) for table in self._tables.values())
+
+    def remove_module(self, module):
+        """Remove every command added for the plugin `module`."""
+        callbacks = {
+            command.callback
+            for table in self._tables.values()
+            for command in table.commands()
+            if command.module == module
+        }
+        return sum(self.remove(callback) for callback in callbacks)
+
+    async def _dispatch(self, table, event):
+        for command, match in table.matches(event.message.message or ""):
+            event.pattern_match = match
+            try:
+                if command.func:
+                    allowed = command.func(event)
+                    if inspect.isawaitable(allowed):
+                        allowed = await allowed
+                    if not allowed:
+                        continue
+                await command.callback(event)
+            except events.StopPropagation:
+                raise
+            except Exception as er:
+                LOGS.exception(er)
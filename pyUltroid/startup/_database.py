@@ -6,24 +6,45 @@
 # <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
 
 import ast
+import asyncio
+import atexit
+import copy
 import os
 import sys
+import time
+from contextlib import contextmanager
 
 from .. import run_as_module
+from ..exceptions import DatabaseCodecError
 from . import *
+from ._asyncdb import AsyncUltroidDB, MongoDriver, RedisDriver, SqlDriver
+from ._dbcache import LAZY, MISSING, DBCache, parse_ttl, sizeof
+from ._dbsync import FileSync, MongoSync, RedisSync, SqlSync
+from ._chatstore import CHAT_PREFIX, ChatStore, index_key
+from ._localstore import LogStore
+from ._codec import (
+    HASH_PREFIX,
+    LITERAL,
+    SET_PREFIX,
+    decode,
+    decode_field,
+    encode,
+    encode_field,
+    get_codec,
+)
 
 if run_as_module:
     from ..configs import Var
 
 
-Redis = MongoClient = psycopg2 = Database = None
+Redis = BlockingConnectionPool = MongoClient = ReplaceOne = DeleteMany = DeleteOne = psycopg2 = None
 if Var.REDIS_URI or Var.REDISHOST:
     try:
-        from redis import Redis
+        from redis import BlockingConnectionPool, Redis
     except ImportError:
         LOGS.info("Installing 'redis' for database.")
         os.system(f"{sys.executable} -m pip install -q redis hiredis")
-        from redis import Redis
+        from redis import BlockingConnectionPool, Redis
 elif Var.MONGO_URI:
     try:
         from pymongo import MongoClient
@@ -31,6 +52,7 @@ elif Var.MONGO_URI:
         LOGS.info("Installing 'pymongo' for database.")
         os.system(f"{sys.executable} -m pip install -q pymongo[srv]")
         from pymongo import MongoClient
+    from pymongo import DeleteMany, DeleteOne, ReplaceOne
 elif Var.DATABASE_URL:
     try:
         import psycopg2
@@ -38,32 +60,232 @@ elif Var.DATABASE_URL:
         LOGS.info("Installing 'pyscopg2' for database.")
         os.system(f"{sys.executable} -m pip install -q psycopg2-binary")
         import psycopg2
-else:
-    try:
-        from localdb import Database
-    except ImportError:
-        LOGS.info("Using local file as database.")
-        os.system(f"{sys.executable} -m pip install -q localdb.json")
-        from localdb import Database
 
 # --------------------------------------------------------------------------------------------- #
 
+# Backend method behind each queued write.
+_WRITERS = {
+    "set": "set",
+    "delete": "delete",
+    "hset": "_hset",
+    "hdel": "_hdel",
+    "hdrop": "_hdrop",
+    "sadd": "_sadd",
+    "srem": "_srem",
+    "sdrop": "_sdrop",
+}
+
+# Set writes, as the field writes they are stored with on hash-only backends.
+_SET_AS_HASH = {"sadd": "hset", "srem": "hdel", "sdrop": "hdrop"}
+
+# Pending writes which trigger a flush before the delay is over.
+WRITE_BATCH_SIZE = 500
+
+# Keys per SCAN step and per MGET/MEMORY USAGE round trip on redis.
+_SCAN_COUNT = 1000
+
+# Collections of the Mongo backend.
+_MONGO_KV = "UltroidKV"
+_MONGO_HASH = "UltroidHash"
+_MONGO_EVENTS = "UltroidEvents"
+
+
+class _BaseDatabase(AsyncUltroidDB):
+    # Set by backends which can store single fields of a collection key.
+    _native_hash = False
+    _sync = None
 
-class _BaseDatabase:
     def __init__(self): # Removed *args, **kwargs as they are not used by super() calls in subclasses
-        self._cache = {}
+        ttl, key_ttl = parse_ttl(Var.DB_CACHE_TTL)
+        self._cache = DBCache(
+            max_entries=Var.DB_CACHE_SIZE,
+            max_bytes=Var.DB_CACHE_BYTES,
+            ttl=ttl,
+            key_ttl=key_ttl,
+            pinned=str(Var.DB_CACHE_PIN or "").replace(",", " ").split(),
+        )
+        self._codec = get_codec(Var.DB_CODEC)
+        # Write-behind: with a delay set, writes only update the cache and
+        # are persisted in batches, at most `_write_delay` seconds later.
+        self._write_delay = Var.DB_WRITE_DELAY
+        self._pending = {}
+        self._flush_handle = None
+        # Depth of nested batch() blocks, writes are queued while above 0.
+        self._batching = 0
+        if self._write_delay:
+            atexit.register(self.flush)
+        # Collection keys kept in field storage on the backend, and lists
+        # kept as membership sets.
+        self._hashes, self._sets = set(), set()
+        if self._native_hash:
+            for name in self._hash_names():
+                if name.startswith(SET_PREFIX):
+                    self._sets.add(name[len(SET_PREFIX) :])
+                else:
+                    self._hashes.add(name)
+            self._sets.update(self._set_names())
+        self._indexes = {}
+        # key -> callbacks told when it changes, see watch().
+        self._watchers = {}
+        # Keeps the cache in line with other processes on the same database.
+        self._sync = None
+        if Var.DB_SYNC:
+            self._sync = self._sync_channel()
+            self._sync.start()
 
     def get_key(self, key):
-        if key in self._cache:
-            return self._cache[key]
+        if key in self._sets:
+            # An empty set has nothing stored, so it reads None, as it
+            # would after a restart.
+            return self.smembers(key) or None
+        if (value := self._cache.lookup(key)) is not MISSING:
+            return value
+        if key in self._hashes:
+            return self.hgetall(key)
         value = self._get_data(key)
         self._cache.update({key: value})
         return value
 
+    def watch(self, keys, callback):
+        """Call `callback(key)` when one of `keys` is written or dropped.
+
+        For values derived from keys, like the sudo snapshot of _misc: writes
+        of this process, blocking or async, evictions from DB_SYNC and
+        re_cache() all count. Writes of other processes are only seen with
+        DB_SYNC on.
+        """
+        for key in keys:
+            self._watchers.setdefault(key, []).append(callback)
+
+    def _changed(self, key):
+        for callback in self._watchers.get(key, ()):
+            try:
+                callback(key)
+            except Exception as er:
+                LOGS.exception(er)
+
     def re_cache(self):
+        """
+        Load every key into the cache, in as few round trips as the backend allows.
+
+        Per-chat keys are left out, they are read when their chat is used,
+        and so are the large, rarely read keys of `LAZY`.
+        """
+        start = time.perf_counter()
+        self.flush()
         self._cache.clear()
-        for key in self.keys():
-            self._cache.update({key: self.get_key(key)})
+        self._cache_raw(
+            {
+                key: data
+                for key, data in self._get_all().items()
+                if not (key.startswith(CHAT_PREFIX) or key in LAZY)
+            },
+            self._hgetall_many(
+                [
+                    key
+                    for key in self._hashes
+                    if not (key.startswith(CHAT_PREFIX) or key in LAZY)
+                ]
+            ),
+            self._smembers_many(list(self._sets)),
+        )
+        for key in list(self._watchers):
+            self._changed(key)
+        LOGS.info(
+            "Cached %s keys from %s in %.0f ms.",
+            len(self._cache),
+            self.name, # pylint: disable=no-member
+            (time.perf_counter() - start) * 1000,
+        )
+
+    def _cache_raw(self, values, mappings, members):
+        """Decode and cache raw values, fields and members read in bulk."""
+        for key, data in values.items():
+            if key in self._hashes or key in self._sets:
+                continue
+            if data is None:
+                self._cache[key] = None
+                continue
+            try:
+                value, legacy = decode(data)
+            except DatabaseCodecError as er:
+                # Left out of the cache, get_key raises it again.
+                LOGS.error("Can't read %s: %s", key, er)
+                continue
+            if legacy and self._codec is not LITERAL:
+                self._write("set", key, encode(value, self._codec))
+            self._cache[key] = value
+        for key, mapping in mappings.items():
+            data, legacy = self._decode_mapping(mapping)
+            if legacy:
+                self._write("hset", key, legacy)
+            self._cache[key] = data
+        for key, items in members.items():
+            self._cache[key] = [decode_field(member) for member in items]
+
+    @contextmanager
+    def batch(self, *keys):
+        """
+        Group database calls into as few round trips as the backend allows.
+
+        `keys` missing from the cache are read together on entry, so get_key
+        on them inside the block is served from memory. Writes inside the
+        block are queued and sent as one batch when it exits.
+
+        >>> with udB.batch("SNIP", "NOTE"):
+        ...     snips = udB.get_key("SNIP") or {}
+        ...     udB.set_key("NOTE", {})
+        """
+        self.prefetch(*keys)
+        self._batching += 1
+        try:
+            yield self
+        finally:
+            self._batching -= 1
+            if not self._batching:
+                self.flush()
+
+    def prefetch(self, *keys):
+        """Cache the given keys, reading the missing ones in bulk."""
+        keys = [key for key in dict.fromkeys(keys) if key not in self._cache]
+        if not keys:
+            return
+        self.flush(*map(str, keys))
+        plain = [key for key in keys if key not in self._hashes and key not in self._sets]
+        values = self._get_many(plain)
+        self._cache_raw(
+            {key: values.get(key) for key in plain},
+            self._hgetall_many([key for key in keys if key in self._hashes]),
+            self._smembers_many([key for key in keys if key in self._sets]),
+        )
+
+    # Bulk reads for re_cache and prefetch, backends override them with a
+    # single query.
+
+    def _get_many(self, keys):
+        """Raw value of the given plain keys, missing ones left out."""
+        return {
+            key: data
+            for key in keys
+            if (data := self.get(key)) is not None # pylint: disable=no-member
+        }
+
+    def _get_all(self):
+        """Raw value of every plain key."""
+        return {
+            key: data
+            for key in self.keys()
+            if key not in self._hashes and (data := self.get(key)) is not None # pylint: disable=no-member
+        }
+
+    def _hgetall_many(self, keys):
+        """Raw fields of every given collection key."""
+        return {key: self._hgetall(key) for key in keys}
+
+    def _smembers_many(self, keys):
+        """Raw members of every given set."""
+        fields = self._hgetall_many([SET_PREFIX + key for key in keys])
+        return {key[len(SET_PREFIX) :]: list(value) for key, value in fields.items()}
 
     def ping(self):
         return 1
@@ -78,12 +300,28 @@ class _BaseDatabase:
     def del_key(self, key):
         if key in self._cache:
             del self._cache[key]
-        self.delete(str(key)) # pylint: disable=no-member # Implemented in subclasses
+        if key in self._hashes:
+            self._hashes.discard(key)
+            self._write("hdrop", str(key))
+        if key in self._sets:
+            self._sets.discard(key)
+            self._write("sdrop", str(key))
+        self._write("delete", str(key))
+        self._changed(key)
         return True
 
     def _get_data(self, key=None, data=None):
         if key:
-            data = self.get(str(key)) # pylint: disable=no-member # Implemented in subclasses
+            data = self._pending_value(str(key))
+            if data is MISSING:
+                data = self.get(str(key)) # pylint: disable=no-member # Implemented in subclasses
+            if data is None:
+                return None
+            value, legacy = decode(data)
+            if legacy and self._codec is not LITERAL:
+                # Written by an older version, store it with the current codec.
+                self._write("set", str(key), encode(value, self._codec))
+            return value
         if data and isinstance(data, str):
             try:
                 data = ast.literal_eval(data)
@@ -93,10 +331,175 @@ class _BaseDatabase:
 
     def set_key(self, key, value, cache_only=False):
         value = self._get_data(data=value) # Process value first
-        self._cache[key] = value
+        # Only kept in memory, so it can't be evicted.
+        self._cache.set(key, value, pin=cache_only)
+        self._changed(key)
         if cache_only:
             return True # Return True for consistency
-        return self.set(str(key), str(value)) # pylint: disable=no-member # Implemented in subclasses
+        if key in self._hashes:
+            # Whole value written over a collection key, replace its fields.
+            self._write("hdrop", str(key))
+            if isinstance(value, dict):
+                if value:
+                    self._write("hset", str(key), self._encode_mapping(value))
+                return True
+            self._hashes.discard(key)
+        if key in self._sets:
+            self._write("sdrop", str(key))
+            if isinstance(value, (list, tuple, set, frozenset)):
+                if value:
+                    self._write("sadd", str(key), [encode_field(_) for _ in value])
+                return True
+            self._sets.discard(key)
+        return self._write("set", str(key), encode(value, self._codec))
+
+    # Write-behind queue. Pending writes are keyed by what they overwrite, so
+    # repeated writes to one key (or field) cost a single backend write.
+
+    def _write(self, op, key, *args):
+        """Run a backend write now, or queue it when write-behind is on."""
+        if not (self._write_delay or self._batching):
+            result = getattr(self, _WRITERS[op])(key, *args)
+            if self._sync:
+                self._sync.publish([key])
+            return result
+        pending = self._pending
+        if op in ("set", "delete"):
+            pending[("key", key)] = (op, key, *args)
+        elif op in ("hdrop", "sdrop"):
+            kind = "field" if op == "hdrop" else "member"
+            for slot in [_ for _ in pending if _[0] == kind and _[1] == key]:
+                del pending[slot]
+            pending.pop((op, key), None)
+            pending[(op, key)] = (op, key)
+        elif op == "hset":
+            for field, value in args[0].items():
+                pending[("field", key, field)] = ("hset", key, {field: value})
+        elif op == "hdel":
+            for field in args[0]:
+                pending[("field", key, field)] = ("hdel", key, [field])
+        else:
+            for member in args[0]:
+                pending[("member", key, member)] = (op, key, [member])
+        if len(pending) >= WRITE_BATCH_SIZE:
+            self.flush()
+        elif self._batching:
+            # Sent when the outermost batch() exits.
+            pass
+        elif not self._flush_handle:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Nothing to schedule on, write through.
+                self.flush()
+            else:
+                self._flush_handle = loop.call_later(self._write_delay, self.flush)
+        return True
+
+    def _pending_value(self, key):
+        """Encoded value queued for the plain `key`, None if its delete is
+        queued, MISSING if nothing is."""
+        op = self._pending.get(("key", key))
+        if op is None:
+            return MISSING
+        return op[2] if op[0] == "set" else None
+
+    def flush(self, *keys):
+        """Persist pending writes, in one batch; only those of `keys` if given.
+
+        Reads which miss the cache flush only the key they read, so the
+        writes of other keys keep waiting for DB_WRITE_DELAY.
+        """
+        if keys:
+            keys = set(keys)
+            pending = {slot: op for slot, op in self._pending.items() if slot[1] in keys}
+            if not pending:
+                return
+            for slot in pending:
+                del self._pending[slot]
+        else:
+            if self._flush_handle:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+        ops = []
+        for op in pending.values():
+            # Merge consecutive field writes of the same key.
+            if ops and op[0] in ("hset", "hdel", "sadd", "srem") and ops[-1][:2] == op[:2]:
+                last = ops[-1][2]
+                if op[0] == "hset":
+                    last.update(op[2])
+                else:
+                    last.extend(op[2])
+                continue
+            if op[0] == "hset":
+                op = (op[0], op[1], dict(op[2]))
+            elif op[0] in ("hdel", "sadd", "srem"):
+                op = (op[0], op[1], list(op[2]))
+            ops.append(op)
+        try:
+            self._write_batch(ops)
+            if self._sync:
+                self._sync.publish([op[1] for op in ops])
+        except Exception as er:
+            LOGS.exception(er)
+            # Keep them for the next flush, newer writes win.
+            self._pending = {**pending, **self._pending}
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            if not self._flush_handle:
+                self._flush_handle = loop.call_later(self._write_delay or 1, self.flush)
+
+    def _write_batch(self, ops):
+        for op, key, *args in ops:
+            getattr(self, _WRITERS[op])(key, *args)
+
+    def cache_stats(self):
+        """Hit, miss and eviction counters of the read cache."""
+        return self._cache.stats()
+
+    def _sync_channel(self):
+        raise NotImplementedError(f"DB_SYNC isn't supported on {self.name}") # pylint: disable=no-member
+
+    def _evict(self, keys, hashes, sets=()):
+        """Drop keys another process wrote from the cache, on the event loop."""
+        for key in keys:
+            self._cache.pop(key, None)
+            self._changed(key)
+            for names, now in ((self._hashes, hashes), (self._sets, sets)):
+                if key in now:
+                    names.add(key)
+                else:
+                    names.discard(key)
+
+    # Per-chat storage, see _chatstore.
+
+    def chat(self, chat_id):
+        """Namespace of one chat: `udB.chat(chat_id).get("filters")`."""
+        return ChatStore(self, chat_id)
+
+    def chats(self, name):
+        """Ids of the chats which have `name` set."""
+        return self.smembers(index_key(name))
+
+    def chat_items(self, name):
+        """`{chat_id: value}` of `name` in every chat. Reads every such chat."""
+        return {chat_id: self.chat(chat_id).get(name) for chat_id in self.chats(name)}
+
+    def split_chat_key(self, key, name):
+        """Move a `{chat_id: value}` key into per-chat storage as `name`, once."""
+        data = self.hgetall(key) if key in self._hashes else self.get_key(key)
+        if not isinstance(data, dict):
+            return
+        with self.batch():
+            for chat_id, value in data.items():
+                self.chat(chat_id).set(name, value)
+            self.del_key(key)
+        LOGS.info("Moved %s chats of %s to per-chat storage.", len(data), key)
 
     def rename(self, key1, key2):
         _ = self.get_key(key1) # Relies on get_key which uses self.get
@@ -106,11 +509,233 @@ class _BaseDatabase:
             return 0
         return 1
 
+    # Field level access for collection keys (dicts keyed by chat/user id).
+    # Backends with `_native_hash` store every field separately, so a write
+    # costs one field instead of the whole collection. Others fall back to
+    # rewriting the whole value.
+
+    def _hash_names(self):
+        return []
+
+    def _encode_mapping(self, mapping):
+        return {
+            encode_field(field): encode(value, self._codec)
+            for field, value in mapping.items()
+        }
+
+    def _decode_mapping(self, mapping):
+        """Decoded fields, and legacy fields re-encoded with the current codec."""
+        data, legacy = {}, {}
+        for field, value in mapping.items():
+            value, is_legacy = decode(value)
+            if is_legacy and self._codec is not LITERAL:
+                legacy[field] = encode(value, self._codec)
+            data[decode_field(field)] = value
+        return data, legacy
+
+    def _hash_ready(self, key):
+        """Move a legacy whole-dict value of `key` to field storage, once."""
+        if key in self._hashes:
+            return
+        self._hashes.add(key)
+        legacy = self._get_data(key)
+        if isinstance(legacy, dict):
+            if legacy:
+                self._write("hset", str(key), self._encode_mapping(legacy))
+            self._write("delete", str(key))
+
+    def hgetall(self, key):
+        if not self._native_hash:
+            return self.get_key(key) or {}
+        self._hash_ready(key)
+        data = self._cache.lookup(key)
+        if not isinstance(data, dict):
+            self.flush(str(key))
+            data, legacy = self._decode_mapping(self._hgetall(str(key)))
+            if legacy:
+                self._write("hset", str(key), legacy)
+            self._cache[key] = data
+        return data
+
+    def hget(self, key, field, default=None):
+        return self.hgetall(key).get(field, default)
+
+    def hkeys(self, key):
+        if not self._native_hash or isinstance(self._cache.get(key), dict):
+            return list(self.hgetall(key))
+        self._hash_ready(key)
+        self.flush(str(key))
+        return [decode_field(field) for field in self._hkeys(str(key))]
+
+    def hset(self, key, field, value):
+        if not self._native_hash:
+            data = self.get_key(key) or {}
+            data[field] = value
+            return self.set_key(key, data)
+        self._hash_ready(key)
+        self._write("hset", str(key), self._encode_mapping({field: value}))
+        if key in self._cache:
+            if isinstance(self._cache[key], dict):
+                self._cache[key][field] = value
+                self._cache.grow(key, sizeof(field) + sizeof(value))
+            else:
+                self._cache[key] = {field: value}
+        self._changed(key)
+        return True
+
+    def hset_many(self, key, mapping):
+        """hset of many fields, in one write."""
+        if not mapping:
+            return True
+        if not self._native_hash:
+            data = self.get_key(key) or {}
+            data.update(mapping)
+            return self.set_key(key, data)
+        self._hash_ready(key)
+        self._write("hset", str(key), self._encode_mapping(mapping))
+        if isinstance(self._cache.get(key), dict):
+            self._cache[key].update(mapping)
+            self._cache.grow(key, sizeof(mapping))
+        self._changed(key)
+        return True
+
+    def hdel(self, key, field):
+        if not self._native_hash:
+            data = self.get_key(key)
+            if not isinstance(data, dict) or field not in data:
+                return False
+            del data[field]
+            return self.set_key(key, data)
+        self._hash_ready(key)
+        if isinstance(self._cache.get(key), dict) and field in self._cache[key]:
+            self._cache.grow(key, -sizeof(field) - sizeof(self._cache[key].pop(field)))
+        self._changed(key)
+        return bool(self._write("hdel", str(key), [encode_field(field)]))
+
+    # Membership sets for list keys (PMPERMIT, GBLACKLISTS, ...). get_key
+    # still returns a list; on backends with `_native_hash` every member is
+    # stored on its own, elsewhere the whole list is rewritten.
+
+    def _set_names(self):
+        return []
+
+    def _sadd(self, key, members):
+        self._hset(SET_PREFIX + key, dict.fromkeys(members, ""))
+
+    def _srem(self, key, members):
+        return self._hdel(SET_PREFIX + key, members)
+
+    def _smembers(self, key):
+        return self._hkeys(SET_PREFIX + key)
+
+    def _sdrop(self, key):
+        self._hdrop(SET_PREFIX + key)
+
+    def _set_ready(self, key):
+        """Move a legacy list value of `key` to a membership set, once."""
+        if key in self._sets:
+            return
+        self._sets.add(key)
+        legacy = self._get_data(key)
+        if legacy is not None:
+            if not isinstance(legacy, (list, tuple, set, frozenset)):
+                legacy = [legacy]
+            if legacy:
+                self._write("sadd", str(key), [encode_field(_) for _ in legacy])
+            self._write("delete", str(key))
+
+    def smembers(self, key):
+        if not self._native_hash:
+            data = self.get_key(key)
+            if data is None:
+                return []
+            return data if isinstance(data, list) else [data]
+        self._set_ready(key)
+        data = self._cache.lookup(key)
+        if not isinstance(data, list):
+            self.flush(str(key))
+            data = [decode_field(member) for member in self._smembers(str(key))]
+            self._cache[key] = data
+        return data
+
+    def sismember(self, key, member):
+        members = self.smembers(key)
+        # set of the cached list, rebuilt when the list changes other than
+        # through sadd/srem.
+        index = self._indexes.get(key)
+        if not index or index[0] is not members or index[1] != len(members):
+            try:
+                index = [members, len(members), set(members)]
+            except TypeError:
+                return member in members
+            self._indexes[key] = index
+        return member in index[2]
+
+    def _reindex(self, key, members, added=(), removed=()):
+        """Apply a write of ours to the sismember index instead of rebuilding it."""
+        index = self._indexes.get(key)
+        if index and index[0] is members:
+            index[2].update(added)
+            index[2].difference_update(removed)
+            index[1] = len(members)
+
+    def sadd(self, key, member):
+        if self.sismember(key, member):
+            return False
+        members = self.smembers(key)
+        if not self._native_hash:
+            return self.set_key(key, members + [member])
+        self._write("sadd", str(key), [encode_field(member)])
+        members.append(member)
+        self._reindex(key, members, added=(member,))
+        self._cache.grow(key, sizeof(member))
+        self._changed(key)
+        return True
+
+    def sadd_many(self, key, members):
+        """sadd of many members, in one write. Returns how many were new."""
+        new = [_ for _ in dict.fromkeys(members) if not self.sismember(key, _)]
+        if not new:
+            return 0
+        current = self.smembers(key)
+        if not self._native_hash:
+            self.set_key(key, current + new)
+            return len(new)
+        self._write("sadd", str(key), [encode_field(_) for _ in new])
+        current.extend(new)
+        self._reindex(key, current, added=new)
+        self._cache.grow(key, sizeof(new))
+        self._changed(key)
+        return len(new)
+
+    def srem(self, key, member):
+        if not self.sismember(key, member):
+            return False
+        members = self.smembers(key)
+        if not self._native_hash:
+            return self.set_key(key, [_ for _ in members if _ != member])
+        self._write("srem", str(key), [encode_field(member)])
+        members.remove(member)
+        self._reindex(key, members, removed=(member,))
+        self._cache.grow(key, -sizeof(member))
+        self._changed(key)
+        return True
+
 
 class MongoDB(_BaseDatabase):
+    _native_hash = True
+
     def __init__(self, key, dbname="UltroidDB"):
+        self._url = key
+        self._dbname = dbname
         self.dB = MongoClient(key, serverSelectionTimeoutMS=5000)
         self.db = self.dB[dbname]
+        # Plain keys as {_id: key, value}, collection keys as one
+        # {key, field, value} document per field.
+        self.kv = self.db[_MONGO_KV]
+        self.fields = self.db[_MONGO_HASH]
+        self.fields.create_index([("key", 1), ("field", 1)], unique=True)
+        self._migrate_collections()
         super().__init__()
 
     def __repr__(self):
@@ -128,28 +753,148 @@ class MongoDB(_BaseDatabase):
         if self.dB.server_info():
             return True
 
+    def _async_driver(self):
+        return MongoDriver(self._url, self._dbname, _MONGO_KV, _MONGO_HASH)
+
+    def _sync_channel(self):
+        return MongoSync(self, _MONGO_EVENTS)
+
     def keys(self):
-        return self.db.list_collection_names()
+        return [doc["_id"] for doc in self.kv.find({}, {"_id": 1})] + _unprefixed(
+            self._hash_names()
+        )
 
     def set(self, key, value):
-        if key in self.keys():
-            self.db[key].replace_one({"_id": key}, {"value": str(value)})
-        else:
-            self.db[key].insert_one({"_id": key, "value": str(value)})
+        self.kv.replace_one({"_id": key}, {"value": str(value)}, upsert=True)
         return True
 
     def delete(self, key):
-        self.db.drop_collection(key)
+        return bool(self.kv.delete_one({"_id": key}).deleted_count)
 
     def get(self, key):
-        if x := self.db[key].find_one({"_id": key}):
+        if x := self.kv.find_one({"_id": key}):
             return x["value"]
 
+    def _get_all(self):
+        return {doc["_id"]: doc["value"] for doc in self.kv.find({})}
+
+    def _get_many(self, keys):
+        return {
+            doc["_id"]: doc["value"] for doc in self.kv.find({"_id": {"$in": keys}})
+        }
+
+    def _hgetall_many(self, keys):
+        data = {key: {} for key in keys}
+        for doc in self.fields.find({"key": {"$in": keys}}):
+            data[doc["key"]][doc["field"]] = doc["value"]
+        return data
+
     def flushall(self):
-        self.dB.drop_database("UltroidDB")
+        self.dB.drop_database(self._dbname)
+        self.fields.create_index([("key", 1), ("field", 1)], unique=True)
         self._cache.clear()
+        self._hashes.clear()
         return True
 
+    # Older versions kept every key in a collection of its own.
+
+    def _migrate_collections(self):
+        """Move keys of the collection-per-key layout into the kv collections, once."""
+        keys, fields, names = [], [], []
+        for name in self.db.list_collection_names():
+            if name in (_MONGO_KV, _MONGO_HASH, _MONGO_EVENTS) or name.startswith(
+                "system."
+            ):
+                continue
+            if name.startswith(HASH_PREFIX):
+                key = name[len(HASH_PREFIX) :]
+                fields.extend(
+                    ReplaceOne(
+                        {"key": key, "field": doc["_id"]},
+                        {"key": key, "field": doc["_id"], "value": doc["value"]},
+                        upsert=True,
+                    )
+                    for doc in self.db[name].find({})
+                )
+            elif doc := self.db[name].find_one({"_id": name}):
+                keys.append(ReplaceOne({"_id": name}, {"value": doc["value"]}, upsert=True))
+            else:
+                continue
+            names.append(name)
+        if not names:
+            return
+        if keys:
+            self.kv.bulk_write(keys, ordered=False)
+        if fields:
+            self.fields.bulk_write(fields, ordered=False)
+        # Dropped only once everything is copied; upserts make a rerun safe.
+        for name in names:
+            self.db.drop_collection(name)
+        LOGS.info("Moved %s Mongo collections into %s.", len(names), _MONGO_KV)
+
+    # One document per field, in the UltroidHash collection.
+
+    def _hash_names(self):
+        return self.fields.distinct("key")
+
+    def _hset(self, key, mapping):
+        self.fields.bulk_write(_mongo_hset(key, mapping), ordered=False)
+
+    def _hdel(self, key, fields):
+        return self.fields.delete_many(
+            {"key": key, "field": {"$in": fields}}
+        ).deleted_count
+
+    def _hkeys(self, key):
+        return [doc["field"] for doc in self.fields.find({"key": key}, {"field": 1})]
+
+    def _hgetall(self, key):
+        return {doc["field"]: doc["value"] for doc in self.fields.find({"key": key})}
+
+    def _hdrop(self, key):
+        self.fields.delete_many({"key": key})
+
+    def _write_batch(self, ops):
+        # One ordered bulk_write per collection.
+        keys, fields = [], []
+        for op, key, *args in ops:
+            if op in _SET_AS_HASH:
+                op, key = _SET_AS_HASH[op], SET_PREFIX + key
+                if op == "hset":
+                    args = [dict.fromkeys(args[0], "")]
+            if op == "set":
+                keys.append(ReplaceOne({"_id": key}, {"value": str(args[0])}, upsert=True))
+            elif op == "delete":
+                keys.append(DeleteOne({"_id": key}))
+            elif op == "hset":
+                fields.extend(_mongo_hset(key, args[0]))
+            elif op == "hdel":
+                fields.append(DeleteMany({"key": key, "field": {"$in": args[0]}}))
+            else:
+                fields.append(DeleteMany({"key": key}))
+        if keys:
+            self.kv.bulk_write(keys)
+        if fields:
+            self.fields.bulk_write(fields)
+
+
+def _unprefixed(names):
+    return [
+        name[len(SET_PREFIX) :] if name.startswith(SET_PREFIX) else name
+        for name in names
+    ]
+
+
+def _mongo_hset(key, mapping):
+    return [
+        ReplaceOne(
+            {"key": key, "field": field},
+            {"key": key, "field": field, "value": value},
+            upsert=True,
+        )
+        for field, value in mapping.items()
+    ]
+
 
 # --------------------------------------------------------------------------------------------- #
 
@@ -159,7 +904,29 @@ class MongoDB(_BaseDatabase):
 # Please use https://elephantsql.com/ !
 
 
+_SQL_TABLES = (
+    """CREATE TABLE IF NOT EXISTS UltroidKV (
+    key TEXT PRIMARY KEY,
+    value BYTEA,
+    updated_at TIMESTAMPTZ DEFAULT now()
+)""",
+    """CREATE TABLE IF NOT EXISTS UltroidHash (
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (key, field)
+)""",
+)
+
+_SQL_UPSERT = (
+    "INSERT INTO UltroidKV (key, value, updated_at) VALUES (%s, %s, now()) "
+    "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()"
+)
+
+
 class SqlDB(_BaseDatabase):
+    _native_hash = True
+
     def __init__(self, url):
         self._url = url
         self._connection = None
@@ -168,9 +935,9 @@ class SqlDB(_BaseDatabase):
             self._connection = psycopg2.connect(dsn=url)
             self._connection.autocommit = True
             self._cursor = self._connection.cursor()
-            self._cursor.execute(
-                "CREATE TABLE IF NOT EXISTS Ultroid (ultroidCli varchar(70))"
-            )
+            for table in _SQL_TABLES:
+                self._cursor.execute(table)
+            self._migrate_columns()
         except psycopg2.Error as error: # Use specific psycopg2 base error
             LOGS.error("SQL Database connection error: %s", error, exc_info=True)
             LOGS.info("Invalid SQL Database configuration.")
@@ -183,77 +950,181 @@ class SqlDB(_BaseDatabase):
     def name(self):
         return "SQL"
 
+    def _async_driver(self):
+        return SqlDriver(self._url)
+
+    def _executor_client(self):
+        # psycopg2 cursors aren't thread safe, the worker gets a connection
+        # of its own.
+        client = copy.copy(self)
+        client._connection = psycopg2.connect(dsn=self._url)
+        client._connection.autocommit = True
+        client._cursor = client._connection.cursor()
+        return client
+
+    def _sync_channel(self):
+        return SqlSync(self, self._url)
+
     @property
     def usage(self):
         self._cursor.execute(
-            "SELECT pg_size_pretty(pg_relation_size('Ultroid')) AS size"
+            "SELECT pg_total_relation_size('UltroidKV') + pg_total_relation_size('UltroidHash')"
         )
-        data = self._cursor.fetchall()
-        return int(data[0][0].split()[0])
+        return int(self._cursor.fetchone()[0])
 
     def keys(self):
-        self._cursor.execute(
-            "SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name  = 'ultroid'"
-        )  # case sensitive
-        data = self._cursor.fetchall()
-        return [_[0] for _ in data]
+        self._cursor.execute("SELECT key FROM UltroidKV")
+        return [_[0] for _ in self._cursor.fetchall()] + _unprefixed(self._hash_names())
 
     def get(self, variable):
-        try:
-            self._cursor.execute(f"SELECT {variable} FROM Ultroid") # Ensure variable is sanitized if it comes from user input
-        except psycopg2.errors.UndefinedColumn: # pylint: disable=no-member
-            return None
-        data = self._cursor.fetchall()
-        if not data:
-            return None
-        if len(data) >= 1:
-            for i in data:
-                if i[0]:
-                    return i[0]
+        self._cursor.execute("SELECT value FROM UltroidKV WHERE key = %s", (variable,))
+        data = self._cursor.fetchone()
+        if not data and variable != variable.upper():
+            data = self._legacy_case(variable)
+        if data and data[0] is not None:
+            return bytes(data[0]).decode()
 
     def set(self, key, value):
-        try:
-            # Check if column exists before trying to drop, to avoid error if it doesn't
-            self._cursor.execute(f"ALTER TABLE Ultroid DROP COLUMN IF EXISTS {key}")
-        except psycopg2.errors.UndefinedColumn: # pylint: disable=no-member
-            # Column doesn't exist, which is fine for ensuring it's dropped.
-            pass
-        except psycopg2.Error as er: # Catch specific psycopg2 errors
-            LOGS.error("Error dropping column %s: %s", key, er, exc_info=True)
-            # Depending on policy, may want to return False or raise
-        # except psycopg2.errors.SyntaxError: # pylint: disable=no-member
-        #     # This might indicate an issue with the key name (e.g. SQL injection if not careful)
-        #     LOGS.error("Syntax error while trying to drop column %s.", key, exc_info=True)
-        #     pass
-
-        self._cache.update({key: value})
-        self._cursor.execute(f"ALTER TABLE Ultroid ADD {key} TEXT")
-        self._cursor.execute(f"INSERT INTO Ultroid ({key}) values (%s)", (str(value),))
+        self._cursor.execute(_SQL_UPSERT, (key, str(value).encode()))
         return True
 
     def delete(self, key):
-        try:
-            self._cursor.execute(f"ALTER TABLE Ultroid DROP COLUMN {key}")
-        except psycopg2.errors.UndefinedColumn: # pylint: disable=no-member
-            return False # Column didn't exist
-        except psycopg2.Error as e_drop: # Other SQL errors
-            LOGS.error("Error dropping column %s during delete: %s", key, e_drop)
-            return False
-        return True
+        self._cursor.execute("DELETE FROM UltroidKV WHERE key = %s", (key,))
+        return bool(self._cursor.rowcount)
+
+    def _get_all(self):
+        self._cursor.execute("SELECT key, value FROM UltroidKV WHERE value IS NOT NULL")
+        return {key: bytes(value).decode() for key, value in self._cursor.fetchall()}
+
+    def _get_many(self, keys):
+        self._cursor.execute(
+            "SELECT key, value FROM UltroidKV WHERE key = ANY(%s) AND value IS NOT NULL",
+            (keys,),
+        )
+        data = {key: bytes(value).decode() for key, value in self._cursor.fetchall()}
+        for key in keys:
+            # Lower-case keys may still be stored upper-cased, see _legacy_case.
+            if key not in data and key != key.upper():
+                if (value := self.get(key)) is not None:
+                    data[key] = value
+        return data
+
+    def _hgetall_many(self, keys):
+        data = {key: {} for key in keys}
+        self._cursor.execute(
+            "SELECT key, field, value FROM UltroidHash WHERE key = ANY(%s)", (keys,)
+        )
+        for key, field, value in self._cursor.fetchall():
+            data[key][field] = value
+        return data
 
     def flushall(self):
         self._cache.clear()
-        self._cursor.execute("DROP TABLE Ultroid")
+        self._hashes.clear()
+        self._cursor.execute("DROP TABLE IF EXISTS UltroidKV")
+        self._cursor.execute("DROP TABLE IF EXISTS UltroidHash")
+        for table in _SQL_TABLES:
+            self._cursor.execute(table)
+        return True
+
+    def _write_batch(self, ops):
+        # The connection is in autocommit mode, group the batch into a
+        # single transaction.
+        self._cursor.execute("BEGIN")
+        try:
+            super()._write_batch(ops)
+        except BaseException:
+            self._cursor.execute("ROLLBACK")
+            raise
+        self._cursor.execute("COMMIT")
+
+    # Older versions kept every key as a column of the "Ultroid" table.
+
+    def _migrate_columns(self):
+        """Move keys of the column-per-key layout into UltroidKV, once."""
+        self._cursor.execute("SELECT to_regclass('ultroid')")
+        if not self._cursor.fetchone()[0]:
+            return
+        self._cursor.execute("SELECT * FROM Ultroid")
+        columns = [_[0] for _ in self._cursor.description]
+        rows = self._cursor.fetchall()
+        data = {}
+        for index, column in enumerate(columns):
+            if column == "ultroidcli":
+                continue
+            for row in rows:
+                if row[index]:
+                    data[column] = row[index]
+                    break
+        self._cursor.execute("BEGIN")
+        try:
+            # Postgres folded the column names to lower case, the original
+            # case is restored by `_legacy_case` on first read, so these rows
+            # are marked with a NULL updated_at.
+            self._cursor.executemany(
+                "INSERT INTO UltroidKV (key, value, updated_at) VALUES (%s, %s, NULL) "
+                "ON CONFLICT (key) DO NOTHING",
+                [(key.upper(), value.encode()) for key, value in data.items()],
+            )
+            self._cursor.execute("ALTER TABLE Ultroid RENAME TO UltroidColumns")
+        except BaseException:
+            self._cursor.execute("ROLLBACK")
+            raise
+        self._cursor.execute("COMMIT")
+        LOGS.info(
+            "Moved %s keys to the UltroidKV table, old table kept as UltroidColumns.",
+            len(data),
+        )
+
+    def _legacy_case(self, key):
+        # Key with lower case letters, which a migrated row stores upper cased.
         self._cursor.execute(
-            "CREATE TABLE IF NOT EXISTS Ultroid (ultroidCli varchar(70))"
+            "UPDATE UltroidKV SET key = %s, updated_at = now() "
+            "WHERE key = %s AND updated_at IS NULL RETURNING value",
+            (key, key.upper()),
         )
-        return True
+        return self._cursor.fetchone()
+
+    # One row per field, in the UltroidHash table.
+
+    def _hash_names(self):
+        self._cursor.execute("SELECT DISTINCT key FROM UltroidHash")
+        return [_[0] for _ in self._cursor.fetchall()]
+
+    def _hset(self, key, mapping):
+        self._cursor.executemany(
+            "INSERT INTO UltroidHash (key, field, value) VALUES (%s, %s, %s) "
+            "ON CONFLICT (key, field) DO UPDATE SET value = EXCLUDED.value",
+            [(key, field, value) for field, value in mapping.items()],
+        )
+
+    def _hdel(self, key, fields):
+        self._cursor.execute(
+            "DELETE FROM UltroidHash WHERE key = %s AND field = ANY(%s)",
+            (key, list(fields)),
+        )
+        return self._cursor.rowcount
+
+    def _hkeys(self, key):
+        self._cursor.execute("SELECT field FROM UltroidHash WHERE key = %s", (key,))
+        return [_[0] for _ in self._cursor.fetchall()]
+
+    def _hgetall(self, key):
+        self._cursor.execute(
+            "SELECT field, value FROM UltroidHash WHERE key = %s", (key,)
+        )
+        return dict(self._cursor.fetchall())
+
+    def _hdrop(self, key):
+        self._cursor.execute("DELETE FROM UltroidHash WHERE key = %s", (key,))
 
 
 # --------------------------------------------------------------------------------------------- #
 
 
 class RedisDB(_BaseDatabase):
+    _native_hash = True
+
     def __init__(
         self,
         host,
@@ -318,11 +1189,16 @@ class RedisDB(_BaseDatabase):
         # If Var.REDIS_URI is the primary source and is a full URI, this might be simpler.
         # For now, respecting the structure that seems to prioritize individual components or Qovery.
 
-        self.db = Redis(**connection_kwargs) # Pass all collected kwargs
+        # One pool for the main thread, the async layer's worker and the sync
+        # listener. Once all connections are busy, callers wait for one.
+        connection_kwargs.setdefault("max_connections", Var.REDIS_POOL_SIZE)
+        self._connection_kwargs = connection_kwargs
+        self.db = Redis(
+            connection_pool=BlockingConnectionPool(timeout=10, **connection_kwargs)
+        )
         # Alias methods
         self.set = self.db.set # type: ignore
         self.get = self.db.get
-        self.keys = self.db.keys
         self.delete = self.db.delete
         super().__init__()
 
@@ -330,9 +1206,133 @@ class RedisDB(_BaseDatabase):
     def name(self):
         return "Redis"
 
+    def _async_driver(self):
+        return RedisDriver(**self._connection_kwargs)
+
+    def _sync_channel(self):
+        return RedisSync(self)
+
+    # SCAN walks the keyspace in steps, KEYS would block the server for
+    # the whole of it.
+
+    def _scan(self, match=None):
+        return self.db.scan_iter(match=match, count=_SCAN_COUNT)
+
+    def _chunks(self, keys):
+        chunk = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) == _SCAN_COUNT:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     @property
     def usage(self):
-        return sum(self.db.memory_usage(x) for x in self.keys())
+        total = 0
+        for chunk in self._chunks(self._scan()):
+            pipe = self.db.pipeline(transaction=False)
+            for key in chunk:
+                pipe.memory_usage(key)
+            total += sum(size or 0 for size in pipe.execute())
+        return total
+
+    def keys(self):
+        return [
+            key[3:] if key.startswith((HASH_PREFIX, SET_PREFIX)) else key
+            for key in self._scan()
+        ]
+
+    def _get_all(self):
+        keys = (
+            key
+            for key in self._scan()
+            if not key.startswith((HASH_PREFIX, SET_PREFIX))
+        )
+        data = {}
+        for chunk in self._chunks(keys):
+            data.update(self._get_many(chunk))
+        return data
+
+    def _get_many(self, keys):
+        if not keys:
+            return {}
+        return {
+            key: value
+            for key, value in zip(keys, self.db.mget(keys))
+            if value is not None
+        }
+
+    def _hgetall_many(self, keys):
+        pipe = self.db.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(HASH_PREFIX + key)
+        return dict(zip(keys, pipe.execute()))
+
+    def _smembers_many(self, keys):
+        pipe = self.db.pipeline(transaction=False)
+        for key in keys:
+            pipe.smembers(SET_PREFIX + key)
+        return dict(zip(keys, pipe.execute()))
+
+    # Collection keys are stored as native redis hashes.
+
+    def _hash_names(self):
+        return [key[len(HASH_PREFIX) :] for key in self._scan(f"{HASH_PREFIX}*")]
+
+    def _hset(self, key, mapping):
+        self.db.hset(HASH_PREFIX + key, mapping=mapping)
+
+    def _hdel(self, key, fields):
+        return self.db.hdel(HASH_PREFIX + key, *fields)
+
+    def _hkeys(self, key):
+        return self.db.hkeys(HASH_PREFIX + key)
+
+    def _hgetall(self, key):
+        return self.db.hgetall(HASH_PREFIX + key)
+
+    def _hdrop(self, key):
+        self.db.delete(HASH_PREFIX + key)
+
+    # Membership sets are native redis sets.
+
+    def _set_names(self):
+        return [key[len(SET_PREFIX) :] for key in self._scan(f"{SET_PREFIX}*")]
+
+    def _sadd(self, key, members):
+        self.db.sadd(SET_PREFIX + key, *members)
+
+    def _srem(self, key, members):
+        return self.db.srem(SET_PREFIX + key, *members)
+
+    def _smembers(self, key):
+        return self.db.smembers(SET_PREFIX + key)
+
+    def _sdrop(self, key):
+        self.db.delete(SET_PREFIX + key)
+
+    def _write_batch(self, ops):
+        pipe = self.db.pipeline(transaction=False)
+        for op, key, *args in ops:
+            if op == "set":
+                pipe.set(key, args[0])
+            elif op == "delete":
+                pipe.delete(key)
+            elif op == "hset":
+                pipe.hset(HASH_PREFIX + key, mapping=args[0])
+            elif op == "hdel":
+                pipe.hdel(HASH_PREFIX + key, *args[0])
+            elif op == "hdrop":
+                pipe.delete(HASH_PREFIX + key)
+            elif op == "sadd":
+                pipe.sadd(SET_PREFIX + key, *args[0])
+            elif op == "srem":
+                pipe.srem(SET_PREFIX + key, *args[0])
+            else:
+                pipe.delete(SET_PREFIX + key)
+        pipe.execute()
 
 
 # --------------------------------------------------------------------------------------------- #
@@ -340,7 +1340,8 @@ class RedisDB(_BaseDatabase):
 
 class LocalDB(_BaseDatabase):
     def __init__(self):
-        self.db = Database("ultroid")
+        # Takes over ultroid.json of the older json file engine.
+        self.db = LogStore("ultroid_db", legacy="ultroid.json")
         self.get = self.db.get
         self.set = self.db.set
         self.delete = self.db.delete
@@ -350,8 +1351,18 @@ class LocalDB(_BaseDatabase):
     def name(self):
         return "LocalDB"
 
+    @property
+    def usage(self):
+        return self.db.size
+
     def keys(self):
-        return self._cache.keys()
+        return list(self.db.data)
+
+    def _get_all(self):
+        return dict(self.db.data)
+
+    def _sync_channel(self):
+        return FileSync(self)
 
     def __repr__(self):
         return f"<Ultroid.LocalDB\n -total_keys: {len(self.keys())}\n>"
@@ -363,7 +1374,7 @@ def UltroidDB():
 
     try:
         if Redis:
-            return RedisDB(
+            udb = RedisDB(
                 host=Var.REDIS_URI or Var.REDISHOST,
                 password=Var.REDIS_PASSWORD or Var.REDISPASSWORD,
                 port=Var.REDISPORT,
@@ -373,20 +1384,27 @@ def UltroidDB():
                 retry_on_timeout=True,
             )
         elif MongoClient:
-            return MongoDB(Var.MONGO_URI)
+            udb = MongoDB(Var.MONGO_URI)
         elif psycopg2:
-            return SqlDB(Var.DATABASE_URL)
+            udb = SqlDB(Var.DATABASE_URL)
         else:
             LOGS.critical(
                 "No DB requirement fullfilled!\nPlease install redis, mongo or sql dependencies...\nTill then using local file as database."
             )
-            return LocalDB()
+            udb = LocalDB()
     except Exception as err: # Changed from BaseException
         LOGS.error("Failed to initialize database: %s", err, exc_info=True)
-    # exit() here is problematic as it will stop the bot if any DB init fails.
-    # Consider returning None or raising a specific custom error to be handled by main.
-    # For now, keeping original exit() behavior.
-    sys.exit("Database initialization failed.")
+        # exit() here is problematic as it will stop the bot if any DB init fails.
+        # Consider returning None or raising a specific custom error to be handled by main.
+        # For now, keeping original exit() behavior.
+        sys.exit("Database initialization failed.")
+    if Var.DB_PRELOAD:
+        # Warm the cache before plugins load, so handlers don't wait on it.
+        try:
+            udb.re_cache()
+        except Exception as er:
+            LOGS.exception(er)
+    return udb
 
 
 # --------------------------------------------------------------------------------------------- #
@@ -0,0 +1,203 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Read cache of the database.
+
+A dict by default. Given a limit on entries and/or bytes it evicts the
+least recently used keys, and given a TTL it forgets keys after that many
+seconds, so they are read from the database again. Pinned keys are kept
+regardless.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+# Read on every command or message, never worth evicting.
+PINNED = {
+    "HNDLR",
+    "SUDO_HNDLR",
+    "DUAL_HNDLR",
+    "LOG_CHANNEL",
+    "SUDO",
+    "SUDOS",
+    "FULLSUDO",
+    "OWNER_ID",
+    "BLACKLIST_CHATS",
+}
+
+# Large and only read now and then, left out of re_cache and read on first use.
+LAZY = {
+    "GBAN",
+}
+
+
+def sizeof(value):
+    """Approximate memory held by `value`, in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sizeof(key) + sizeof(item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += sizeof(item)
+    return size
+
+
+def parse_ttl(config):
+    """`"300"` or `"USERNAME_DB=600,GBAN=3600"`, a bare number being the default."""
+    default, per_key = 0, {}
+    for part in str(config or "").split(","):
+        key, _, seconds = part.strip().rpartition("=")
+        if not seconds:
+            continue
+        if key:
+            per_key[key.strip()] = float(seconds)
+        else:
+            default = float(seconds)
+    return default, per_key
+
+
+class DBCache:
+    """LRU cache with optional TTL, used as `_BaseDatabase._cache`."""
+
+    def __init__(self, max_entries=0, max_bytes=0, ttl=0, key_ttl=None, pinned=()):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.key_ttl = key_ttl or {}
+        self.pinned = set(PINNED).union(pinned)
+        self._bounded = bool(max_entries or max_bytes)
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._expiry = {}
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(list(self._data))
+
+    def keys(self):
+        return list(self._data)
+
+    def __contains__(self, key):
+        if key not in self._data:
+            return False
+        if self._expiry and key in self._expiry and self._expiry[key] <= time.monotonic():
+            self.expired += 1
+            self._remove(key)
+            return False
+        return True
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def lookup(self, key):
+        """get, which counts hits and misses."""
+        if key in self:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self.misses += 1
+        return MISSING
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def set(self, key, value, pin=False):
+        if pin:
+            self.pinned.add(key)
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = value
+        if self._bounded:
+            self._sizes[key] = size = sizeof(value)
+            self.bytes += size
+        ttl = self.key_ttl.get(key, self.ttl)
+        if ttl and key not in self.pinned:
+            self._expiry[key] = time.monotonic() + ttl
+        if self._bounded:
+            self._shrink()
+
+    def update(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def grow(self, key, delta):
+        """Account for a value changed in place, like a field set on a dict."""
+        if key in self._sizes:
+            self._sizes[key] += delta
+            self.bytes += delta
+            self._shrink()
+
+    def __delitem__(self, key):
+        if key not in self._data:
+            raise KeyError(key)
+        self._remove(key)
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+        value = self._data[key]
+        self._remove(key)
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+        self._expiry.clear()
+        self.bytes = 0
+
+    def _remove(self, key):
+        del self._data[key]
+        self.bytes -= self._sizes.pop(key, 0)
+        self._expiry.pop(key, None)
+
+    def _over(self):
+        return (self.max_entries and len(self._data) > self.max_entries) or (
+            self.max_bytes and self.bytes > self.max_bytes
+        )
+
+    def _shrink(self):
+        if not (self._bounded and self._over()):
+            return
+        keys = iter(list(self._data))
+        while self._over():
+            key = next(keys, MISSING)
+            if key is MISSING:
+                break
+            if key in self.pinned:
+                continue
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            # only tracked with limits set, measured now otherwise
+            "bytes": self.bytes
+            if self._bounded
+            else sum(sizeof(value) for value in list(self._data.values())),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
@@ -0,0 +1,207 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Cache invalidation between processes sharing one database.
+
+multi_client.py runs several bots against the same database, each with a
+cache of its own. With `DB_SYNC` on, every process announces the keys it
+writes, and the others drop those keys from their cache, so the next read
+goes to the database. Announcements are carried by the backend itself:
+Redis pub/sub, a Mongo change stream, Postgres LISTEN/NOTIFY, or changes
+to the LocalDB log files. They are listened to on a thread, which hands
+the evictions over to the event loop, the only place the cache is touched.
+The loop is the one the clients run on, attached when the first of them
+starts; evictions received before that are kept until then.
+"""
+
+import json
+import os
+import select
+import time
+from threading import Lock, Thread
+from uuid import uuid4
+
+from . import LOGS
+
+CHANNEL = "ultroid_invalidate"
+
+# Keys per announcement, keeps NOTIFY payloads below the 8000 bytes limit.
+_CHUNK = 100
+
+
+class SyncChannel:
+    """Announces keys written by this process, evicts keys written by others."""
+
+    def __init__(self, db):
+        self.db = db
+        self.origin = f"{os.getpid()}:{uuid4().hex[:8]}"
+        self.loop = None
+        # {key: (is hash, is set)} evicted before a loop was attached
+        self._early = {}
+        self._lock = Lock()
+
+    def start(self):
+        Thread(target=self._run, name="udB-sync", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception as er:
+                LOGS.exception(er)
+            time.sleep(5)
+
+    def publish(self, keys):
+        keys = list(dict.fromkeys(keys))
+        for index in range(0, len(keys), _CHUNK):
+            chunk = keys[index : index + _CHUNK]
+            self.send(
+                {
+                    "o": self.origin,
+                    "k": chunk,
+                    # collection keys, which live in field storage now
+                    "h": [key for key in chunk if key in self.db._hashes],
+                    "s": [key for key in chunk if key in self.db._sets],
+                }
+            )
+
+    def receive(self, message):
+        if message["o"] != self.origin:
+            self.evict(message["k"], message["h"], message.get("s", []))
+
+    def attach(self, loop):
+        """Run evictions on `loop`, called by a client once it runs."""
+        with self._lock:
+            if self.loop is loop:
+                return
+            self.loop = loop
+            early, self._early = self._early, {}
+        if early:
+            loop.call_soon_threadsafe(
+                self.db._evict,
+                list(early),
+                [key for key, (hashed, _) in early.items() if hashed],
+                [key for key, (_, members) in early.items() if members],
+            )
+
+    def evict(self, keys, hashes, sets=()):
+        with self._lock:
+            if not self.loop:
+                for key in keys:
+                    self._early[key] = (key in hashes, key in sets)
+                return
+        self.loop.call_soon_threadsafe(self.db._evict, keys, hashes, sets)
+
+    def send(self, message):
+        raise NotImplementedError
+
+    def listen(self):
+        raise NotImplementedError
+
+
+class RedisSync(SyncChannel):
+    def send(self, message):
+        self.db.db.publish(CHANNEL, json.dumps(message))
+
+    def listen(self):
+        pubsub = self.db.db.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CHANNEL)
+        try:
+            while True:
+                # get_message waits on the socket itself, unlike listen(),
+                # which would trip over the socket_timeout of the client.
+                if message := pubsub.get_message(timeout=1.0):
+                    self.receive(json.loads(message["data"]))
+        finally:
+            pubsub.close()
+
+
+class MongoSync(SyncChannel):
+    """Announcements are inserted into a small capped collection."""
+
+    def __init__(self, db, name):
+        super().__init__(db)
+        from pymongo.errors import CollectionInvalid
+
+        try:
+            db.db.create_collection(name, capped=True, size=2**20)
+        except CollectionInvalid:
+            pass
+        self.events = db.db[name]
+        self._tail = False
+        # Tailable cursors die on an empty collection.
+        self.send({"o": self.origin, "k": [], "h": []})
+
+    def send(self, message):
+        self.events.insert_one(message)
+
+    def listen(self):
+        from pymongo import CursorType
+        from pymongo.errors import OperationFailure
+
+        if not self._tail:
+            try:
+                with self.events.watch(
+                    [{"$match": {"operationType": "insert"}}]
+                ) as stream:
+                    for change in stream:
+                        self.receive(change["fullDocument"])
+            except OperationFailure as er:
+                # Change streams need a replica set, tail the collection instead.
+                LOGS.info("Mongo change streams unavailable (%s), tailing instead.", er)
+                self._tail = True
+            else:
+                return
+        last = self.events.find_one(sort=[("$natural", -1)])
+        query = {"_id": {"$gt": last["_id"]}} if last else {}
+        cursor = self.events.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+        while cursor.alive:
+            for doc in cursor:
+                self.receive(doc)
+            time.sleep(1)
+
+
+class SqlSync(SyncChannel):
+    def __init__(self, db, url):
+        super().__init__(db)
+        self._url = url
+
+    def send(self, message):
+        self.db._cursor.execute(
+            "SELECT pg_notify(%s, %s)", (CHANNEL, json.dumps(message))
+        )
+
+    def listen(self):
+        import psycopg2
+
+        connection = psycopg2.connect(dsn=self._url)
+        connection.autocommit = True
+        try:
+            connection.cursor().execute(f"LISTEN {CHANNEL}")
+            while True:
+                if select.select([connection], [], [], 5) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self.receive(json.loads(connection.notifies.pop(0).payload))
+        finally:
+            connection.close()
+
+
+class FileSync(SyncChannel):
+    """Reloads the LocalDB files when another process modifies them."""
+
+    def send(self, message):
+        # The files changing on disk are the announcement.
+        pass
+
+    def listen(self):
+        while True:
+            time.sleep(1)
+            if changed := self.db.db.refresh():
+                self.evict(changed, [])
@@ -0,0 +1,345 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Storage engine of LocalDB.
+
+Data is served from memory. Every write is appended as one JSON line to
+the current log segment (`wal-<seq>.log`), which is fsynced at most once
+per `fsync_interval`. Full segments are sealed and a new one is started;
+every few segments the whole data is compacted into `snapshot-<seq>.json`,
+which replaces all segments up to `seq`. Startup loads the latest snapshot
+and replays the segments after it.
+
+Sealed segments and snapshots never change, so backups only have to upload
+the files they haven't uploaded yet.
+
+Several processes (multi_client.py) may share the files. Appends, rotation
+and compaction hold an flock on `lock`, which also records the current
+segment, so a process moves on to the segment another one started instead
+of writing into a compacted one, and compaction includes what the others
+wrote. Each process remembers how far it read the log and picks up the
+writes of the others by replaying the rest of it. Without fcntl (Windows)
+only one process may use the files.
+"""
+
+import ast
+import atexit
+import json
+import os
+import time
+from contextlib import contextmanager
+from threading import RLock
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_RECORD_SET = "s"
+_RECORD_DELETE = "d"
+_MISSING = object()
+
+
+class LogStore:
+    def __init__(
+        self,
+        path,
+        legacy=None,
+        segment_size=1 << 20,
+        compact_every=8,
+        fsync_interval=1.0,
+    ):
+        self.path = path
+        self.segment_size = segment_size
+        self.compact_every = compact_every
+        self.fsync_interval = fsync_interval
+        self._lock = RLock()
+        self._depth = 0
+        self._synced = time.monotonic()
+        self._file = None
+        # (segment, offset) up to which the log is in self.data
+        self._read = (0, 0)
+        # keys other processes changed, not returned by refresh() yet
+        self._unseen = set()
+        os.makedirs(path, exist_ok=True)
+        self._head = os.open(
+            os.path.join(path, "lock"), os.O_RDWR | os.O_CREAT, 0o644
+        )
+        with self._locked():
+            # Nobody appends while we hold the lock, so a torn last line is
+            # left over from a crash and safe to cut off.
+            self.data, self.base, self.seq = self._load(truncate=True)
+            self._set_head()
+            self._file = open(self._name("wal", self.seq), "a", encoding="utf-8")
+            self._read = (self.seq, self._end())
+            if legacy and not self.data and os.path.exists(legacy):
+                self._import(legacy)
+        atexit.register(self.sync)
+
+    # Processes
+
+    @contextmanager
+    def _locked(self):
+        """Hold the files against other processes, on the current segment."""
+        with self._lock:
+            if fcntl and not self._depth:
+                fcntl.flock(self._head, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                if self._file:
+                    self._follow()
+                yield
+            finally:
+                self._depth -= 1
+                if fcntl and not self._depth:
+                    fcntl.flock(self._head, fcntl.LOCK_UN)
+
+    def _set_head(self):
+        os.pwrite(self._head, f"{self.base:08d} {self.seq:08d}\n".encode(), 0)
+
+    def _follow(self):
+        """Switch to the segment another process rotated or compacted to."""
+        head = os.pread(self._head, 32, 0).split()
+        if len(head) != 2:
+            return
+        base, seq = map(int, head)
+        self.base = base
+        if seq != self.seq:
+            self._file.close()
+            self.seq = seq
+            self._file = open(self._name("wal", seq), "a", encoding="utf-8")
+
+    # Files
+
+    def _name(self, kind, seq):
+        ext = "json" if kind == "snapshot" else "log"
+        return os.path.join(self.path, f"{kind}-{seq:08d}.{ext}")
+
+    def _files(self, kind):
+        files = []
+        for name in os.listdir(self.path):
+            if name.startswith(f"{kind}-") and not name.endswith(".tmp"):
+                files.append((int(name.split("-")[1].split(".")[0]), name))
+        return sorted(files)
+
+    def _load(self, truncate=False):
+        data, base = {}, 0
+        if snapshots := self._files("snapshot"):
+            base, name = snapshots[-1]
+            with open(os.path.join(self.path, name), encoding="utf-8") as file:
+                data = json.load(file)
+        seq = base + 1
+        for number, name in self._files("wal"):
+            if number > base:
+                self._replay(os.path.join(self.path, name), data, truncate)
+                seq = number
+        return data, base, seq
+
+    def _replay(self, path, data, truncate=False, offset=0, before=None):
+        """Apply the records of a segment from `offset`, returns where they end.
+
+        `before` gets the value each key had before its first record."""
+        with open(path, "rb+" if truncate else "rb") as file:
+            file.seek(offset)
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write at the end, cut it off so appends stay parsable.
+                    if truncate:
+                        file.truncate(offset)
+                    break
+                offset += len(line)
+                if before is not None:
+                    before.setdefault(record[1], data.get(record[1], _MISSING))
+                if record[0] == _RECORD_SET:
+                    data[record[1]] = record[2]
+                else:
+                    data.pop(record[1], None)
+        return offset
+
+    def _import(self, legacy):
+        """Take over the JSON file of the older localdb engine."""
+        with open(legacy, encoding="utf-8") as file:
+            content = ast.literal_eval(file.read() or "{}")
+        # Non string values are kept in the legacy str() form, which the
+        # database decodes with literal_eval.
+        self.data = {
+            str(key): value if isinstance(value, str) else str(value)
+            for key, value in content.items()
+        }
+        self._snapshot(self.data)
+        os.replace(legacy, f"{legacy}.bak")
+
+    # Key/value access
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        with self._locked():
+            self.data[key] = value
+            self._append([_RECORD_SET, key, value])
+        return True
+
+    def delete(self, key):
+        with self._locked():
+            if key not in self.data:
+                return False
+            del self.data[key]
+            self._append([_RECORD_DELETE, key])
+        return True
+
+    @property
+    def size(self):
+        return sum(
+            os.path.getsize(os.path.join(self.path, name))
+            for name in os.listdir(self.path)
+        )
+
+    # Log
+
+    def _append(self, record):
+        unread = self._read != (self.seq, self._end())
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if not unread:
+            # The record is in self.data already, no need to read it back.
+            self._read = (self.seq, self._end())
+        if time.monotonic() - self._synced >= self.fsync_interval:
+            self.sync()
+        if self._end() >= self.segment_size:
+            self.rotate()
+
+    def _end(self):
+        # tell() misses what other processes appended
+        return os.fstat(self._file.fileno()).st_size
+
+    def sync(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._synced = time.monotonic()
+
+    def rotate(self):
+        """Seal the current segment, compacting every `compact_every` segments."""
+        with self._locked():
+            if not self._end():
+                return
+            if self.seq - self.base >= self.compact_every:
+                return self.compact()
+            self.sync()
+            unread = self._read != (self.seq, self._end())
+            self._file.close()
+            self.seq += 1
+            self._set_head()
+            self._file = open(self._name("wal", self.seq), "a", encoding="utf-8")
+            if not unread:
+                self._read = (self.seq, 0)
+
+    def compact(self):
+        """Write all data into a snapshot, which replaces every segment so far."""
+        with self._locked():
+            self.sync()
+            # With the writes of other processes too.
+            self._catch_up()
+            self._snapshot(self.data)
+
+    def _snapshot(self, data):
+        with self._locked():
+            path = self._name("snapshot", self.seq)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(f"{path}.tmp", path)
+            self._file.close()
+            self.base, self.seq = self.seq, self.seq + 1
+            self._set_head()
+            self._file = open(self._name("wal", self.seq), "a", encoding="utf-8")
+            self._read = (self.seq, 0)
+            for kind in ("snapshot", "wal"):
+                for number, name in self._files(kind):
+                    if number < self.base or (kind == "wal" and number == self.base):
+                        os.remove(os.path.join(self.path, name))
+
+    # Backups
+
+    def _uploaded(self):
+        try:
+            with open(os.path.join(self.path, "uploaded.json"), encoding="utf-8") as file:
+                return set(json.load(file))
+        except FileNotFoundError:
+            return set()
+
+    def pending_backups(self):
+        """Sealed files not backed up yet: the latest snapshot and the segments after it."""
+        with self._locked():
+            self.rotate()
+            uploaded = self._uploaded()
+            files = [name for _, name in self._files("snapshot")[-1:]]
+            files += [
+                name
+                for number, name in self._files("wal")
+                if self.base < number < self.seq
+            ]
+            return [
+                os.path.join(self.path, name) for name in files if name not in uploaded
+            ]
+
+    def mark_backed_up(self, path):
+        with self._locked():
+            current = {name for _, name in self._files("snapshot")}
+            current.update(name for _, name in self._files("wal"))
+            uploaded = (self._uploaded() | {os.path.basename(path)}) & current
+            with open(os.path.join(self.path, "uploaded.json"), "w", encoding="utf-8") as file:
+                json.dump(sorted(uploaded), file)
+
+    # Other processes
+
+    def _catch_up(self):
+        """Apply what other processes wrote since the last read."""
+        seq, offset = self._read
+        if seq <= self.base:
+            # Compacted by another process, the segments we read up to are gone.
+            data = self._load()[0]
+            self._unseen.update(
+                key
+                for key in self.data.keys() | data.keys()
+                if self.data.get(key, _MISSING) != data.get(key, _MISSING)
+            )
+            self.data = data
+            self._read = (self.seq, self._end())
+            return
+        before = {}
+        for number, name in self._files("wal"):
+            if number >= seq:
+                offset = self._replay(
+                    os.path.join(self.path, name),
+                    self.data,
+                    offset=offset if number == seq else 0,
+                    before=before,
+                )
+                seq = number
+        self._read = (seq, offset)
+        self._unseen.update(
+            key
+            for key, value in before.items()
+            if self.data.get(key, _MISSING) != value
+        )
+
+    def refresh(self):
+        """Apply the writes of other processes, returns the changed keys."""
+        with self._locked():
+            if self._read != (self.seq, self._end()):
+                self._catch_up()
+            changed, self._unseen = self._unseen, set()
+            return list(changed)
@@ -0,0 +1,130 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Entity and permission cache of a client.
+
+Handlers resolve the same users and chats over and over: the sender of
+every message, the chat to check admin rights in. `client.get_entity` and
+`client.get_permissions` keep what they fetched for `PEER_CACHE_TTL`
+seconds, keyed by peer id, so only the first of those calls goes to
+Telegram. Permissions are kept for at most a minute, and both are dropped
+early on the updates that change them: chat actions (joins, leaves,
+title changes...) and participant updates (promotions, bans). Changes of
+the default rights of a chat, or of the client's own status in a channel,
+drop every permission cached for that chat.
+"""
+
+from telethon import events
+from telethon.tl import types
+from telethon.utils import get_peer_id
+
+from ._dbcache import MISSING, DBCache
+
+PERMISSION_TTL = 60
+
+_PARTICIPANT_UPDATES = (
+    types.UpdateChannelParticipant,
+    types.UpdateChatParticipant,
+    types.UpdateChatParticipantAdmin,
+    types.UpdateChatParticipantAdd,
+    types.UpdateChatParticipantDelete,
+)
+
+_CHAT_UPDATES = (types.UpdateChannel, types.UpdateChatDefaultBannedRights)
+
+
+def peer_id(peer):
+    """Marked id of an id, peer or entity; None for usernames, phones, lists."""
+    if isinstance(peer, int):
+        return peer
+    if isinstance(peer, (str, bytes, list, tuple)) or peer is None:
+        return None
+    try:
+        return get_peer_id(peer)
+    except (TypeError, ValueError):
+        return None
+
+
+class PeerCache:
+    def __init__(self, client, ttl=300, size=10000):
+        self.client = client
+        self.entities = DBCache(max_entries=size, ttl=ttl)
+        self.permissions = DBCache(max_entries=size, ttl=min(ttl, PERMISSION_TTL))
+        self._watching = False
+
+    def __repr__(self):
+        return f"<PeerCache entities={len(self.entities)} permissions={len(self.permissions)}>"
+
+    def watch(self):
+        """Drop entries on the updates that change them, once per client."""
+        if self._watching:
+            return
+        self._watching = True
+        self.client.add_event_handler(self._on_action, events.ChatAction())
+        self.client.add_event_handler(
+            self._on_participant, events.Raw(_PARTICIPANT_UPDATES)
+        )
+        self.client.add_event_handler(self._on_chat, events.Raw(_CHAT_UPDATES))
+
+    async def get_entity(self, fetch, peer):
+        if (key := peer_id(peer)) is None:
+            return await fetch(peer)
+        if (entity := self.entities.lookup(key)) is MISSING:
+            entity = await fetch(peer)
+            self.entities[key] = entity
+        return entity
+
+    async def get_permissions(self, fetch, chat, user=None):
+        key = (peer_id(chat), peer_id(user) if user is not None else None)
+        if key[0] is None or (user is not None and key[1] is None):
+            return await fetch(chat, user)
+        if (perms := self.permissions.lookup(key)) is MISSING:
+            perms = await fetch(chat, user)
+            self.permissions[key] = perms
+        return perms
+
+    def forget(self, chat_id=None, user_ids=()):
+        """Drop the chat entity and the permissions of `user_ids` in the chat."""
+        if chat_id is not None:
+            self.entities.pop(chat_id)
+        for user_id in user_ids:
+            self.entities.pop(user_id)
+            self.permissions.pop((chat_id, user_id))
+        if chat_id is not None:
+            # the client's own rights, asked for with user=None
+            self.permissions.pop((chat_id, None))
+
+    def forget_chat(self, chat_id):
+        """Drop the chat entity and every permission cached in the chat."""
+        self.entities.pop(chat_id)
+        for key in [_ for _ in self.permissions.keys() if _[0] == chat_id]:
+            self.permissions.pop(key)
+
+    async def _on_action(self, event):
+        self.forget(event.chat_id, event.user_ids or [])
+
+    async def _on_participant(self, update):
+        if isinstance(update, types.UpdateChannelParticipant):
+            chat_id = get_peer_id(types.PeerChannel(update.channel_id))
+        else:
+            chat_id = get_peer_id(types.PeerChat(update.chat_id))
+        user_id = getattr(update, "user_id", None)
+        self.forget(chat_id, [user_id] if user_id else [])
+
+    async def _on_chat(self, update):
+        if isinstance(update, types.UpdateChannel):
+            chat_id = get_peer_id(types.PeerChannel(update.channel_id))
+        else:
+            chat_id = get_peer_id(update.peer)
+        self.forget_chat(chat_id)
+
+    def stats(self):
+        return {
+            "entities": self.entities.stats(),
+            "permissions": self.permissions.stats(),
+        }
@@ -0,0 +1,216 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+One NewMessage handler for the features that watch every message.
+
+Filters, notes, blacklists, mutes... each used to add a catch-all
+`events.NewMessage()` handler of its own, so every message went through
+all of them, each reading the database to find out the chat has nothing
+set. `client.router` is attached instead, and a feature subscribes to it:
+
+    ultroid_bot.router.subscribe(filter_func, feature="filters")
+
+Subscribers of a feature share one event builder whose `chats` is the
+chat index of the feature (`CHATS_<NAME>`, see _chatstore.py). The dB
+helpers keep that index up to date, so a message from a chat without the
+feature is dropped by the builder before any coroutine is scheduled, and
+a chat is watched as soon as the feature is set there. Subscribers
+without a feature share one builder that takes every message.
+
+Handlers get a `MessageContext`, which behaves like the event and resolves
+the sender, chat and lowercased text once for all of them. The `func`,
+`incoming` and `outgoing` conditions of the subscribers are checked in the
+builder too.
+"""
+
+from telethon import events
+
+from . import LOGS
+from ._chatstore import index_key
+
+_UNSET = object()
+
+
+class MessageContext:
+    """The event, with what every subscriber needs resolved once."""
+
+    __slots__ = ("event", "chat_id", "text", "lower", "wanted", "_sender", "_chat")
+
+    def __init__(self, event):
+        self.event = event
+        self.chat_id = event.chat_id
+        self.text = event.text
+        self.lower = (self.text or "").lower()
+        # builder group -> subscribers which passed its filter
+        self.wanted = {}
+        self._sender = _UNSET
+        self._chat = _UNSET
+
+    def __getattr__(self, name):
+        return getattr(self.event, name)
+
+    def __setattr__(self, name, value):
+        if name in MessageContext.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            # like `event._sender = user` in admin_check
+            setattr(self.event, name, value)
+
+    def __repr__(self):
+        return f"<MessageContext {self.chat_id}:{self.event.id}>"
+
+    async def get_sender(self):
+        if self._sender is _UNSET:
+            self._sender = await self.event.get_sender()
+        return self._sender
+
+    async def get_chat(self):
+        if self._chat is _UNSET:
+            self._chat = await self.event.get_chat()
+        return self._chat
+
+
+class ChatIndex:
+    """Live set of the chats with a feature, read from its chat index."""
+
+    __slots__ = ("db", "key")
+
+    def __init__(self, db, feature):
+        self.db = db
+        self.key = index_key(feature)
+
+    def __repr__(self):
+        return f"<ChatIndex {self.key}>"
+
+    def __contains__(self, chat_id):
+        return self.db.sismember(self.key, chat_id)
+
+    def __iter__(self):
+        return iter(self.db.smembers(self.key))
+
+    def __len__(self):
+        return len(self.db.smembers(self.key))
+
+
+def chat_builder(chats, builder=events.NewMessage, **kwargs):
+    """`builder(**kwargs)` only taking messages of the chats in `chats`.
+
+    Telethon turns `chats` into a fixed set of ids when the builder is
+    resolved, here any container works (a ChatIndex, a set kept up to date
+    by someone else...) and is asked on every message.
+    """
+    built = builder(**kwargs)
+    built.chats = chats
+    built.resolved = True
+    return built
+
+
+class _Subscriber:
+    __slots__ = ("callback", "incoming", "outgoing", "func")
+
+    def __init__(self, callback, incoming, outgoing, func):
+        self.callback = callback
+        self.incoming = incoming
+        self.outgoing = outgoing
+        self.func = func
+
+    def wants(self, ctx):
+        if self.incoming and ctx.out:
+            return False
+        if self.outgoing and not ctx.out:
+            return False
+        return not self.func or self.func(ctx)
+
+
+class MessageRouter:
+    def __init__(self, client):
+        self.client = client
+        # builder group (a feature, None for the rest) -> subscribers
+        self._groups = {}
+        self._last = None
+
+    def __repr__(self):
+        return f"<MessageRouter features={[_ for _ in self._groups if _]}>"
+
+    def subscribe(
+        self, callback, feature=None, incoming=None, outgoing=None, func=None
+    ):
+        """Call `callback(ctx)` on new messages, ignoring if subscribed.
+
+        feature: only in chats where this per-chat feature is set.
+        incoming, outgoing: only messages of that direction.
+        func: only when `func(ctx)` is true, checked before the callback.
+        """
+        if self.subscribed(callback):
+            return
+        if feature not in self._groups:
+            self._groups[feature] = []
+            self._attach(feature)
+        self._groups[feature].append(_Subscriber(callback, incoming, outgoing, func))
+
+    def unsubscribe(self, callback):
+        for subscribers in self._groups.values():
+            subscribers[:] = [_ for _ in subscribers if _.callback != callback]
+
+    def subscribed(self, callback):
+        return any(
+            _.callback == callback
+            for subscribers in self._groups.values()
+            for _ in subscribers
+        )
+
+    def chats(self, feature):
+        """The chats `feature` is set in, every chat without a database."""
+        if self.client.udB is None:
+            return None
+        return ChatIndex(self.client.udB, feature)
+
+    def enabled(self, feature, chat_id):
+        chats = self.chats(feature)
+        return chats is None or chat_id in chats
+
+    def _attach(self, group):
+        def wanted(event):
+            return self._filter(group, event)
+
+        async def dispatch(event):
+            await self._dispatch(group, event)
+
+        if group is None or (chats := self.chats(group)) is None:
+            builder = events.NewMessage(func=wanted)
+        else:
+            builder = chat_builder(chats, func=wanted)
+        self.client.add_event_handler(dispatch, builder)
+
+    def _context(self, event):
+        # Builders of one type get the same event, the context is shared too.
+        if self._last is None or self._last.event is not event:
+            self._last = MessageContext(event)
+        return self._last
+
+    def _filter(self, group, event):
+        ctx = self._context(event)
+        wanted = []
+        for subscriber in self._groups[group]:
+            try:
+                if subscriber.wants(ctx):
+                    wanted.append(subscriber)
+            except Exception as er:
+                LOGS.exception(er)
+        ctx.wanted[group] = wanted
+        return bool(wanted)
+
+    async def _dispatch(self, group, event):
+        ctx = self._context(event)
+        for subscriber in ctx.wanted.pop(group, ()):
+            try:
+                await subscriber.callback(ctx)
+            except events.StopPropagation:
+                raise
+            except Exception as er:
+                LOGS.exception(er)
@@ -0,0 +1,250 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Concurrency limits and delayed actions for event handlers.
+
+Telethon starts a task per handler and update, so a raid of joins or a
+busy chat with the chatbot on runs as many copies of the handler at once,
+all of them calling Telegram. `scheduler.limited(feature)` runs a handler
+through a bounded queue instead: at most `limit` calls of the feature run
+at a time, the rest wait in the queue, and once `size` calls are waiting
+new ones are dropped ("drop_new") or push out the oldest ("drop_oldest").
+With `key`, a call waiting with the same key is replaced by the new one.
+
+    @ultroid_bot.on(events.ChatAction())
+    @scheduler.limited("chatactions", limit=8, size=1000)
+    async def handler(event):
+        ...
+
+Deleting a message a few seconds later used to keep a coroutine sleeping
+for each message. `scheduler.delete_later(msg, 10)` puts it on a timer
+wheel instead: one task, ticking every second, runs whatever is due.
+`scheduler.stats()` gives queue depths, drops and pending timers.
+"""
+
+import asyncio
+import math
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+
+from . import LOGS
+
+POLICIES = ("drop_new", "drop_oldest")
+
+
+class Timer:
+    __slots__ = ("callback", "args", "rounds", "cancelled")
+
+    def __init__(self, callback, args, rounds):
+        self.callback = callback
+        self.args = args
+        self.rounds = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Calls callbacks after a delay, rounded up to whole ticks."""
+
+    def __init__(self, tick=1.0, slots=512):
+        self.tick = tick
+        self._slots = [[] for _ in range(slots)]
+        self._cursor = 0
+        # loop time the cursor stands for, the slot after it is due a tick later
+        self._at = 0.0
+        self._task = None
+        self.pending = 0
+        self.fired = 0
+
+    def __repr__(self):
+        return f"<TimerWheel pending={self.pending}>"
+
+    def call_later(self, delay, callback, *args):
+        """Call `callback(*args)` in `delay` seconds, awaiting coroutines."""
+        now = asyncio.get_event_loop().time()
+        if self._task is None:
+            self._at = now
+            self._task = asyncio.ensure_future(self._run())
+        # Counted from the last tick, part of the current one has passed.
+        ticks = max(1, math.ceil((now + delay - self._at) / self.tick))
+        slots = len(self._slots)
+        timer = Timer(callback, args, (ticks - 1) // slots)
+        self._slots[(self._cursor + ticks) % slots].append(timer)
+        self.pending += 1
+        return timer
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        try:
+            while self.pending:
+                due_at = self._at + self.tick
+                await asyncio.sleep(max(0, due_at - loop.time()))
+                self._at = due_at
+                self._advance()
+        finally:
+            self._task = None
+
+    def _advance(self):
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        due, kept = [], []
+        for timer in slot:
+            if timer.cancelled:
+                self.pending -= 1
+            elif timer.rounds:
+                timer.rounds -= 1
+                kept.append(timer)
+            else:
+                self.pending -= 1
+                due.append(timer)
+        slot[:] = kept
+        for timer in due:
+            self.fired += 1
+            self._fire(timer)
+
+    def _fire(self, timer):
+        try:
+            result = timer.callback(*timer.args)
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result).add_done_callback(_log_failure)
+        except Exception as er:
+            LOGS.exception(er)
+
+    def stats(self):
+        return {"pending": self.pending, "fired": self.fired}
+
+
+def _log_failure(task):
+    if not task.cancelled() and (er := task.exception()):
+        LOGS.exception(er)
+
+
+class FeatureQueue:
+    """Runs the calls of one feature, `limit` at a time, `size` waiting."""
+
+    def __init__(self, feature, limit=4, size=100, policy="drop_new", key=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, choose from {POLICIES}")
+        self.feature = feature
+        self.limit = limit
+        self.size = size
+        self.policy = policy
+        self.key = key
+        # merge key -> (func, args), in arrival order
+        self._waiting = OrderedDict()
+        self._order = count()
+        self.running = 0
+        self.submitted = self.processed = self.failed = 0
+        self.dropped = self.merged = self.max_depth = 0
+
+    def __repr__(self):
+        return f"<FeatureQueue {self.feature} running={self.running} depth={self.depth}>"
+
+    @property
+    def depth(self):
+        return len(self._waiting)
+
+    def submit(self, func, *args):
+        """Queue `func(*args)`; False if it was dropped."""
+        self.submitted += 1
+        key = self.key(*args) if self.key else None
+        if key is None:
+            key = next(self._order)
+        if key in self._waiting:
+            self._waiting[key] = (func, args)
+            self.merged += 1
+        else:
+            if len(self._waiting) >= self.size:
+                self.dropped += 1
+                if self.policy == "drop_new":
+                    return False
+                self._waiting.popitem(last=False)
+            self._waiting[key] = (func, args)
+            self.max_depth = max(self.max_depth, len(self._waiting))
+        if self.running < self.limit:
+            self.running += 1
+            asyncio.ensure_future(self._work())
+        return True
+
+    async def _work(self):
+        try:
+            while self._waiting:
+                _, (func, args) = self._waiting.popitem(last=False)
+                try:
+                    await func(*args)
+                    self.processed += 1
+                except Exception as er:
+                    self.failed += 1
+                    LOGS.exception(er)
+        finally:
+            self.running -= 1
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "size": self.size,
+            "running": self.running,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "merged": self.merged,
+        }
+
+
+class Scheduler:
+    def __init__(self):
+        self.queues = {}
+        self.timers = TimerWheel()
+
+    def __repr__(self):
+        return f"<Scheduler features={list(self.queues)} timers={self.timers.pending}>"
+
+    def queue(self, feature, **settings):
+        """The queue of `feature`, made with `settings` the first time."""
+        if feature not in self.queues:
+            self.queues[feature] = FeatureQueue(feature, **settings)
+        return self.queues[feature]
+
+    def limited(self, feature, limit=4, size=100, policy="drop_new", key=None):
+        """Decorator running the handler through the queue of `feature`.
+
+        The wrapper returns once the call is queued, so a limited handler
+        can't stop the propagation of an event.
+        """
+        queue = self.queue(feature, limit=limit, size=size, policy=policy, key=key)
+
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args):
+                queue.submit(func, *args)
+
+            return wrapper
+
+        return decorator
+
+    def call_later(self, delay, callback, *args):
+        return self.timers.call_later(delay, callback, *args)
+
+    def delete_later(self, message, delay):
+        """Delete `message` in `delay` seconds."""
+        return self.call_later(delay, message.delete)
+
+    def stats(self):
+        return {
+            "timers": self.timers.stats(),
+            "queues": {name: queue.stats() for name, queue in self.queues.items()},
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,180 @@
+# Ultroid - UserBot
+# Copyright (C) 2021-2025 TeamUltroid
+#
+# This file is a part of < https://github.com/TeamUltroid/Ultroid/ >
+# PLease read the GNU Affero General Public License in
+# <https://github.com/TeamUltroid/pyUltroid/blob/main/LICENSE>.
+
+"""
+Warm MTProto connections for parallel transfers.
+
+fns/FastTelethon.py uploads and downloads over up to 20 connections of
+their own, which used to be opened for every file and closed after it,
+with an export and import of the authorization first when the file is on
+another DC. `client.sender_pool` keeps those connections open instead:
+a transfer leases what it needs, gives it back when done, and the next
+one reuses it. Connections unused for `SENDER_POOL_IDLE` seconds are
+closed, the authorization of a DC is exported once.
+
+At most `size` connections per DC are leased at a time, like the limit
+Telegram puts on an account; a transfer which finds them all in use waits
+for another to give some back.
+"""
+
+import asyncio
+from collections import defaultdict
+
+from telethon.network import MTProtoSender
+from telethon.tl.alltlobjects import LAYER
+from telethon.tl.functions import InvokeWithLayerRequest
+from telethon.tl.functions.auth import (
+    ExportAuthorizationRequest,
+    ImportAuthorizationRequest,
+)
+
+from . import LOGS
+
+MAX_PER_DC = 20
+
+
+class SenderPool:
+    def __init__(self, client, size=MAX_PER_DC, idle=60):
+        self.client = client
+        self.size = size
+        self.idle = idle
+        # dc -> [(sender, released at)], the most recently used last
+        self._idle = defaultdict(list)
+        self._leased = defaultdict(int)
+        # dc -> auth key of this account there, for DCs besides the home one
+        self._auth = {}
+        self._auth_lock = asyncio.Lock()
+        self._freed = asyncio.Condition()
+        self._reaper = None
+        self.hits = self.misses = self.expired = self.dropped = 0
+
+    def __repr__(self):
+        return f"<SenderPool {self.stats()}>"
+
+    async def lease(self, dc_id, count):
+        """Up to `count` connected senders to `dc_id`, at least one."""
+        async with self._freed:
+            await self._freed.wait_for(lambda: self._leased[dc_id] < self.size)
+            count = min(count, self.size - self._leased[dc_id])
+            self._leased[dc_id] += count
+        senders = []
+        idle = self._idle[dc_id]
+        while idle and len(senders) < count:
+            sender, _ = idle.pop()
+            if sender.is_connected():
+                self.hits += 1
+                senders.append(sender)
+            else:
+                self.dropped += 1
+        missing = count - len(senders)
+        self.misses += missing
+        results = await asyncio.gather(
+            *[self._connect(dc_id) for _ in range(missing)], return_exceptions=True
+        )
+        errors = [_ for _ in results if isinstance(_, BaseException)]
+        senders += [_ for _ in results if not isinstance(_, BaseException)]
+        if errors:
+            LOGS.exception(errors[0])
+            async with self._freed:
+                self._leased[dc_id] -= len(errors)
+                self._freed.notify_all()
+            if not senders:
+                raise errors[0]
+        return senders
+
+    async def release(self, dc_id, senders, broken=False):
+        """Give `senders` back, closing them if the transfer failed."""
+        async with self._freed:
+            self._leased[dc_id] -= len(senders)
+            self._freed.notify_all()
+        if broken or not self.idle:
+            await asyncio.gather(
+                *[sender.disconnect() for sender in senders], return_exceptions=True
+            )
+            return
+        now = asyncio.get_event_loop().time()
+        self._idle[dc_id].extend((sender, now) for sender in senders)
+        if not self._reaper:
+            self._reaper = asyncio.get_event_loop().call_later(self.idle, self._reap)
+
+    def _reap(self):
+        self._reaper = None
+        loop = asyncio.get_event_loop()
+        oldest = loop.time() - self.idle
+        waiting = False
+        for idle in self._idle.values():
+            expired = 0
+            while expired < len(idle) and idle[expired][1] <= oldest:
+                expired += 1
+            for sender, _ in idle[:expired]:
+                asyncio.ensure_future(sender.disconnect())
+            del idle[:expired]
+            self.expired += expired
+            waiting = waiting or bool(idle)
+        if waiting:
+            self._reaper = loop.call_later(self.idle, self._reap)
+
+    async def close(self):
+        """Close every idle connection."""
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        idle = [sender for senders in self._idle.values() for sender, _ in senders]
+        self._idle.clear()
+        await asyncio.gather(
+            *[sender.disconnect() for sender in idle], return_exceptions=True
+        )
+
+    def _auth_key(self, dc_id):
+        if dc_id == self.client.session.dc_id:
+            return self.client.session.auth_key
+        return self._auth.get(dc_id)
+
+    async def _connect(self, dc_id):
+        if (auth_key := self._auth_key(dc_id)) is None:
+            # The first connection to a DC exports the authorization there,
+            # the others wait for its key.
+            async with self._auth_lock:
+                if (auth_key := self._auth_key(dc_id)) is None:
+                    return await self._open(dc_id, None)
+        return await self._open(dc_id, auth_key)
+
+    async def _open(self, dc_id, auth_key):
+        client = self.client
+        dc = await client._get_dc(dc_id)
+        sender = MTProtoSender(auth_key, loggers=client._log)
+        await sender.connect(
+            client._connection(
+                dc.ip_address,
+                dc.port,
+                dc.id,
+                loggers=client._log,
+                proxy=client._proxy,
+            )
+        )
+        if not auth_key:
+            auth = await client(ExportAuthorizationRequest(dc_id))
+            client._init_request.query = ImportAuthorizationRequest(
+                id=auth.id, bytes=auth.bytes
+            )
+            await sender.send(InvokeWithLayerRequest(LAYER, client._init_request))
+            self._auth[dc_id] = sender.auth_key
+        return sender
+
+    def stats(self):
+        idle = sum(len(_) for _ in self._idle.values())
+        leased = sum(self._leased.values())
+        asked = self.hits + self.misses
+        return {
+            "idle": idle,
+            "leased": leased,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / asked if asked else 0.0,
+            "expired": self.expired,
+            "dropped": self.dropped,
+        }
@@ -23,8 +23,6 @@ except ImportError:
 from telethon.errors import (
     ChannelsTooMuchError,
     ChatAdminRequiredError,
-    MessageIdInvalidError,
-    MessageNotModifiedError,
     UserNotParticipantError,
     # Specific RPC errors if known for some operations
     # e.g. rpcerrorlist.PhoneNumberInvalidError
@@ -49,76 +47,38 @@ from decouple import config as decouple_config, RepositoryEnv # Aliased decouple
 from .. import LOGS, ULTConfig
 from ..fns.helper import download_file, inline_mention, updater
 
-db_url = 0 # Module level global
-
 
 async def autoupdate_local_database():
-    # Var here refers to the UltroidConfigVars instance if it's made global in __main__ or similar
-    # Or it should be passed or accessed consistently.
-    # Assuming Var is an instance of UltroidConfigVars accessible here.
-    # For now, let's assume it's correctly accessed from `from .. import Var` if Var is an instance.
-    # If `from .. import Var` actually imports the class, then this needs `ultroid_vars = UltroidConfigVars()`
-    # For this fix, I'll assume `Var` is the instance for now, as per original structure.
-    # If `Var` is the class, then `Var.TGDB_URL` would be an issue.
-    # The `configs.py` defines Var as a class. So `Var.TGDB_URL` is indeed problematic.
-    # This function is complex and relies on how Var, asst, udB, ultroid_bot are initialized and made available.
-    # Let's use `decouple_config` for TGDB_URL for safety, assuming it's an env var.
-    from .. import asst, udB, ultroid_bot, Var as GlobalUltroidConfig # Assuming this Var is the instance
-
-    global db_url
-    # Prioritize udB, then direct decouple_config, then cache
-    # GlobalUltroidConfig.TGDB_URL isn't defined in configs.py.
-    # This line was `udB.get_key("TGDB_URL") or Var.TGDB_URL or ultroid_bot._cache.get("TGDB_URL")`
-    # Var.TGDB_URL is problematic.
-    current_tgdb_url_env = decouple_config("TGDB_URL", default=None)
-    db_url = (
-        udB.get_key("TGDB_URL") or current_tgdb_url_env or ultroid_bot._cache.get("TGDB_URL")
-    )
-
-    if db_url:
-        _split = db_url.split("/")
-        if len(_split) > 2: # Basic check
-            _channel = _split[-2]
-            _id = _split[-1]
-            try:
-                await asst.edit_message(
-                    int(_channel) if _channel.isdigit() else _channel,
-                    message=int(_id), # message id should be int
-                    file="database.json",
-                    text="**Do not delete this file.**",
-                )
-            except MessageNotModifiedError:
-                return
-            except (MessageIdInvalidError, ValueError): # ValueError if _id is not int
-                LOGS.warning("Invalid message ID or channel for TGDB_URL update: %s", db_url)
-            except Exception as e_inner: # More specific Telethon errors if possible
-                LOGS.error("Error editing TGDB message: %s", e_inner)
-        else:
-            LOGS.warning("Malformed TGDB_URL: %s", db_url)
+    """Back up LocalDB to the log channel.
 
-    try:
-        # Similar issue with Var.LOG_CHANNEL
-        current_log_channel_env = decouple_config("LOG_CHANNEL", default=0, cast=int)
-        log_channel_val = (
-            udB.get_key("LOG_CHANNEL")
-            or current_log_channel_env
-            or asst._cache.get("LOG_CHANNEL")
-            or "me"
-        )
-        # Ensure log_channel_val is int if it's a number string for user_id/chat_id
-        if isinstance(log_channel_val, str) and log_channel_val.isdigit():
-            log_channel_val = int(log_channel_val)
-        elif isinstance(log_channel_val, str) and log_channel_val.startswith("-") and log_channel_val[1:].isdigit():
-            log_channel_val = int(log_channel_val)
+    Only files which weren't uploaded before are sent: sealed log segments,
+    and a snapshot after each compaction."""
+    from .. import asst, udB
 
+    if udB.name != "LocalDB":
+        return
+    current_log_channel_env = decouple_config("LOG_CHANNEL", default=0, cast=int)
+    log_channel_val = (
+        udB.get_key("LOG_CHANNEL")
+        or current_log_channel_env
+        or asst._cache.get("LOG_CHANNEL")
+        or "me"
+    )
+    # Ensure log_channel_val is int if it's a number string for user_id/chat_id
+    if isinstance(log_channel_val, str) and log_channel_val.lstrip("-").isdigit():
+        log_channel_val = int(log_channel_val)
 
-        msg = await asst.send_message(
-            log_channel_val, "**Do not delete this file.**", file="database.json"
-        )
-        asst._cache["TGDB_URL"] = msg.message_link
-        udB.set_key("TGDB_URL", msg.message_link)
-    except Exception as ex: # Catch more specific errors if known (e.g., telethon RPC errors)
-        LOGS.error("Error on autoupdate_local_database (sending new DB backup): %s", ex)
+    for path in udB.db.pending_backups():
+        try:
+            await asst.send_message(
+                log_channel_val,
+                f"**LocalDB backup** `{os.path.basename(path)}`\n**Do not delete this file.**",
+                file=path,
+            )
+        except Exception as ex: # Catch more specific errors if known (e.g., telethon RPC errors)
+            LOGS.error("Error on autoupdate_local_database (sending %s): %s", path, ex)
+            return
+        udB.db.mark_backed_up(path)
 
 
 def update_envs():
@@ -763,10 +723,9 @@ def _version_changes(udb):
     ]:
         key = udb.get_key(_)
         if key and str(key)[0] != "[":
-            key = udb.get(_)
             new_ = [
                 int(z) if z.isdigit() or (z.startswith("-") and z[1:].isdigit()) else z
-                for z in key.split()
+                for z in str(key).split()
             ]
             udb.set_key(_, new_)
 